@@ -1,8 +1,46 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.utils import model_ngettext
+from django.contrib.admin.widgets import AutocompleteSelect, AutocompleteSelectMultiple
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.safestring import mark_safe
 from django_quill.widgets import QuillWidget
+
+from apps.core.admin import AutocompleteFilter, LargeTableAdminMixin
+from apps.media_library.forms import MediaPickerSelect
+from .autosave import discard_draft
+from .bulk import add_related, remove_related, set_author, set_status
+from .forms import AutosaveQuillWidget
+from .revisions import diff_table, get_values, restore_revision
 from .models import Category, Tag, Post, Page
 
 
+class AuthorFilter(AutocompleteFilter):
+    field_name = 'author'
+
+
+class CategoryFilter(AutocompleteFilter):
+    field_name = 'categories'
+
+
+class TagFilter(AutocompleteFilter):
+    field_name = 'tags'
+
+
+class BulkRelatedForm(forms.Form):
+    """Intermediate form for bulk actions that need related objects picked."""
+    
+    def __init__(self, db_field, admin_site, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        widget_class = AutocompleteSelectMultiple if db_field.many_to_many else AutocompleteSelect
+        self.fields['value'] = db_field.formfield(widget=widget_class(db_field, admin_site), required=True)
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug', 'parent', 'created_at')
@@ -20,13 +58,15 @@ class TagAdmin(admin.ModelAdmin):
     ordering = ('name',)
 
 
-class ContentBaseAdmin(admin.ModelAdmin):
+class ContentBaseAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Base admin class for content types."""
     list_display = ('title', 'author', 'status', 'published_at', 'created_at')
-    list_filter = ('status', 'author', 'created_at')
+    list_filter = ('status', AuthorFilter, 'created_at')
+    list_select_related = ('author',)
     search_fields = ('title', 'excerpt', 'content')
     prepopulated_fields = {'slug': ('title',)}
-    date_hierarchy = 'created_at'
+    autocomplete_fields = ('author',)
+    actions = ('publish_selected', 'draft_selected', 'archive_selected', 'reassign_author')
     
     readonly_fields = ('created_at', 'updated_at')
     
@@ -50,24 +90,158 @@ class ContentBaseAdmin(admin.ModelAdmin):
         }),
     )
     
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'featured_image':
+            kwargs['widget'] = MediaPickerSelect()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    
     def get_form(self, request, obj=None, **kwargs):
         """Set author initial value to current user."""
         form = super().get_form(request, obj, **kwargs)
         if obj is None:  # Creating new object
             form.base_fields['author'].initial = request.user
+        elif 'content' in form.base_fields:
+            form.base_fields['content'].widget = AutosaveQuillWidget(obj)
         return form
     
     def save_model(self, request, obj, form, change):
         if not obj.author:
             obj.author = request.user
+        obj._revision_user = request.user
         super().save_model(request, obj, form, change)
+        if 'content' in form.fields:
+            # The editor's text is saved now; changelist edits leave the draft.
+            discard_draft(obj)
+    
+    # Revision history
+    
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                '<path:object_id>/revisions/',
+                self.admin_site.admin_view(self.revisions_view),
+                name='%s_%s_revisions' % info,
+            ),
+            path(
+                '<path:object_id>/revisions/<int:number>/',
+                self.admin_site.admin_view(self.revision_view),
+                name='%s_%s_revision' % info,
+            ),
+        ] + super().get_urls()
+    
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        extra_context = {**(extra_context or {}), 'has_revisions': True}
+        return super().change_view(request, object_id, form_url, extra_context)
+    
+    def get_revision_object(self, request, object_id):
+        obj = self.get_object(request, object_id)
+        if obj is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        return obj
+    
+    def revisions_view(self, request, object_id):
+        """List an object's revisions, newest first."""
+        obj = self.get_revision_object(request, object_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Revisions: {obj}',
+            'opts': self.opts,
+            'original': obj,
+            'revisions': obj.revisions.select_related('user').defer('data'),
+        }
+        return TemplateResponse(request, 'admin/content/revision_list.html', context)
+    
+    def revision_view(self, request, object_id, number):
+        """Compare a revision with the one before it (or ``?against=N``) and restore it on POST."""
+        obj = self.get_revision_object(request, object_id)
+        revision = get_object_or_404(obj.revisions.defer('data'), number=number)
+        
+        if request.method == 'POST':
+            if not self.has_change_permission(request, obj):
+                raise PermissionDenied
+            restore_revision(obj, revision, user=request.user)
+            self.message_user(request, f'Restored revision {number} of “{obj}”.', messages.SUCCESS)
+            return redirect(reverse(f'admin:{self.opts.app_label}_{self.opts.model_name}_change', args=[obj.pk]))
+        
+        against = request.GET.get('against')
+        revisions = obj.revisions.defer('data')
+        if against and against.isdigit():
+            other = revisions.filter(number=int(against)).first()
+        else:
+            other = revisions.filter(number__lt=number).order_by('-number').first()
+        
+        values = get_values(revision)
+        other_values = get_values(other) if other else {name: '' for name in values}
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Revision {number}: {obj}',
+            'opts': self.opts,
+            'original': obj,
+            'revision': revision,
+            'other': other,
+            'diff': mark_safe(diff_table(
+                other_values, values,
+                f'Revision {other.number}' if other else 'Empty', f'Revision {number}',
+            )),
+            'can_restore': self.has_change_permission(request, obj),
+        }
+        return TemplateResponse(request, 'admin/content/revision_detail.html', context)
+    
+    # Bulk actions: set-based updates from apps.content.bulk, not save()
+    
+    def bulk_status(self, request, queryset, status, verb):
+        count = set_status(queryset, status)
+        self.message_user(request, f'{count} {model_ngettext(self.opts, count)} {verb}.', messages.SUCCESS)
+    
+    @admin.action(description='Publish selected %(verbose_name_plural)s', permissions=['change'])
+    def publish_selected(self, request, queryset):
+        self.bulk_status(request, queryset, self.model.Status.PUBLISHED, 'published or scheduled')
+    
+    @admin.action(description='Revert selected %(verbose_name_plural)s to draft', permissions=['change'])
+    def draft_selected(self, request, queryset):
+        self.bulk_status(request, queryset, self.model.Status.DRAFT, 'reverted to draft')
+    
+    @admin.action(description='Archive selected %(verbose_name_plural)s', permissions=['change'])
+    def archive_selected(self, request, queryset):
+        self.bulk_status(request, queryset, self.model.Status.ARCHIVED, 'archived')
+    
+    def bulk_related(self, request, queryset, action, field_name, title, apply):
+        """Ask for related objects, then run ``apply(queryset, value)``."""
+        db_field = self.opts.get_field(field_name)
+        form = BulkRelatedForm(db_field, self.admin_site, request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            count = apply(queryset, form.cleaned_data['value'])
+            self.message_user(request, f'{title}: {count} {model_ngettext(self.opts, count)} updated.', messages.SUCCESS)
+            return None
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.opts,
+            'form': form,
+            'media': self.media + form.media,
+            'count': queryset.count(),
+            'action': action,
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/content/bulk_action.html', context)
+    
+    @admin.action(description='Reassign selected %(verbose_name_plural)s to another author', permissions=['change'])
+    def reassign_author(self, request, queryset):
+        return self.bulk_related(request, queryset, 'reassign_author', 'author', 'Reassign author', set_author)
 
 
 @admin.register(Post)
 class PostAdmin(ContentBaseAdmin):
     list_display = ('title', 'author', 'status', 'allow_comments', 'published_at', 'created_at')
-    list_filter = ('status', 'author', 'categories', 'tags', 'allow_comments', 'created_at')
-    filter_horizontal = ('categories', 'tags')
+    list_filter = ('status', AuthorFilter, CategoryFilter, TagFilter, 'allow_comments', 'created_at')
+    autocomplete_fields = ('author', 'categories', 'tags')
+    actions = ContentBaseAdmin.actions + ('add_categories', 'remove_categories', 'add_tags', 'remove_tags')
     
     fieldsets = (
         (None, {
@@ -91,13 +265,43 @@ class PostAdmin(ContentBaseAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    @admin.action(description='Add categories to selected posts', permissions=['change'])
+    def add_categories(self, request, queryset):
+        return self.bulk_related(
+            request, queryset, 'add_categories', 'categories', 'Add categories',
+            lambda posts, categories: add_related(posts, 'categories', categories),
+        )
+    
+    @admin.action(description='Remove categories from selected posts', permissions=['change'])
+    def remove_categories(self, request, queryset):
+        return self.bulk_related(
+            request, queryset, 'remove_categories', 'categories', 'Remove categories',
+            lambda posts, categories: remove_related(posts, 'categories', categories),
+        )
+    
+    @admin.action(description='Add tags to selected posts', permissions=['change'])
+    def add_tags(self, request, queryset):
+        return self.bulk_related(
+            request, queryset, 'add_tags', 'tags', 'Add tags',
+            lambda posts, tags: add_related(posts, 'tags', tags),
+        )
+    
+    @admin.action(description='Remove tags from selected posts', permissions=['change'])
+    def remove_tags(self, request, queryset):
+        return self.bulk_related(
+            request, queryset, 'remove_tags', 'tags', 'Remove tags',
+            lambda posts, tags: remove_related(posts, 'tags', tags),
+        )
 
 
 @admin.register(Page)
 class PageAdmin(ContentBaseAdmin):
     list_display = ('title', 'template', 'parent', 'show_in_menu', 'menu_order', 'status', 'created_at')
-    list_filter = ('status', 'template', 'show_in_menu', 'author', 'created_at')
+    list_filter = ('status', 'template', 'show_in_menu', AuthorFilter, 'created_at')
+    list_select_related = ('parent',)
     list_editable = ('menu_order', 'show_in_menu')
+    autocomplete_fields = ('author', 'parent')
     
     fieldsets = (
         (None, {
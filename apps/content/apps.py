@@ -5,3 +5,6 @@ class ContentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.content'
     verbose_name = 'Content Management'
+    
+    def ready(self):
+        from . import receivers  # noqa: F401
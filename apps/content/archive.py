@@ -0,0 +1,74 @@
+"""
+Monthly post counts for the blog archive.
+
+``ArchiveMonth`` keeps one row per month that has published posts, so the
+archive widget and archive pagination read a few small rows instead of
+aggregating the Post table. The receivers in ``apps.content.receivers``
+recount only the months a change touches; each recount is a range scan on
+the (status, published_at) index.
+"""
+
+import datetime
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import ArchiveMonth, Post
+
+
+def month_of(value):
+    """Return the local ``(year, month)`` of a datetime, or None."""
+    if value is None:
+        return None
+    value = timezone.localtime(value)
+    return value.year, value.month
+
+
+def period_bounds(year, month=None):
+    """Return aware ``(start, end)`` datetimes for a year or a single month."""
+    if month is None:
+        start, end = datetime.datetime(year, 1, 1), datetime.datetime(year + 1, 1, 1)
+    else:
+        start = datetime.datetime(year, month, 1)
+        end = datetime.datetime(year + month // 12, month % 12 + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def published_in(year, month=None):
+    start, end = period_bounds(year, month)
+    return Post.objects.filter(
+        status=Post.Status.PUBLISHED,
+        published_at__gte=start,
+        published_at__lt=end,
+    )
+
+
+def refresh_months(months):
+    """Recount the given ``(year, month)`` pairs."""
+    for year, month in {month for month in months if month}:
+        count = published_in(year, month).count()
+        if count:
+            ArchiveMonth.objects.update_or_create(year=year, month=month, defaults={'post_count': count})
+        else:
+            ArchiveMonth.objects.filter(year=year, month=month).delete()
+
+
+def rebuild_archive():
+    """Recount every month from scratch in one aggregate query."""
+    counts = (
+        Post.objects.filter(status=Post.Status.PUBLISHED, published_at__isnull=False)
+        .annotate(period=TruncMonth('published_at'))
+        .order_by()
+        .values('period')
+        .annotate(count=Count('pk'))
+    )
+    rows = [
+        ArchiveMonth(year=row['period'].year, month=row['period'].month, post_count=row['count'])
+        for row in counts
+    ]
+    with transaction.atomic():
+        ArchiveMonth.objects.all().delete()
+        ArchiveMonth.objects.bulk_create(rows)
+    return len(rows)
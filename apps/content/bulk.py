@@ -0,0 +1,104 @@
+"""
+Set-based bulk changes to posts and pages.
+
+The admin actions use these instead of saving each object. Rows are
+changed in batches of ``BATCH_SIZE``: one UPDATE, or one through-table
+INSERT or DELETE, per batch. Each batch then sends ``content_published``
+or ``content_updated`` once, so caches, archive counts, suggestions and the
+search index are refreshed per batch rather than per object.
+"""
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .signals import content_published, content_updated
+
+
+BATCH_SIZE = 500
+
+
+def batches(queryset):
+    """Yield the primary keys of ``queryset`` in lists of ``BATCH_SIZE``."""
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    for start in range(0, len(pks), BATCH_SIZE):
+        yield pks[start:start + BATCH_SIZE]
+
+
+def set_status(queryset, status):
+    """Move every row to ``status``; return how many changed."""
+    model = queryset.model
+    pending = queryset.exclude(status=status)
+    if status == model.Status.PUBLISHED:
+        # Rows scheduled for the future would only be scheduled again.
+        pending = pending.exclude(status=model.Status.SCHEDULED, published_at__gt=timezone.now())
+    changed = 0
+    for pks in batches(pending):
+        now = timezone.now()
+        with transaction.atomic():
+            rows = model.objects.filter(pk__in=pks)
+            if status == model.Status.PUBLISHED:
+                # As in save(): undated content is published now and
+                # future-dated content is scheduled instead.
+                published = set(rows.exclude(published_at__gt=now).values_list('pk', flat=True))
+                changed += rows.update(
+                    status=Case(
+                        When(published_at__gt=now, then=Value(model.Status.SCHEDULED)),
+                        default=Value(status),
+                    ),
+                    published_at=Coalesce('published_at', Value(now)),
+                    updated_at=now,
+                )
+            else:
+                published = set()
+                changed += rows.update(status=status, updated_at=now)
+        if published:
+            content_published.send(sender=model, pks=sorted(published))
+        others = [pk for pk in pks if pk not in published]
+        if others:
+            content_updated.send(sender=model, pks=others)
+    return changed
+
+
+def set_author(queryset, author):
+    """Reassign every row to ``author``; return how many changed."""
+    model = queryset.model
+    changed = 0
+    for pks in batches(queryset.exclude(author=author)):
+        changed += model.objects.filter(pk__in=pks).update(author=author, updated_at=timezone.now())
+        content_updated.send(sender=model, pks=pks)
+    return changed
+
+
+def _through(queryset, field_name):
+    field = queryset.model._meta.get_field(field_name)
+    return field.remote_field.through, field.m2m_field_name(), field.m2m_reverse_field_name()
+
+
+def add_related(queryset, field_name, objects):
+    """Add ``objects`` to the many-to-many ``field_name`` of every row."""
+    through, source, target = _through(queryset, field_name)
+    targets = [obj.pk for obj in objects]
+    count = 0
+    for pks in batches(queryset):
+        # Existing links are skipped by the through table's unique constraint.
+        through.objects.bulk_create(
+            [through(**{f'{source}_id': pk, f'{target}_id': target_pk}) for pk in pks for target_pk in targets],
+            ignore_conflicts=True,
+        )
+        content_updated.send(sender=queryset.model, pks=pks)
+        count += len(pks)
+    return count
+
+
+def remove_related(queryset, field_name, objects):
+    """Remove ``objects`` from the many-to-many ``field_name`` of every row."""
+    through, source, target = _through(queryset, field_name)
+    targets = [obj.pk for obj in objects]
+    count = 0
+    for pks in batches(queryset):
+        through.objects.filter(**{f'{source}_id__in': pks, f'{target}_id__in': targets}).delete()
+        content_updated.send(sender=queryset.model, pks=pks)
+        count += len(pks)
+    return count
@@ -0,0 +1,67 @@
+"""
+Content version used to key cached fragments and derived counts.
+
+Any change to a Post, Page, Category or Tag, or to the users and media
+files they display, bumps a single version number in the cache (see
+``apps.content.receivers``). Fragment cache keys include
+the version, so a bump makes every cached fragment miss at once without
+having to know which keys exist.
+
+The version only reaches every process through a shared cache, so the
+caches keyed by it are used only with ``SHARED_CACHE``.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Category, Post
+
+
+CONTENT_VERSION_KEY = 'content:version'
+
+
+def get_content_version():
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version.
+        cache.add(CONTENT_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(CONTENT_VERSION_KEY)
+    return version
+
+
+def bump_content_version():
+    try:
+        return cache.incr(CONTENT_VERSION_KEY)
+    except ValueError:
+        return get_content_version()
+
+
+def get_category_post_counts():
+    """
+    Return ``{category_pk: published posts in its subtree}``.
+
+    Each category counts the posts filed under it or any descendant, once
+    each. The whole map comes from one query and, with a shared cache, is
+    cached until the next content change.
+    """
+    key = f'category_post_counts:{get_content_version()}' if settings.SHARED_CACHE else None
+    counts = cache.get(key) if key else None
+    if counts is None:
+        subtree_posts = (
+            Post.objects.filter(status=Post.Status.PUBLISHED, categories__path__startswith=OuterRef('path'))
+            .order_by()
+            .values('status')
+            .annotate(count=Count('pk', distinct=True))
+            .values('count')
+        )
+        counts = dict(
+            Category.objects.annotate(post_count=Coalesce(Subquery(subtree_posts), 0))
+            .values_list('pk', 'post_count')
+        )
+        if key:
+            cache.set(key, counts, settings.FRAGMENT_CACHE_TIMEOUT)
+    return counts
@@ -1,8 +1,44 @@
 from django import forms
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 from django_quill.forms import QuillFormField
+from django_quill.widgets import QuillWidget
+
+from apps.core.pickers import PickerSelect, PickerSelectMultiple
+from apps.media_library.forms import MediaPickerSelect
+from .autosave import discard_draft
 from .models import Post, Page, Category, Tag
 
 
+class AutosaveQuillWidget(QuillWidget):
+    """
+    Quill editor that sends its changes to the autosave endpoint.
+
+    Only an editor opened on the saved text autosaves. After a failed
+    submit the editor holds the submitted text, which the server's
+    versions do not describe.
+    """
+
+    def __init__(self, obj, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.autosave_url = reverse('content:autosave', args=[obj._meta.model_name, obj.pk])
+
+    def render(self, name, value, attrs=None, renderer=None):
+        html = super().render(name, value, attrs, renderer)
+        if not hasattr(value, 'quill'):
+            return html
+        return mark_safe(html + format_html(
+            '<div class="autosave-status" hidden data-autosave-url="{}" data-autosave-editor="{}"></div>',
+            self.autosave_url,
+            self.build_attrs(self.attrs, attrs)['id'],
+        ))
+
+    @property
+    def media(self):
+        return super().media + forms.Media(js=('js/autosave.js',))
+
+
 class PostForm(forms.ModelForm):
     """Form for creating and editing blog posts."""
     
@@ -23,8 +59,9 @@ class PostForm(forms.ModelForm):
             'published_at': forms.DateTimeInput(attrs={'class': 'form-input', 'type': 'datetime-local'}),
             'meta_title': forms.TextInput(attrs={'class': 'form-input'}),
             'meta_description': forms.TextInput(attrs={'class': 'form-input'}),
-            'categories': forms.CheckboxSelectMultiple(),
-            'tags': forms.CheckboxSelectMultiple(),
+            'featured_image': MediaPickerSelect(),
+            'categories': PickerSelectMultiple('content:category_picker'),
+            'tags': PickerSelectMultiple('content:tag_picker'),
         }
     
     def __init__(self, *args, **kwargs):
@@ -35,6 +72,9 @@ class PostForm(forms.ModelForm):
         # Make slug optional for auto-generation
         self.fields['slug'].required = False
         
+        if self.instance.pk:
+            self.fields['content'].widget = AutosaveQuillWidget(self.instance)
+        
         # Limit status choices based on user role
         if self.user:
             if not self.user.is_editor:
@@ -58,6 +98,7 @@ class PostForm(forms.ModelForm):
         if commit:
             instance.save()
             self.save_m2m()
+            discard_draft(instance)
         
         return instance
 
@@ -83,6 +124,8 @@ class PageForm(forms.ModelForm):
             'meta_title': forms.TextInput(attrs={'class': 'form-input'}),
             'meta_description': forms.TextInput(attrs={'class': 'form-input'}),
             'menu_order': forms.NumberInput(attrs={'class': 'form-input'}),
+            'featured_image': MediaPickerSelect(),
+            'parent': PickerSelect('content:page_picker'),
         }
     
     def __init__(self, *args, **kwargs):
@@ -92,6 +135,9 @@ class PageForm(forms.ModelForm):
         # Make slug optional for auto-generation
         self.fields['slug'].required = False
         
+        if self.instance.pk:
+            self.fields['content'].widget = AutosaveQuillWidget(self.instance)
+        
         # Limit status choices based on user role
         if self.user:
             if not self.user.is_editor:
@@ -112,6 +158,7 @@ class PageForm(forms.ModelForm):
         
         if commit:
             instance.save()
+            discard_draft(instance)
         
         return instance
 
@@ -0,0 +1,72 @@
+"""
+Move base64 images out of Quill content and into the media library.
+
+Images pasted or inserted with the editor's image button are stored as
+``data:image/...;base64,...`` URIs in both the delta and the HTML of the
+content. That can put megabytes in a single row. ``extract_inline_images``
+stores each image as a ``Media`` file and replaces every copy of its URI
+with the file's URL.
+
+Base64 never needs JSON escaping, so the URIs are replaced directly in the
+stored JSON string, in the delta and the HTML alike. Files are named after
+a hash of their bytes, so the same image pasted twice, or into two posts,
+is stored once.
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import re
+
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from apps.media_library.models import Media, media_upload_path
+
+
+DATA_URI_RE = re.compile(r'data:image/(png|jpeg|gif|webp);base64,([A-Za-z0-9+/]+={0,2})')
+
+EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'gif': 'gif', 'webp': 'webp'}
+
+
+def store_image(subtype, payload, uploaded_by_id=None):
+    """Return the ``Media`` for one base64 image, creating it if needed, or None if invalid."""
+    try:
+        data = base64.b64decode(payload, validate=True)
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+            width, height = image.size
+    except (binascii.Error, ValueError, OSError):
+        return None
+    filename = f'inline-{hashlib.sha1(data).hexdigest()[:20]}.{EXTENSIONS[subtype]}'
+    media = Media.objects.filter(file=media_upload_path(None, filename)).first()
+    if media is None:
+        media = Media(
+            title=filename.rsplit('.', 1)[0],
+            mime_type=f'image/{subtype}',
+            file_size=len(data),
+            width=width,
+            height=height,
+            uploaded_by_id=uploaded_by_id,
+        )
+        media.file.save(filename, ContentFile(data), save=False)
+        media.save()
+    return media
+
+
+def extract_inline_images(content, uploaded_by_id=None):
+    """Return the stored ``content`` JSON with its base64 images replaced by media URLs."""
+    if 'data:image/' not in content:
+        return content
+    urls = {}
+
+    def replace(match):
+        uri = match.group(0)
+        if uri not in urls:
+            media = store_image(match.group(1), match.group(2), uploaded_by_id)
+            # Leave anything that does not decode to an image alone.
+            urls[uri] = media.url if media else uri
+        return urls[uri]
+
+    return DATA_URI_RE.sub(replace, content)
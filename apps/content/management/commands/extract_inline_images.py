@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.content.inline_images import extract_inline_images
+from apps.content.models import Page, Post
+from apps.content.signals import content_updated
+from apps.media_library.usage import sync_usage
+
+
+def extract_batch(model, after, batch_size):
+    """
+    Extract images from up to ``batch_size`` items with a pk above ``after``.
+    Return the last pk looked at (None when done) and the pks changed.
+    """
+    pks = list(
+        model.objects.filter(pk__gt=after, content__contains='data:image/')
+        .order_by('pk')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not pks:
+        return None, []
+
+    changed = []
+    with transaction.atomic():
+        # Locked so an editor's save cannot be overwritten with older text.
+        for obj in model.objects.filter(pk__in=pks).select_for_update().only('pk', 'author', 'featured_image', 'content'):
+            content = obj.content.json_string
+            extracted = extract_inline_images(content, uploaded_by_id=obj.author_id)
+            if extracted != content:
+                obj.content = extracted
+                changed.append(obj)
+        model.objects.bulk_update(changed, ['content'])
+        for obj in changed:
+            sync_usage(obj)
+    if changed:
+        content_updated.send(sender=model, pks=[obj.pk for obj in changed])
+    return pks[-1], [obj.pk for obj in changed]
+
+
+class Command(BaseCommand):
+    help = 'Move base64 images embedded in post and page content into the media library.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Items rewritten per transaction.')
+
+    def handle(self, *args, **options):
+        for model in (Post, Page):
+            after, total = 0, 0
+            while True:
+                after, changed = extract_batch(model, after, options['batch_size'])
+                if after is None:
+                    break
+                total += len(changed)
+            self.stdout.write(f'Rewrote {total} {model._meta.verbose_name_plural}.')
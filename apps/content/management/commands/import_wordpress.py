@@ -0,0 +1,421 @@
+import hashlib
+import json
+import os
+import time
+from urllib.parse import quote, unquote
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.content.models import Category, ImportedRecord, Page, Post, Tag
+from apps.content.quill import html_to_quill
+from apps.content.signals import content_published
+from apps.content.wordpress import iter_records
+from apps.media_library.models import Media, get_media_type
+from apps.media_library.usage import sync_usage
+from apps.users.models import User
+
+
+# WordPress post statuses we import; anything else (trash, auto-draft,
+# inherit revisions) is skipped.
+WP_STATUSES = {
+    'publish': Post.Status.PUBLISHED,
+    'future': Post.Status.SCHEDULED,
+    'pending': Post.Status.PENDING,
+    'draft': Post.Status.DRAFT,
+    'private': Post.Status.DRAFT,
+}
+
+RECORD_TYPES = ('author', 'category', 'tag', 'attachment', 'post', 'page')
+
+
+def import_slug(slug, max_length):
+    """
+    Return a routable slug of at most ``max_length`` characters.
+
+    WordPress percent-encodes non-ASCII slugs. They are decoded and
+    transliterated where possible, otherwise the hex digits of the encoding
+    are kept. Slugs that are still too long are cut and end in a hash of
+    the original, so distinct slugs stay distinct.
+    """
+    decoded = unquote(slug)
+    cleaned = slugify(decoded) or slugify(quote(decoded, safe='').replace('%', ''))
+    if len(cleaned) > max_length:
+        digest = hashlib.sha1(slug.encode()).hexdigest()[:8]
+        cleaned = f'{cleaned[:max_length - 9].rstrip("-")}-{digest}'
+    return cleaned
+
+
+def slug_length(model):
+    return model._meta.get_field('slug').max_length
+
+
+class Command(BaseCommand):
+    help = 'Import a WordPress WXR export (or JSON Lines dump) in batches, resuming from the last checkpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='WXR .xml file or .jsonl file.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Records per write batch.')
+        parser.add_argument('--state', help='Checkpoint file (default: <path>.import-state.json).')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and start over.')
+        parser.add_argument(
+            '--media-prefix', default='wordpress',
+            help='Folder under MEDIA_ROOT holding a copy of wp-content/uploads.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+
+        self.batch_size = options['batch_size']
+        self.media_prefix = options['media_prefix'].strip('/')
+        self.state_path = options['state'] or f'{path}.import-state.json'
+        self.state = self.load_state(options['restart'])
+
+        skip = self.state['processed']
+        if skip:
+            self.stdout.write(f'Resuming after {skip} records.')
+
+        buffers = {record_type: [] for record_type in RECORD_TYPES}
+        pending = 0
+        processed = skip
+        started = time.monotonic()
+
+        for index, record in enumerate(iter_records(path)):
+            if index < skip:
+                continue
+            if record['type'] in buffers:
+                buffers[record['type']].append(record)
+            pending += 1
+            processed = index + 1
+            if pending >= self.batch_size:
+                self.flush(buffers, processed)
+                pending = 0
+                rate = (processed - skip) / max(time.monotonic() - started, 0.001)
+                self.stdout.write(f'{processed} records imported ({rate:.0f}/s)')
+
+        self.flush(buffers, processed)
+        self.link_relations()
+        self.sync_media_usage()
+        ImportedRecord.objects.all().delete()
+        os.remove(self.state_path)
+        self.stdout.write(self.style.SUCCESS(f'Import finished: {processed} records.'))
+
+    # Checkpointing. The file only holds the position in the export; the
+    # mappings are ImportedRecord rows written in the same transaction as
+    # each batch, so one import can run at a time.
+
+    def load_state(self, restart):
+        if not restart and os.path.exists(self.state_path):
+            with open(self.state_path) as fh:
+                return {'processed': json.load(fh)['processed']}
+        ImportedRecord.objects.all().delete()
+        return {'processed': 0}
+
+    def remember(self, kind, rows):
+        """Store ``(key, object_id, parent, thumbnail)`` tuples for this import."""
+        ImportedRecord.objects.bulk_create(
+            [
+                ImportedRecord(kind=kind, key=key, object_id=object_id, parent=parent or '', thumbnail=thumbnail or '')
+                for key, object_id, parent, thumbnail in rows
+            ],
+            update_conflicts=True,
+            unique_fields=['kind', 'key'],
+            update_fields=['object_id', 'parent', 'thumbnail'],
+            batch_size=self.batch_size,
+        )
+
+    def recall(self, kind, keys):
+        """Return ``{key: object_id}`` for keys stored earlier in this import."""
+        keys = {key for key in keys if key}
+        if not keys:
+            return {}
+        return dict(ImportedRecord.objects.filter(kind=kind, key__in=keys).values_list('key', 'object_id'))
+
+    def save_state(self):
+        tmp_path = f'{self.state_path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(self.state, fh)
+        os.replace(tmp_path, self.state_path)
+
+    def flush(self, buffers, processed):
+        """Write every buffered record in one transaction, then checkpoint."""
+        with transaction.atomic():
+            self.import_authors(buffers['author'])
+            self.import_terms(Category, buffers['category'])
+            self.import_terms(Tag, buffers['tag'])
+            self.import_attachments(buffers['attachment'])
+            self.import_content(Post, buffers['post'])
+            self.import_content(Page, buffers['page'])
+        for records in buffers.values():
+            records.clear()
+        self.state['processed'] = processed
+        self.save_state()
+
+    # Writers
+
+    def import_authors(self, records):
+        if not records:
+            return
+        emails = {
+            record['login']: (record['email'] or f"{slugify(record['login'])}@wordpress.invalid").lower()
+            for record in records
+        }
+        # Match existing accounts whatever the case of their address.
+        ids = self.user_ids(emails.values())
+        User.objects.bulk_create(
+            [
+                User(
+                    email=emails[record['login']],
+                    first_name=record['first_name'][:150],
+                    last_name=record['last_name'][:150],
+                    role=User.Role.AUTHOR,
+                    password=make_password(None),
+                )
+                for record in records
+                if emails[record['login']] not in ids
+            ],
+            ignore_conflicts=True,
+        )
+        ids.update(self.user_ids(email for email in emails.values() if email not in ids))
+        self.remember(
+            ImportedRecord.Kind.AUTHOR,
+            [(login, ids[email], None, None) for login, email in emails.items()],
+        )
+
+    def user_ids(self, emails):
+        """Return ``{lowercased email: user id}`` for existing users."""
+        emails = set(emails)
+        if not emails:
+            return {}
+        return dict(
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=emails)
+            .order_by('pk')
+            .values_list('email_lower', 'id')
+        )
+
+    def import_terms(self, model, records):
+        max_length = slug_length(model)
+        objects = {}
+        parents = {}
+        for record in records:
+            slug = import_slug(record['slug'], max_length)
+            if not slug:
+                continue
+            obj = model(name=record['name'][:model._meta.get_field('name').max_length], slug=slug)
+            if model is Category:
+                obj.description = record.get('description', '')
+                if record.get('parent'):
+                    parents[slug] = import_slug(record['parent'], max_length)
+            objects[slug] = obj
+        if not objects:
+            return
+
+        update_fields = ['name', 'description', 'updated_at'] if model is Category else ['name']
+        model.objects.bulk_create(
+            list(objects.values()),
+            update_conflicts=True,
+            unique_fields=['slug'],
+            update_fields=update_fields,
+        )
+        if model is Category:
+            ids = dict(Category.objects.filter(slug__in=objects).values_list('slug', 'id'))
+            self.remember(
+                ImportedRecord.Kind.CATEGORY,
+                [(slug, ids[slug], parents.get(slug), None) for slug in objects],
+            )
+
+    def ensure_terms(self, model, terms):
+        """Return ``{WordPress slug: id}`` for item-level terms, creating any missing ones."""
+        max_length = slug_length(model)
+        slugs = {wp_slug: import_slug(wp_slug, max_length) for wp_slug, name in terms if wp_slug}
+        names = {slugs[wp_slug]: name for wp_slug, name in terms if slugs.get(wp_slug)}
+        if not names:
+            return {}
+        ids = dict(model.objects.filter(slug__in=names).values_list('slug', 'id'))
+        missing = [slug for slug in names if slug not in ids]
+        if missing:
+            name_length = model._meta.get_field('name').max_length
+            model.objects.bulk_create(
+                [model(slug=slug, name=(names[slug] or slug)[:name_length]) for slug in missing],
+                ignore_conflicts=True,
+            )
+            ids.update(model.objects.filter(slug__in=missing).values_list('slug', 'id'))
+        return {wp_slug: ids[slug] for wp_slug, slug in slugs.items() if slug in ids}
+
+    def media_name(self, url):
+        """Map an attachment URL onto its expected path under MEDIA_ROOT."""
+        marker = 'wp-content/uploads/'
+        relative = url.split(marker, 1)[1] if marker in url else url.rsplit('/', 1)[-1]
+        return f'{self.media_prefix}/{relative}' if self.media_prefix else relative
+
+    def import_attachments(self, records):
+        records = [record for record in records if record['url']]
+        if not records:
+            return
+        names = {record['wp_id']: self.media_name(record['url']) for record in records}
+        existing = set(Media.objects.filter(file__in=names.values()).values_list('file', flat=True))
+        users = self.recall(ImportedRecord.Kind.AUTHOR, [record['author'] for record in records])
+
+        new_media = []
+        for record in records:
+            name = names[record['wp_id']]
+            if name in existing:
+                continue
+            existing.add(name)
+            try:
+                size = default_storage.size(name)
+            except (OSError, NotImplementedError):
+                size = 0
+            new_media.append(Media(
+                file=name,
+                title=record['title'][:255],
+                caption=record['excerpt'],
+                media_type=get_media_type(name),
+                file_size=size,
+                uploaded_by_id=users.get(record['author']),
+            ))
+        Media.objects.bulk_create(new_media, batch_size=self.batch_size)
+
+        ids = dict(Media.objects.filter(file__in=names.values()).values_list('file', 'id'))
+        self.remember(
+            ImportedRecord.Kind.ATTACHMENT,
+            [(wp_id, ids[name], None, None) for wp_id, name in names.items()],
+        )
+
+    def import_content(self, model, records):
+        users = self.recall(ImportedRecord.Kind.AUTHOR, [record['author'] for record in records])
+        max_length = slug_length(model)
+        objects = {}
+        for record in records:
+            status = WP_STATUSES.get(record['status'])
+            if status is None:
+                continue
+            slug = import_slug(
+                record['slug'] or f"{slugify(record['title']) or 'untitled'}-{record['wp_id']}", max_length
+            )
+            published_at = record['published_at']
+            if status == model.Status.PUBLISHED and not published_at:
+                published_at = timezone.now()
+
+            obj = model(
+                title=(record['title'] or slug)[:255],
+                slug=slug,
+                excerpt=record['excerpt'],
+                content=html_to_quill(record['content']),
+                author_id=users.get(record['author']),
+                status=status,
+                published_at=published_at,
+            )
+            if model is Page:
+                obj.menu_order = max(record['menu_order'], 0)
+            # Later records win when an export repeats a slug.
+            objects[slug] = (obj, record)
+
+        if not objects:
+            return
+
+        update_fields = ['title', 'excerpt', 'content', 'author', 'status', 'published_at', 'updated_at']
+        if model is Page:
+            update_fields.append('menu_order')
+        model.objects.bulk_create(
+            [obj for obj, record in objects.values()],
+            update_conflicts=True,
+            unique_fields=['slug'],
+            update_fields=update_fields,
+            batch_size=self.batch_size,
+        )
+        ids = dict(model.objects.filter(slug__in=objects).values_list('slug', 'id'))
+
+        self.remember(
+            ImportedRecord.Kind.PAGE if model is Page else ImportedRecord.Kind.POST,
+            [
+                (
+                    record['wp_id'] or f'slug:{slug}',
+                    ids[slug],
+                    record['parent'] if model is Page and record['parent'] not in ('', '0') else None,
+                    record['thumbnail'],
+                )
+                for slug, (obj, record) in objects.items()
+            ],
+        )
+
+        if model is Post:
+            self.link_terms(ids, objects, 'categories', Category)
+            self.link_terms(ids, objects, 'tags', Tag)
+
+        published = [ids[slug] for slug, (obj, record) in objects.items() if obj.status == model.Status.PUBLISHED]
+        if published:
+            content_published.send(sender=model, pks=published)
+
+    def link_terms(self, ids, objects, field_name, term_model):
+        """Insert post/term through-table rows for a batch in bulk."""
+        term_ids = self.ensure_terms(
+            term_model,
+            [term for obj, record in objects.values() for term in record[field_name]],
+        )
+        through = getattr(Post, field_name).through
+        term_column = f'{term_model._meta.model_name}_id'
+        rows = [
+            through(**{'post_id': ids[slug], term_column: term_ids[term_slug]})
+            for slug, (obj, record) in objects.items()
+            for term_slug, name in record[field_name]
+            if term_slug in term_ids
+        ]
+        through.objects.bulk_create(rows, ignore_conflicts=True, batch_size=self.batch_size)
+
+    # Deferred relations (parents may appear after their children)
+
+    def imported(self, kinds, **filters):
+        """Yield batches of this import's ImportedRecord rows, in key order."""
+        queryset = ImportedRecord.objects.filter(kind__in=kinds, **filters).order_by('pk')
+        last_pk = 0
+        while batch := list(queryset.filter(pk__gt=last_pk)[:self.batch_size]):
+            yield batch
+            last_pk = batch[-1].pk
+
+    def link_relations(self):
+        Kind = ImportedRecord.Kind
+        with transaction.atomic():
+            for rows in self.imported([Kind.CATEGORY], parent__gt=''):
+                ids = dict(Category.objects.filter(slug__in={row.parent for row in rows}).values_list('slug', 'id'))
+                Category.objects.bulk_update(
+                    [Category(id=row.object_id, parent_id=ids[row.parent]) for row in rows
+                     if row.parent in ids and ids[row.parent] != row.object_id],
+                    ['parent'],
+                )
+
+            for rows in self.imported([Kind.PAGE], parent__gt=''):
+                ids = self.recall(Kind.PAGE, [row.parent for row in rows])
+                Page.objects.bulk_update(
+                    [Page(id=row.object_id, parent_id=ids[row.parent]) for row in rows if row.parent in ids],
+                    ['parent'],
+                )
+            Category.rebuild_paths(self.batch_size)
+            Page.rebuild_paths(self.batch_size)
+
+            models = {Kind.POST: Post, Kind.PAGE: Page}
+            for rows in self.imported([Kind.POST, Kind.PAGE], thumbnail__gt=''):
+                media = self.recall(Kind.ATTACHMENT, [row.thumbnail for row in rows])
+                for kind, model in models.items():
+                    model.objects.bulk_update(
+                        [model(id=row.object_id, featured_image_id=media[row.thumbnail])
+                         for row in rows if row.kind == kind and row.thumbnail in media],
+                        ['featured_image'],
+                    )
+
+    def sync_media_usage(self):
+        """Index the media imported posts and pages use; bulk writes skip the save() hooks."""
+        models = {ImportedRecord.Kind.POST: Post, ImportedRecord.Kind.PAGE: Page}
+        for rows in self.imported(list(models)):
+            for kind, model in models.items():
+                pks = [row.object_id for row in rows if row.kind == kind]
+                for obj in model.objects.filter(pk__in=pks).only('pk', 'featured_image', 'content'):
+                    sync_usage(obj)
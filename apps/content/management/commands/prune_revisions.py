@@ -0,0 +1,29 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.content.models import Revision
+from apps.content.revisions import thin_revisions
+
+
+class Command(BaseCommand):
+    help = 'Thin old post and page revisions to one per day, keeping recent ones intact.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Keep every revision from the last N days.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        # Objects with revisions older than the cutoff; the rest are untouched.
+        objects = (
+            Revision.objects.filter(created_at__lt=cutoff)
+            .order_by()
+            .values_list('content_type_id', 'object_id')
+            .distinct()
+        )
+        deleted = 0
+        for content_type_id, object_id in list(objects):
+            revisions = Revision.objects.filter(content_type_id=content_type_id, object_id=object_id)
+            deleted += thin_revisions(revisions, cutoff)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} revisions.'))
@@ -0,0 +1,77 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+from django.utils import timezone
+
+from apps.content.models import Page, Post
+from apps.content.signals import content_published
+
+logger = logging.getLogger(__name__)
+
+# Longest wait, in seconds, between polls while the database is unreachable.
+MAX_BACKOFF = 600
+
+
+def publish_due(model, batch_size):
+    """Publish up to ``batch_size`` due items of ``model``; return how many were published."""
+    now = timezone.now()
+    with transaction.atomic():
+        # Served by the (status, published_at) index. Rows another scheduler
+        # has locked are skipped, and the lock keeps editors from changing
+        # these rows until the UPDATE commits, so every pk here is published
+        # by this run.
+        pks = list(
+            model.objects.select_for_update(skip_locked=True)
+            .filter(status=model.Status.SCHEDULED, published_at__lte=now)
+            .order_by('published_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return 0
+        model.objects.filter(pk__in=pks).update(
+            status=model.Status.PUBLISHED,
+            updated_at=now,
+        )
+    content_published.send(sender=model, pks=pks)
+    return len(pks)
+
+
+class Command(BaseCommand):
+    help = 'Publish scheduled posts and pages whose publish date has passed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Items published per UPDATE.')
+        parser.add_argument('--loop', action='store_true', help='Keep running and poll for due items.')
+        parser.add_argument('--interval', type=float, default=60, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        failures = 0
+        while True:
+            # Drop connections past CONN_MAX_AGE or broken by a database
+            # restart, so a long --loop reconnects instead of failing forever.
+            close_old_connections()
+            try:
+                self.publish(options['batch_size'])
+            except (OperationalError, InterfaceError):
+                if not options['loop']:
+                    raise
+                failures += 1
+                delay = min(options['interval'] * 2 ** failures, MAX_BACKOFF)
+                logger.exception('Database unavailable; retrying in %.0f seconds.', delay)
+                time.sleep(delay)
+                continue
+            failures = 0
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def publish(self, batch_size):
+        for model in (Post, Page):
+            while True:
+                published = publish_due(model, batch_size)
+                if published:
+                    self.stdout.write(f'Published {published} {model._meta.verbose_name_plural}.')
+                if published < batch_size:
+                    break
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.content.models import Category, Page
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized page and category paths from the parent links.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per UPDATE.')
+
+    def handle(self, *args, **options):
+        for model in (Page, Category):
+            with transaction.atomic():
+                changed = model.rebuild_paths(options['batch_size'])
+            self.stdout.write(f'{model._meta.verbose_name_plural.capitalize()}: {changed} paths updated.')
+        self.stdout.write(self.style.SUCCESS('Trees repaired.'))
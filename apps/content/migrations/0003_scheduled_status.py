@@ -0,0 +1,55 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="page",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("draft", "Draft"),
+                    ("pending", "Pending Review"),
+                    ("scheduled", "Scheduled"),
+                    ("published", "Published"),
+                    ("archived", "Archived"),
+                ],
+                default="draft",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("draft", "Draft"),
+                    ("pending", "Pending Review"),
+                    ("scheduled", "Scheduled"),
+                    ("published", "Published"),
+                    ("archived", "Archived"),
+                ],
+                default="draft",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="page",
+            index=models.Index(
+                fields=["status", "published_at"], name="page_status_published_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["status", "published_at"], name="post_status_published_idx"
+            ),
+        ),
+    ]
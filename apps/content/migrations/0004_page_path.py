@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:12
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    Page = apps.get_model("content", "Page")
+    parents = dict(Page.objects.values_list("pk", "parent_id"))
+    children = {}
+    for pk, parent_id in parents.items():
+        children.setdefault(parent_id, []).append(pk)
+
+    pages = []
+    level = [(pk, "/") for pk in children.get(None, [])]
+    while level:
+        next_level = []
+        for pk, parent_path in level:
+            path = f"{parent_path}{pk}/"
+            pages.append(Page(pk=pk, path=path))
+            next_level.extend((child, path) for child in children.get(pk, []))
+        level = next_level
+    # Pages caught in a parent loop keep an empty path; repair_trees fixes them.
+    Page.objects.bulk_update(pages, ["path"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0003_scheduled_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="page",
+            name="path",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:13
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    Category = apps.get_model("content", "Category")
+    parents = dict(Category.objects.values_list("pk", "parent_id"))
+    children = {}
+    for pk, parent_id in parents.items():
+        children.setdefault(parent_id, []).append(pk)
+
+    categories = []
+    level = [(pk, "/") for pk in children.get(None, [])]
+    while level:
+        next_level = []
+        for pk, parent_path in level:
+            path = f"{parent_path}{pk}/"
+            categories.append(Category(pk=pk, path=path))
+            next_level.extend((child, path) for child in children.get(pk, []))
+        level = next_level
+    Category.objects.bulk_update(categories, ["path"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0004_page_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:15
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def count_months(apps, schema_editor):
+    Post = apps.get_model("content", "Post")
+    ArchiveMonth = apps.get_model("content", "ArchiveMonth")
+    counts = (
+        Post.objects.filter(status="published", published_at__isnull=False)
+        .annotate(period=TruncMonth("published_at"))
+        .order_by()
+        .values("period")
+        .annotate(count=Count("pk"))
+    )
+    ArchiveMonth.objects.bulk_create(
+        [
+            ArchiveMonth(
+                year=row["period"].year,
+                month=row["period"].month,
+                post_count=row["count"],
+            )
+            for row in counts
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0005_category_path"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchiveMonth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("post_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "archive month",
+                "verbose_name_plural": "archive months",
+                "ordering": ["-year", "-month"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("year", "month"), name="archivemonth_year_month_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(count_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.15 on 2026-10-19 04:10
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def schedule_future_published(apps, schema_editor):
+    """Move published items dated in the future to scheduled, as save() now does."""
+    now = timezone.now()
+    moved = 0
+    for name in ("Post", "Page"):
+        model = apps.get_model("content", name)
+        moved += model.objects.filter(status="published", published_at__gt=now).update(
+            status="scheduled"
+        )
+    if not moved:
+        return
+
+    # Future posts were counted in the archive; recount it.
+    Post = apps.get_model("content", "Post")
+    ArchiveMonth = apps.get_model("content", "ArchiveMonth")
+    counts = (
+        Post.objects.filter(status="published", published_at__isnull=False)
+        .annotate(period=TruncMonth("published_at"))
+        .order_by()
+        .values("period")
+        .annotate(count=Count("pk"))
+    )
+    ArchiveMonth.objects.all().delete()
+    ArchiveMonth.objects.bulk_create(
+        [
+            ArchiveMonth(
+                year=row["period"].year,
+                month=row["period"].month,
+                post_count=row["count"],
+            )
+            for row in counts
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0008_draft"),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_future_published, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0009_schedule_future_published"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportedRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("author", "Author"),
+                            ("category", "Category"),
+                            ("attachment", "Attachment"),
+                            ("post", "Post"),
+                            ("page", "Page"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("key", models.CharField(max_length=255)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("parent", models.CharField(blank=True, max_length=255)),
+                ("thumbnail", models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                "verbose_name": "imported record",
+                "verbose_name_plural": "imported records",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "key"), name="importedrecord_kind_key_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,12 +1,138 @@
+import datetime
+
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Concat, Length, Substr
 from django.urls import reverse
 from django.conf import settings
 from django.utils import timezone
 from django.utils.text import slugify
 from django_quill.fields import QuillField
 
+from .inline_images import extract_inline_images
+
+
+class TreeNode(models.Model):
+    """
+    Abstract materialized-path tree over a ``parent`` self-foreign key.
+
+    ``path`` holds the primary keys from the root down to the node, e.g.
+    ``/3/17/42/``. Ancestors are looked up by primary key and descendants
+    with an indexed prefix match, so each is a single query however deep the
+    tree is. Subclasses must define ``parent``; paths are kept in sync on
+    save, and ``rebuild_paths()`` recomputes them from the parent links.
+    """
+    path = models.CharField(max_length=255, db_index=True, editable=False, default='')
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_parent_id = dict(zip(field_names, values)).get('parent_id')
+        return instance
+    
+    @property
+    def depth(self):
+        return self.path.count('/') - 2
+    
+    def clean(self):
+        super().clean()
+        try:
+            self._parent_path()
+        except ValueError as error:
+            raise ValidationError({'parent': str(error)})
+    
+    def save(self, *args, **kwargs):
+        moved = not self.path or self.parent_id != getattr(self, '_loaded_parent_id', None)
+        if moved:
+            parent_path = self._parent_path()
+        super().save(*args, **kwargs)
+        if moved:
+            self._move_subtree(f'{parent_path}{self.pk}/')
+        self._loaded_parent_id = self.parent_id
+    
+    def _parent_path(self):
+        if not self.parent_id:
+            return '/'
+        parent_path = type(self).objects.filter(pk=self.parent_id).values_list('path', flat=True).get()
+        if self.path and parent_path.startswith(self.path):
+            raise ValueError(f'{self} cannot be moved below itself.')
+        return parent_path
+    
+    def _move_subtree(self, new_path):
+        """Set this node's path and rewrite its descendants' in one UPDATE."""
+        old_path = self.path
+        if old_path == new_path:
+            return
+        if old_path:
+            type(self).objects.filter(path__startswith=old_path).update(
+                path=Concat(models.Value(new_path), Substr('path', len(old_path) + 1)),
+            )
+        else:
+            type(self).objects.filter(pk=self.pk).update(path=new_path)
+        self.path = new_path
+    
+    def reroot_descendants(self):
+        """Fix paths below a deleted node, whose children became roots."""
+        model = type(self)
+        marker = f'/{self.pk}/'
+        orphans = list(model.objects.filter(path__contains=marker).only('pk', 'path'))
+        for node in orphans:
+            node.path = node.path[node.path.index(marker) + len(marker) - 1:]
+        model.objects.bulk_update(orphans, ['path'], batch_size=500)
+    
+    @classmethod
+    def rebuild_paths(cls, batch_size=500):
+        """
+        Recompute every path from the parent links, one tree level at a time.
+        
+        A node whose parent chain loops back on itself is detached and becomes
+        a root. Returns the number of nodes whose path changed.
+        """
+        parents = dict(cls.objects.values_list('pk', 'parent_id'))
+        children = {}
+        for pk, parent_id in parents.items():
+            children.setdefault(parent_id if parent_id in parents else None, []).append(pk)
+        
+        paths = {}
+        level = [(pk, '/') for pk in children.get(None, [])]
+        while level:
+            next_level = []
+            for pk, parent_path in level:
+                paths[pk] = f'{parent_path}{pk}/'
+                next_level.extend((child, paths[pk]) for child in children.get(pk, []))
+            level = next_level
+        
+        unreached = [pk for pk in parents if pk not in paths]
+        if unreached:
+            # Only nodes on or below a parent loop are unreachable; break one
+            # loop and try again.
+            cls.objects.filter(pk=min(unreached)).update(parent=None)
+            return cls.rebuild_paths(batch_size)
+        
+        current = dict(cls.objects.values_list('pk', 'path'))
+        stale = [cls(pk=pk, path=path) for pk, path in paths.items() if current[pk] != path]
+        cls.objects.bulk_update(stale, ['path'], batch_size=batch_size)
+        return len(stale)
+    
+    def get_ancestors(self):
+        """Ancestors from the root down, in one primary key lookup."""
+        pks = [int(pk) for pk in self.path.strip('/').split('/')[:-1]]
+        return type(self).objects.filter(pk__in=pks).order_by(Length('path'))
+    
+    def get_descendants(self):
+        """The whole subtree below this node, grouped by branch."""
+        return type(self).objects.filter(path__startswith=self.path).exclude(pk=self.pk).order_by('path')
+    
+    def get_siblings(self):
+        return type(self).objects.filter(parent_id=self.parent_id).exclude(pk=self.pk)
+
 
-class Category(models.Model):
+class Category(TreeNode):
     """Category model for organizing content."""
     name = models.CharField(max_length=100)
     slug = models.SlugField(max_length=100, unique=True)
@@ -67,6 +193,7 @@ class ContentBase(models.Model):
     class Status(models.TextChoices):
         DRAFT = 'draft', 'Draft'
         PENDING = 'pending', 'Pending Review'
+        SCHEDULED = 'scheduled', 'Scheduled'
         PUBLISHED = 'published', 'Published'
         ARCHIVED = 'archived', 'Archived'
     
@@ -117,13 +244,39 @@ class ContentBase(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
     
+    # Saved versions of the text, deleted along with the object
+    revisions = GenericRelation('content.Revision')
+    # Autosaved editor text that has not been saved yet
+    drafts = GenericRelation('content.Draft')
+    # Media files this object uses, for "where is this used" lookups
+    media_usages = GenericRelation('media_library.MediaUsage')
+    
     class Meta:
         abstract = True
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            # Used by listings and by the scheduler to find due items
+            models.Index(fields=['status', 'published_at'], name='%(class)s_status_published_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status and date so save() and the archive
+        # receivers can tell when content gets published or moves month
+        loaded = dict(zip(field_names, values))
+        instance._loaded_status = loaded.get('status')
+        instance._loaded_published_at = loaded.get('published_at')
+        return instance
+    
+    def clean(self):
+        super().clean()
+        if self.status == self.Status.SCHEDULED and not self.published_at:
+            raise ValidationError({'published_at': 'Scheduled content needs a publish date.'})
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
@@ -132,7 +285,22 @@ class ContentBase(models.Model):
         if self.status == self.Status.PUBLISHED and not self.published_at:
             self.published_at = timezone.now()
         
+        # Publishing with a future date schedules the content instead
+        if self.status == self.Status.PUBLISHED and self.published_at > timezone.now():
+            self.status = self.Status.SCHEDULED
+        
+        # Pasted images arrive as base64 data URIs; store them as media files
+        update_fields = kwargs.get('update_fields')
+        if 'content' in self.__dict__ and (update_fields is None or 'content' in update_fields):
+            content = self.content.json_string
+            extracted = extract_inline_images(content, uploaded_by_id=self.author_id)
+            if extracted != content:
+                self.content = extracted
+        
         super().save(*args, **kwargs)
+        
+        self._loaded_status = self.status
+        self._loaded_published_at = self.published_at
     
     def get_seo_title(self):
         """Return the SEO title or fall back to regular title."""
@@ -172,7 +340,7 @@ class Post(ContentBase):
         return reverse('content:post_detail', kwargs={'slug': self.slug})
 
 
-class Page(ContentBase):
+class Page(ContentBase, TreeNode):
     """Static page model (like About, Contact, etc.)."""
     
     # Page template
@@ -216,3 +384,136 @@ class Page(ContentBase):
     def get_template_name(self):
         """Return the template file name based on template choice."""
         return f'pages/{self.template}.html'
+
+
+class ArchiveMonth(models.Model):
+    """Number of published posts in one calendar month, for the blog archive."""
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    post_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'archive month'
+        verbose_name_plural = 'archive months'
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='archivemonth_year_month_unique'),
+        ]
+    
+    def __str__(self):
+        return f'{self.year}-{self.month:02d}'
+    
+    @property
+    def date(self):
+        return datetime.date(self.year, self.month, 1)
+    
+    def get_absolute_url(self):
+        return reverse('content:post_archive_month', kwargs={'year': self.year, 'month': self.month})
+
+
+class Revision(models.Model):
+    """
+    One saved version of a post's or page's text.
+
+    ``data`` is either a full snapshot or a diff against the previous
+    revision; see ``apps.content.revisions`` for the format.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    data = models.BinaryField()
+    checksum = models.CharField(max_length=40)
+    title = models.CharField(max_length=255, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='revisions'
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'revision'
+        verbose_name_plural = 'revisions'
+        ordering = ['-number']
+        constraints = [
+            # Also the index used to rebuild a revision from its chain
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id', 'number'], name='revision_object_number_unique'
+            ),
+        ]
+    
+    def __str__(self):
+        return f'{self.title} (revision {self.number})'
+
+
+class Draft(models.Model):
+    """
+    Autosaved, not yet saved text of a post or page.
+
+    ``ops`` is the Quill delta of the whole document as JSON. ``version``
+    goes up by one for every change applied; see ``apps.content.autosave``.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    version = models.PositiveIntegerField(default=0)
+    ops = models.TextField()
+    updated_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='drafts'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'draft'
+        verbose_name_plural = 'drafts'
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='draft_object_unique'),
+        ]
+    
+    def __str__(self):
+        return f'Draft of {self.content_type.model} {self.object_id} (version {self.version})'
+
+
+class ImportedRecord(models.Model):
+    """
+    A record of the WordPress import in progress and the row it became.
+
+    ``import_wordpress`` keeps its mappings (author logins, category slugs
+    and WordPress item IDs to primary keys) and the relations it links at
+    the end (parents, featured images) here rather than in memory, so a
+    long import stays small and can resume. The table is emptied when an
+    import starts over or finishes.
+    """
+    
+    class Kind(models.TextChoices):
+        AUTHOR = 'author', 'Author'
+        CATEGORY = 'category', 'Category'
+        ATTACHMENT = 'attachment', 'Attachment'
+        POST = 'post', 'Post'
+        PAGE = 'page', 'Page'
+    
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    # Author login, category slug or WordPress post ID
+    key = models.CharField(max_length=255)
+    object_id = models.PositiveBigIntegerField()
+    # Key of the parent category or page, and of the featured attachment
+    parent = models.CharField(max_length=255, blank=True)
+    thumbnail = models.CharField(max_length=255, blank=True)
+    
+    class Meta:
+        verbose_name = 'imported record'
+        verbose_name_plural = 'imported records'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='importedrecord_kind_key_unique'),
+        ]
+    
+    def __str__(self):
+        return f'{self.kind} {self.key}'
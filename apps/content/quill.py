@@ -0,0 +1,148 @@
+"""
+Helpers for building Quill content outside the editor.
+
+``QuillField`` stores a JSON string ``{"delta": "<ops JSON>", "html": "..."}``
+where ``delta`` is itself the JSON-encoded ``{"ops": [...]}`` document the
+editor produces. These helpers build that structure from HTML so imported
+or generated content opens cleanly in the editor.
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+
+
+INLINE_FORMATS = {
+    'b': ('bold', True),
+    'strong': ('bold', True),
+    'i': ('italic', True),
+    'em': ('italic', True),
+    'u': ('underline', True),
+    's': ('strike', True),
+    'strike': ('strike', True),
+    'del': ('strike', True),
+    'code': ('code', True),
+    'sub': ('script', 'sub'),
+    'sup': ('script', 'super'),
+}
+
+BLOCK_TAGS = {'p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'blockquote', 'pre', 'figure', 'figcaption'}
+
+BLOCK_LEVEL_RE = re.compile(r'<(p|div|h[1-6]|ul|ol|li|blockquote|pre|figure|table)[\s>]', re.IGNORECASE)
+
+
+def quill_json(ops, html):
+    """Return the string stored in a ``QuillField`` for the given delta ops and HTML."""
+    return json.dumps({'delta': json.dumps({'ops': ops}), 'html': html})
+
+
+def autop(text):
+    """Wrap blank-line separated text in paragraphs, as WordPress does on display."""
+    if BLOCK_LEVEL_RE.search(text):
+        return text
+    paragraphs = [chunk.strip() for chunk in re.split(r'\n\s*\n', text) if chunk.strip()]
+    return ''.join(f'<p>{chunk.replace(chr(10), "<br>")}</p>' for chunk in paragraphs)
+
+
+class DeltaBuilder(HTMLParser):
+    """Translate a subset of HTML into Quill delta operations."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ops = []
+        self.inline = []
+        self.lists = []
+        self.block = {}
+        self.in_pre = False
+        self.at_line_start = True
+
+    def _attributes(self):
+        return dict(self.inline)
+
+    def _insert(self, value, attributes=None):
+        op = {'insert': value}
+        if attributes:
+            op['attributes'] = attributes
+        self.ops.append(op)
+
+    def _newline(self):
+        self._insert('\n', dict(self.block))
+        self.at_line_start = True
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in INLINE_FORMATS:
+            self.inline.append(INLINE_FORMATS[tag])
+        elif tag == 'a':
+            self.inline.append(('link', attrs.get('href', '')))
+        elif tag in ('ul', 'ol'):
+            self.lists.append('ordered' if tag == 'ol' else 'bullet')
+        elif tag == 'br':
+            self._newline()
+        elif tag == 'img' and attrs.get('src'):
+            self._insert({'image': attrs['src']})
+            self.at_line_start = False
+        elif tag == 'iframe' and attrs.get('src'):
+            self._insert({'video': attrs['src']})
+            self.at_line_start = False
+        elif tag in BLOCK_TAGS:
+            if not self.at_line_start:
+                self._newline()
+            if tag[0] == 'h' and tag[1:].isdigit():
+                self.block = {'header': int(tag[1:])}
+            elif tag == 'li':
+                self.block = {'list': self.lists[-1] if self.lists else 'bullet'}
+            elif tag == 'blockquote':
+                self.block = {'blockquote': True}
+            elif tag == 'pre':
+                self.block = {'code-block': True}
+                self.in_pre = True
+
+    def handle_endtag(self, tag):
+        if tag in INLINE_FORMATS or tag == 'a':
+            if self.inline:
+                self.inline.pop()
+        elif tag in ('ul', 'ol'):
+            if self.lists:
+                self.lists.pop()
+        elif tag in BLOCK_TAGS:
+            if not self.at_line_start or self.block:
+                self._newline()
+            self.block = {}
+            if tag == 'pre':
+                self.in_pre = False
+
+    def handle_data(self, data):
+        if self.in_pre:
+            for index, line in enumerate(data.split('\n')):
+                if index:
+                    self._newline()
+                if line:
+                    self._insert(line, self._attributes())
+                    self.at_line_start = False
+            return
+        text = re.sub(r'\s+', ' ', data)
+        if self.at_line_start:
+            text = text.lstrip()
+        if text:
+            self._insert(text, self._attributes())
+            self.at_line_start = False
+
+    def result(self):
+        if not self.at_line_start or not self.ops:
+            self._newline()
+        return self.ops
+
+
+def html_to_delta(html):
+    """Return Quill delta ops approximating ``html``."""
+    builder = DeltaBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.result()
+
+
+def html_to_quill(html):
+    """Return a ``QuillField`` value for an HTML fragment."""
+    html = autop(html or '')
+    return quill_json(html_to_delta(html), html)
@@ -0,0 +1,117 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.media_library.models import Media
+from apps.media_library.usage import sync_usage
+from apps.users.models import User
+
+from .archive import month_of, refresh_months
+from .cache import bump_content_version
+from .models import Category, Page, Post, Tag
+from .revisions import record_revision
+from .signals import content_published, content_updated
+from .suggest import record_change
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Page)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Page)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(content_published)
+@receiver(content_updated)
+def content_changed(sender, **kwargs):
+    """Invalidate every cached content fragment."""
+    # m2m_changed fires before and after each change; only count it once.
+    action = kwargs.get('action')
+    if action is None or action.startswith('post_'):
+        bump_content_version()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Media)
+def displayed_object_changed(sender, created=False, update_fields=None, **kwargs):
+    """Cached cards show author names and featured images; invalidate them too."""
+    # Nothing cached shows a new object yet, and logging in only saves last_login.
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    bump_content_version()
+
+
+@receiver(post_delete, sender=Page)
+@receiver(post_delete, sender=Category)
+def tree_node_deleted(sender, instance, **kwargs):
+    """Children become roots when their parent is deleted; fix their paths."""
+    instance.reroot_descendants()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    """Recount the archive months a post enters or leaves."""
+    was_published = getattr(instance, '_loaded_status', None) == Post.Status.PUBLISHED
+    if was_published or instance.status == Post.Status.PUBLISHED:
+        refresh_months([month_of(instance.published_at), month_of(getattr(instance, '_loaded_published_at', None))])
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    if instance.status == Post.Status.PUBLISHED:
+        refresh_months([month_of(instance.published_at)])
+
+
+@receiver(content_published, sender=Post)
+@receiver(content_updated, sender=Post)
+def posts_changed_in_bulk(sender, pks, **kwargs):
+    """The scheduler, importer and bulk actions skip post_save and send these instead."""
+    dates = Post.objects.filter(pk__in=pks).values_list('published_at', flat=True)
+    refresh_months(month_of(published_at) for published_at in dates)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Page)
+def content_revised(sender, instance, raw=False, **kwargs):
+    """Record a revision when the text changed; admin saves set ``_revision_user``."""
+    if not raw:
+        record_revision(instance, user=getattr(instance, '_revision_user', None))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Page)
+def media_usage_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Re-index the media files used by the featured image and the content.
+
+    This runs inside the save, not in the job queue: deleting a file is
+    refused while it is in use, which needs the index to be current.
+    """
+    if raw or (update_fields is not None and not {'content', 'featured_image'} & set(update_fields)):
+        return
+    sync_usage(instance)
+
+
+SUGGEST_KINDS = {Post: 'post', Page: 'page', Category: 'category', Tag: 'tag'}
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Page)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Page)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def suggestion_changed(sender, instance, **kwargs):
+    record_change(SUGGEST_KINDS[sender], [instance.pk])
+
+
+@receiver(content_published)
+@receiver(content_updated)
+def suggestions_changed_in_bulk(sender, pks, **kwargs):
+    record_change(SUGGEST_KINDS[sender], pks)
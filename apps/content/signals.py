@@ -0,0 +1,13 @@
+from django.dispatch import Signal
+
+# Both signals stand in for post_save after a set-based change that bypassed
+# save(): the scheduler, the importer and bulk admin actions. ``sender`` is
+# the model class (Post or Page) and ``pks`` the primary keys changed.
+# Receivers refresh whatever depends on those rows once for the whole batch.
+# A single save() sends neither; listen to post_save for that.
+
+# Sent when the change made the rows publicly visible.
+content_published = Signal()
+
+# Sent for any other set-based change.
+content_updated = Signal()
@@ -0,0 +1,222 @@
+"""
+In-memory prefix index for search-as-you-type suggestions.
+
+Each worker keeps a sorted array of normalized keys (every title indexed
+from each of its words, so "tips" finds "Django tips") and answers a prefix
+with a binary search. Nothing touches the database per keystroke.
+
+The index is built when the WSGI application loads (``warm_up``), so no
+request waits for it; with ``gunicorn --preload`` the workers inherit the
+master's copy. Content changes are appended to a short journal in the
+shared cache (see ``apps.content.receivers``). Before answering, a worker
+replays any entries it has not seen and reloads only those items. If it
+has fallen too far behind, it rebuilds from scratch.
+
+Other workers only see the journal through a shared cache. Without one
+(``SHARED_CACHE`` is off), suggestions are looked up in the database on
+each request instead.
+"""
+
+import heapq
+import logging
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Q
+
+from .models import Category, Page, Post, Tag
+
+
+JOURNAL_SEQ_KEY = 'suggest:seq'
+JOURNAL_LENGTH = 500
+
+SOURCES = {
+    'post': Post,
+    'page': Page,
+    'category': Category,
+    'tag': Tag,
+}
+
+WORD_RE = re.compile(r'[^\w]+')
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse punctuation to single spaces."""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return WORD_RE.sub(' ', text.casefold()).strip()
+
+
+def index_keys(title):
+    words = normalize(title).split()
+    return {' '.join(words[start:]) for start in range(len(words))}
+
+
+def suggestible(kind):
+    """Return the queryset of suggestible objects of one kind and its title field."""
+    model = SOURCES[kind]
+    if kind in ('post', 'page'):
+        return model.objects.filter(status=model.Status.PUBLISHED), 'title'
+    return model.objects.all(), 'name'
+
+
+def load_items(kind, pks=None):
+    """Yield ``((kind, pk), title, url)`` for suggestible objects of one kind."""
+    queryset, title_field = suggestible(kind)
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    for obj in queryset.only('pk', 'slug', title_field).order_by():
+        yield (kind, obj.pk), getattr(obj, title_field), obj.get_absolute_url()
+
+
+class SuggestionIndex:
+    """Sorted ``keys`` with a parallel ``refs`` array of ``(kind, pk)``."""
+
+    def __init__(self):
+        self.keys = []
+        self.refs = []
+        self.items = {}
+
+    def build(self, rows):
+        entries = []
+        self.items = {}
+        for ref, title, url in rows:
+            self.items[ref] = {'type': ref[0], 'title': title, 'url': url}
+            entries.extend((key, ref) for key in index_keys(title))
+        entries.sort()
+        self.keys = [key for key, ref in entries]
+        self.refs = [ref for key, ref in entries]
+
+    def remove(self, refs):
+        refs = {ref for ref in refs if ref in self.items}
+        if not refs:
+            return
+        for ref in refs:
+            del self.items[ref]
+        kept = [(key, ref) for key, ref in zip(self.keys, self.refs) if ref not in refs]
+        self.keys = [key for key, ref in kept]
+        self.refs = [ref for key, ref in kept]
+
+    def add(self, rows):
+        """Sort the keys of ``rows`` and merge them in with one pass over the index."""
+        entries = []
+        for ref, title, url in rows:
+            self.items[ref] = {'type': ref[0], 'title': title, 'url': url}
+            entries.extend((key, ref) for key in index_keys(title))
+        if not entries:
+            return
+        entries.sort()
+        merged = list(heapq.merge(zip(self.keys, self.refs), entries))
+        self.keys = [key for key, ref in merged]
+        self.refs = [ref for key, ref in merged]
+
+    def search(self, prefix, limit=8):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results, seen = [], set()
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            ref = self.refs[position]
+            if ref not in seen:
+                seen.add(ref)
+                results.append(self.items[ref])
+                if len(results) >= limit:
+                    break
+            position += 1
+        return results
+
+
+_index = SuggestionIndex()
+_index_seq = None
+_lock = threading.Lock()
+
+
+def record_change(kind, pks):
+    """Journal changed objects so every worker reloads them."""
+    if not settings.SHARED_CACHE:
+        return
+    try:
+        seq = cache.incr(JOURNAL_SEQ_KEY)
+    except ValueError:
+        # No journal yet (or it was evicted): workers rebuild on a seq mismatch.
+        cache.add(JOURNAL_SEQ_KEY, 0, None)
+        seq = cache.incr(JOURNAL_SEQ_KEY)
+    cache.set(f'suggest:change:{seq}', (kind, list(pks)), None)
+    cache.delete(f'suggest:change:{seq - JOURNAL_LENGTH}')
+
+
+def _refresh():
+    """Bring this process's index up to date with the journal."""
+    global _index_seq
+    seq = cache.get(JOURNAL_SEQ_KEY)
+    if seq is None:
+        cache.add(JOURNAL_SEQ_KEY, 0, None)
+        seq = cache.get(JOURNAL_SEQ_KEY)
+    if seq == _index_seq:
+        return
+
+    changes = None
+    if _index_seq is not None and 0 < seq - _index_seq <= JOURNAL_LENGTH:
+        keys = [f'suggest:change:{number}' for number in range(_index_seq + 1, seq + 1)]
+        found = cache.get_many(keys)
+        if len(found) == len(keys):
+            changes = [found[key] for key in keys]
+
+    if changes is None:
+        _index.build(row for kind in SOURCES for row in load_items(kind))
+    else:
+        changed = {}
+        for kind, pks in changes:
+            changed.setdefault(kind, set()).update(pks)
+        _index.remove((kind, pk) for kind, pks in changed.items() for pk in pks)
+        _index.add(row for kind, pks in changed.items() for row in load_items(kind, pks))
+    _index_seq = seq
+
+
+def warm_up():
+    """Build the index at server start instead of on the first request."""
+    if not settings.SHARED_CACHE:
+        return
+    try:
+        with _lock:
+            _refresh()
+    except Exception:
+        # Missing tables or an unreachable cache: build on first use instead.
+        logger.exception('Could not build the suggestion index at startup.')
+    finally:
+        # A preloading server forks after this; workers must not share the socket.
+        connections.close_all()
+
+
+def search_database(prefix, limit=8):
+    """Match titles starting with ``prefix`` or with a word that does, one query per kind."""
+    prefix = ' '.join(prefix.split())
+    if not prefix:
+        return []
+    results = []
+    for kind in SOURCES:
+        queryset, title_field = suggestible(kind)
+        matches = queryset.filter(
+            Q(**{f'{title_field}__istartswith': prefix}) | Q(**{f'{title_field}__icontains': f' {prefix}'})
+        )
+        for obj in matches.only('pk', 'slug', title_field).order_by(title_field)[:limit - len(results)]:
+            results.append({'type': kind, 'title': getattr(obj, title_field), 'url': obj.get_absolute_url()})
+        if len(results) >= limit:
+            break
+    return results
+
+
+def suggest(prefix, limit=8):
+    if not settings.SHARED_CACHE:
+        return search_database(prefix, limit)
+    with _lock:
+        _refresh()
+        return _index.search(prefix, limit)
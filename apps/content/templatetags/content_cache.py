@@ -0,0 +1,60 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from apps.content.cache import get_content_version
+
+register = template.Library()
+
+
+class ContentFragmentNode(template.Node):
+    def __init__(self, nodelist, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not settings.SHARED_CACHE:
+            return self.nodelist.render(context)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(
+            f'{self.fragment_name}:{get_content_version()}',
+            vary_on,
+        )
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, settings.FRAGMENT_CACHE_TIMEOUT)
+        return value
+
+
+@register.tag('cache_fragment')
+def do_cache_fragment(parser, token):
+    """
+    Cache a template fragment until content changes.
+
+    Usage::
+
+        {% load content_cache %}
+        {% cache_fragment "post_card" post.pk %}
+            ...
+        {% endcache_fragment %}
+
+    Works like ``{% cache %}`` but the key includes the current content
+    version, so it is invalidated whenever a Post, Page, Category or Tag
+    is saved or deleted. Entries expire after ``FRAGMENT_CACHE_TIMEOUT``.
+    Without a shared cache (``SHARED_CACHE``) the block is rendered every
+    time.
+    """
+    nodelist = parser.parse(('endcache_fragment',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 2:
+        raise template.TemplateSyntaxError(f"'{tokens[0]}' tag requires a fragment name.")
+    fragment_name = tokens[1].strip('"\'')
+    return ContentFragmentNode(
+        nodelist,
+        fragment_name,
+        [parser.compile_filter(bit) for bit in tokens[2:]],
+    )
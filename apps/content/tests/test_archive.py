@@ -0,0 +1,36 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import resolve
+from django.utils import timezone
+
+from apps.content.models import ArchiveMonth, Post
+from apps.content.quill import quill_json
+from apps.users.models import User
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('archive-author@example.com', 'archive-pass')
+        cls.post = Post.objects.create(
+            title='Nineteen Eighty-Four', slug='1984', content=quill_json([{'insert': 'Big Brother\n'}], '<p>Big Brother</p>'),
+            author=author, status=Post.Status.PUBLISHED,
+            published_at=timezone.make_aware(datetime.datetime(2024, 3, 5)),
+        )
+
+    def test_numeric_slug_resolves_to_post(self):
+        self.assertEqual(resolve('/blog/1984/').view_name, 'content:post_detail')
+        self.assertContains(self.client.get('/blog/1984/'), 'Big Brother')
+
+    def test_archive_urls(self):
+        self.assertContains(self.client.get('/blog/archive/2024/'), 'Nineteen Eighty-Four')
+        self.assertContains(self.client.get('/blog/archive/2024/3/'), 'Nineteen Eighty-Four')
+
+    def test_rebuild_archive_command(self):
+        ArchiveMonth.objects.all().delete()
+        ArchiveMonth.objects.create(year=2020, month=1, post_count=7)
+        call_command('rebuild_archive', stdout=io.StringIO())
+        self.assertEqual(list(ArchiveMonth.objects.values_list('year', 'month', 'post_count')), [(2024, 3, 1)])
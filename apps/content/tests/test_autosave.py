@@ -0,0 +1,90 @@
+import json
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from apps.content.autosave import compose, validate_change
+from apps.content.models import Post
+from apps.content.quill import quill_json
+from apps.users.models import User
+
+
+class ComposeTests(SimpleTestCase):
+    document = [
+        {'insert': 'Hello '},
+        {'insert': 'bold', 'attributes': {'bold': True}},
+        {'insert': ' world\n'},
+    ]
+
+    def test_ops_across_boundaries(self):
+        change = [
+            {'retain': 4},
+            {'delete': 4},  # 'o ' and 'bo'
+            {'insert': 'X'},
+            {'retain': 3, 'attributes': {'bold': None, 'italic': True}},  # 'ld '
+        ]
+        self.assertEqual(compose(self.document, change), [
+            {'insert': 'HellX'},
+            # The rest of the bold op and the space after it merge once both are italic.
+            {'insert': 'ld ', 'attributes': {'italic': True}},
+            {'insert': 'world\n'},
+        ])
+
+    def test_astral_characters_count_two_units(self):
+        document = [{'insert': 'a🚀b\n'}]
+        # 'a' is 1 unit and the rocket 2, so retain 3 lands before 'b'.
+        self.assertEqual(compose(document, [{'retain': 3}, {'insert': '!'}]), [{'insert': 'a🚀!b\n'}])
+        self.assertEqual(compose(document, [{'retain': 1}, {'delete': 2}]), [{'insert': 'ab\n'}])
+
+    def test_embeds_are_one_unit(self):
+        image = {'insert': {'image': '/media/a.png'}}
+        document = [{'insert': 'ab'}, image, {'insert': 'c\n'}]
+        self.assertEqual(compose(document, [{'retain': 2}, {'delete': 1}]), [{'insert': 'abc\n'}])
+        self.assertEqual(
+            compose(document, [{'retain': 2}, {'retain': 1, 'attributes': {'width': '50'}}]),
+            [{'insert': 'ab'}, {**image, 'attributes': {'width': '50'}}, {'insert': 'c\n'}],
+        )
+
+    def test_change_longer_than_document(self):
+        with self.assertRaisesMessage(ValueError, 'longer than the document'):
+            compose([{'insert': 'ab\n'}], [{'retain': 2}, {'delete': 5}])
+
+    def test_malformed_ops(self):
+        for ops in ({}, [{'retain': 0}], [{'insert': ''}], [{'retain': 1, 'delete': 1}], [{'retain': True}]):
+            with self.subTest(ops=ops), self.assertRaises(ValueError):
+                validate_change(ops)
+
+
+class AutosaveViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('autosave-author@example.com', 'autosave-pass', role=User.Role.AUTHOR)
+        cls.post = Post.objects.create(
+            title='Autosaved', slug='autosaved', author=cls.author,
+            content=quill_json([{'insert': 'Hi\n'}], '<p>Hi</p>'),
+        )
+
+    def setUp(self):
+        self.client.force_login(self.author)
+        self.url = reverse('content:autosave', kwargs={'kind': 'post', 'pk': self.post.pk})
+
+    def post_change(self, version, ops):
+        return self.client.post(self.url, json.dumps({'version': version, 'ops': ops}), content_type='application/json')
+
+    def test_stale_version_conflicts(self):
+        response = self.post_change(0, [{'retain': 2}, {'insert': '!'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], 1)
+
+        response = self.post_change(0, [{'insert': 'Oh '}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], 1)
+        self.assertEqual(response.json()['ops'], [{'insert': 'Hi!\n'}])
+
+        self.assertEqual(self.post_change(1, [{'insert': 'Oh '}]).status_code, 200)
+        self.assertEqual(self.client.get(self.url).json()['ops'], [{'insert': 'Oh Hi!\n'}])
+
+    def test_too_long_change_is_rejected(self):
+        response = self.post_change(0, [{'delete': 10}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url).json()['version'], 0)
@@ -0,0 +1,111 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.content import bulk
+from apps.content.models import Category, Post
+from apps.content.quill import quill_json
+from apps.content.signals import content_published, content_updated
+from apps.users.models import User
+
+
+class BulkStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('bulk-author@example.com', 'bulk-pass')
+        cls.old_date = timezone.make_aware(datetime.datetime(2020, 1, 1, 12))
+        cls.future_date = timezone.now() + datetime.timedelta(days=7)
+
+    def setUp(self):
+        self.enterContext(mock.patch.object(bulk, 'BATCH_SIZE', 2))
+        self.sent = []
+        for signal, name in ((content_published, 'published'), (content_updated, 'updated')):
+            def receiver(sender, pks, name=name, **kwargs):
+                self.sent.append((name, list(pks)))
+            signal.connect(receiver, sender=Post, weak=False)
+            self.addCleanup(signal.disconnect, receiver, sender=Post)
+
+    def create_post(self, slug, status=Post.Status.DRAFT, published_at=None):
+        post = Post.objects.create(
+            title=slug, slug=slug, content=quill_json([{'insert': 'x\n'}], '<p>x</p>'),
+            author=self.author, status=status, published_at=published_at,
+        )
+        Post.objects.filter(pk=post.pk).update(status=status, published_at=published_at)
+        return post
+
+    def test_publish_in_batches(self):
+        drafts = [self.create_post(f'draft-{number}') for number in range(3)]
+        dated = self.create_post('dated', published_at=self.old_date)
+        future = self.create_post('future', published_at=self.future_date)
+        scheduled = self.create_post('scheduled', Post.Status.SCHEDULED, self.future_date)
+        live = self.create_post('live', Post.Status.PUBLISHED, self.old_date)
+
+        self.assertEqual(bulk.set_status(Post.objects.all(), Post.Status.PUBLISHED), 5)
+
+        # Three batches of at most two; each sends one signal per kind of change.
+        self.assertEqual(self.sent, [
+            ('published', [drafts[0].pk, drafts[1].pk]),
+            ('published', [drafts[2].pk, dated.pk]),
+            ('updated', [future.pk]),
+        ])
+        statuses = dict(Post.objects.values_list('slug', 'status'))
+        self.assertEqual(statuses, {
+            'draft-0': 'published', 'draft-1': 'published', 'draft-2': 'published', 'dated': 'published',
+            'future': 'scheduled', 'scheduled': 'scheduled', 'live': 'published',
+        })
+        dates = dict(Post.objects.values_list('slug', 'published_at'))
+        self.assertEqual(dates['dated'], self.old_date)
+        self.assertEqual(dates['future'], self.future_date)
+        self.assertEqual(dates['live'], self.old_date)
+        self.assertLess(timezone.now() - dates['draft-0'], datetime.timedelta(minutes=1))
+
+        # Scheduled rows are left alone rather than counted as changed again.
+        self.sent.clear()
+        self.assertEqual(bulk.set_status(Post.objects.all(), Post.Status.PUBLISHED), 0)
+        self.assertEqual(self.sent, [])
+        scheduled.refresh_from_db()
+        self.assertEqual(scheduled.status, Post.Status.SCHEDULED)
+
+    def test_publish_due_scheduled_rows(self):
+        due = self.create_post('due', Post.Status.SCHEDULED, self.old_date)
+        self.assertEqual(bulk.set_status(Post.objects.all(), Post.Status.PUBLISHED), 1)
+        self.assertEqual(self.sent, [('published', [due.pk])])
+
+    def test_unpublish_keeps_publish_dates(self):
+        live = [self.create_post(f'live-{number}', Post.Status.PUBLISHED, self.old_date) for number in range(3)]
+        draft = self.create_post('draft')
+
+        self.assertEqual(bulk.set_status(Post.objects.all(), Post.Status.DRAFT), 3)
+
+        self.assertEqual(self.sent, [
+            ('updated', [live[0].pk, live[1].pk]),
+            ('updated', [live[2].pk]),
+        ])
+        self.assertEqual(set(Post.objects.values_list('status', flat=True)), {Post.Status.DRAFT})
+        self.assertEqual(
+            set(Post.objects.exclude(pk=draft.pk).values_list('published_at', flat=True)), {self.old_date},
+        )
+
+        # Publishing again keeps the original dates.
+        self.assertEqual(bulk.set_status(Post.objects.exclude(pk=draft.pk), Post.Status.PUBLISHED), 3)
+        self.assertEqual(
+            set(Post.objects.exclude(pk=draft.pk).values_list('published_at', flat=True)), {self.old_date},
+        )
+
+    def test_add_and_remove_categories(self):
+        posts = [self.create_post(f'post-{number}') for number in range(3)]
+        news, sport = Category.objects.create(name='News'), Category.objects.create(name='Sport')
+        posts[0].categories.add(news)
+        self.sent.clear()
+
+        self.assertEqual(bulk.add_related(Post.objects.all(), 'categories', [news, sport]), 3)
+        self.assertEqual(len(self.sent), 2)
+        for post in posts:
+            self.assertCountEqual(post.categories.all(), [news, sport])
+
+        self.assertEqual(bulk.remove_related(Post.objects.all(), 'categories', [news]), 3)
+        self.assertEqual(len(self.sent), 4)
+        for post in posts:
+            self.assertCountEqual(post.categories.all(), [sport])
@@ -0,0 +1,35 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.content.cache import get_content_version
+from apps.content.models import Post
+from apps.content.quill import quill_json
+from apps.users.models import User
+
+
+@override_settings(SHARED_CACHE=True)
+class FragmentInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            'fragment-author@example.com', 'fragment-pass', first_name='Ada', last_name='Lovelace',
+        )
+        Post.objects.create(
+            title='Engines', slug='engines', content=quill_json([{'insert': 'x\n'}], '<p>x</p>'),
+            author=cls.author, status=Post.Status.PUBLISHED,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_author_change_refreshes_cached_cards(self):
+        self.assertContains(self.client.get(reverse('content:post_list')), 'Ada Lovelace')
+        self.author.last_name = 'King'
+        self.author.save()
+        self.assertContains(self.client.get(reverse('content:post_list')), 'Ada King')
+
+    def test_login_keeps_cached_fragments(self):
+        version = get_content_version()
+        self.client.force_login(self.author)
+        self.assertEqual(get_content_version(), version)
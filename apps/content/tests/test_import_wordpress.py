@@ -0,0 +1,74 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.content.models import Category, ImportedRecord, Page, Post, Tag
+from apps.media_library.models import MediaUsage
+from apps.users.models import User
+
+
+LONG_SLUG = '%e6%97%a5%e6%9c%ac' * 8
+
+WXR = f'''<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0" xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/"
+     xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:wp="http://wordpress.org/export/1.2/">
+<channel>
+<wp:author><wp:author_login>admin</wp:author_login><wp:author_email>admin@example.com</wp:author_email>
+  <wp:author_first_name>Ad</wp:author_first_name><wp:author_last_name>Min</wp:author_last_name></wp:author>
+<wp:category><wp:category_nicename>child</wp:category_nicename><wp:category_parent>parent</wp:category_parent>
+  <wp:cat_name>Child</wp:cat_name></wp:category>
+<wp:category><wp:category_nicename>parent</wp:category_nicename><wp:cat_name>Parent</wp:cat_name></wp:category>
+<wp:tag><wp:tag_slug>{LONG_SLUG}</wp:tag_slug><wp:tag_name>Japan</wp:tag_name></wp:tag>
+<item><title>pic</title><dc:creator>admin</dc:creator><wp:post_id>30</wp:post_id><wp:status>inherit</wp:status>
+  <wp:post_type>attachment</wp:post_type>
+  <wp:attachment_url>https://old.example.com/wp-content/uploads/2023/01/pic.png</wp:attachment_url></item>
+<item><title>Hello</title><dc:creator>admin</dc:creator><content:encoded>&lt;p&gt;Hi&lt;/p&gt;</content:encoded>
+  <wp:post_id>10</wp:post_id><wp:post_date_gmt>2023-01-02 03:04:05</wp:post_date_gmt><wp:post_name>hello</wp:post_name>
+  <wp:status>publish</wp:status><wp:post_type>post</wp:post_type>
+  <category domain="category" nicename="child">Child</category>
+  <category domain="post_tag" nicename="{LONG_SLUG}">Japan</category>
+  <wp:postmeta><wp:meta_key>_thumbnail_id</wp:meta_key><wp:meta_value>30</wp:meta_value></wp:postmeta></item>
+<item><title>Child page</title><dc:creator>admin</dc:creator><content:encoded>x</content:encoded>
+  <wp:post_id>21</wp:post_id><wp:post_name>child-page</wp:post_name><wp:status>publish</wp:status>
+  <wp:post_parent>20</wp:post_parent><wp:post_type>page</wp:post_type></item>
+<item><title>About</title><dc:creator>admin</dc:creator><content:encoded>about</content:encoded>
+  <wp:post_id>20</wp:post_id><wp:post_name>about</wp:post_name><wp:status>publish</wp:status>
+  <wp:post_parent>0</wp:post_parent><wp:post_type>page</wp:post_type></item>
+</channel>
+</rss>
+'''
+
+
+class ImportWordPressTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'export.xml')
+        with open(self.path, 'w') as fh:
+            fh.write(WXR)
+
+    def test_import(self):
+        existing = User.objects.create_user('Admin@Example.com', 'import-pass')
+        call_command('import_wordpress', self.path, batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(User.objects.count(), 1)
+        post = Post.objects.get(slug='hello')
+        self.assertEqual(post.author, existing)
+
+        tag = Tag.objects.get()
+        self.assertLessEqual(len(tag.slug), 50)
+        self.assertTrue(tag.slug.startswith('e697a5e69cac'))
+        self.assertEqual(list(post.tags.all()), [tag])
+        self.assertEqual(Category.objects.get(slug='child').parent, Category.objects.get(slug='parent'))
+
+        self.assertEqual(Page.objects.get(slug='child-page').parent, Page.objects.get(slug='about'))
+        self.assertEqual(post.featured_image.file.name, 'wordpress/2023/01/pic.png')
+        self.assertTrue(MediaUsage.objects.filter(media=post.featured_image, object_id=post.pk).exists())
+
+        self.assertFalse(ImportedRecord.objects.exists())
+        self.assertFalse(os.path.exists(f'{self.path}.import-state.json'))
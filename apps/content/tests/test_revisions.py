@@ -0,0 +1,93 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.content.models import Post, Revision
+from apps.content.quill import quill_json
+from apps.content.revisions import diff_table, field_values, get_values, thin_revisions
+from apps.users.models import User
+
+
+def body(paragraphs):
+    html = ''.join(f'<p>{text}</p>' for text in paragraphs)
+    return quill_json([{'insert': f'{text}\n'} for text in paragraphs], html)
+
+
+@override_settings(REVISION_SNAPSHOT_INTERVAL=3)
+class RevisionChainTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('revision-author@example.com', 'revision-pass')
+
+    def setUp(self):
+        # Eight versions: paragraphs edited, inserted, removed and retitled.
+        paragraphs = ['Intro', 'Body', 'Outro']
+        self.post = Post.objects.create(title='Draft 1', slug='chain', content=body(paragraphs), author=self.author)
+        self.expected = {1: field_values(self.post)}
+        for number in range(2, 9):
+            if number % 3 == 0:
+                paragraphs.insert(1, f'Inserted {number}')
+            elif number % 3 == 1:
+                paragraphs.pop()
+            else:
+                paragraphs[0] = f'Intro, take {number} – ünïcode 🚀'
+            self.post.title = f'Draft {number}'
+            self.post.content = body(paragraphs)
+            self.post.save()
+            self.post.refresh_from_db()
+            self.expected[number] = field_values(self.post)
+
+    def test_every_revision_rebuilds_from_its_chain(self):
+        revisions = list(self.post.revisions.order_by('number'))
+        self.assertEqual([revision.number for revision in revisions], list(range(1, 9)))
+        self.assertEqual([r.number for r in revisions if r.is_snapshot], [1, 4, 7])
+        for revision in revisions:
+            with self.subTest(number=revision.number):
+                self.assertEqual(get_values(revision), self.expected[revision.number])
+
+    def test_unchanged_save_records_nothing(self):
+        self.post.save()
+        self.assertEqual(self.post.revisions.count(), 8)
+
+    def test_diff_table_shows_the_change(self):
+        old, new = self.expected[2], self.expected[3]
+        table = diff_table(old, new, 'Revision 2', 'Revision 3')
+        self.assertIn('Revision 2', table)
+        self.assertIn('<span class="diff_add">Inserted&nbsp;3</span>', table)
+        self.assertIn('<span class="diff_chg">3</span>', table)
+        self.assertNotIn('<p>', table)
+
+    def test_thinning_keeps_the_text_of_kept_revisions(self):
+        now = timezone.now()
+        today = timezone.localdate()
+        # Revisions 1-3 at noon on one old day, 4-6 on another, 7-8 today.
+        for number in range(1, 9):
+            days = 20 if number <= 3 else 10 if number <= 6 else 0
+            created_at = timezone.make_aware(
+                datetime.datetime.combine(today - datetime.timedelta(days=days), datetime.time(12, number))
+            )
+            self.post.revisions.filter(number=number).update(created_at=min(created_at, now))
+        revisions = self.post.revisions.all()
+
+        self.assertEqual(thin_revisions(revisions, now - datetime.timedelta(days=5)), 4)
+
+        kept = list(self.post.revisions.order_by('number'))
+        self.assertEqual([revision.number for revision in kept], [3, 6, 7, 8])
+        self.assertTrue(kept[0].is_snapshot)
+        for revision in kept:
+            with self.subTest(number=revision.number):
+                self.assertEqual(get_values(revision), self.expected[revision.number])
+        self.assertEqual(thin_revisions(revisions, now - datetime.timedelta(days=5)), 0)
+
+    def test_prune_revisions_command(self):
+        Revision.objects.filter(object_id=self.post.pk, number__lte=4).update(
+            created_at=timezone.now() - datetime.timedelta(days=40)
+        )
+        out = io.StringIO()
+        call_command('prune_revisions', days=30, stdout=out)
+        self.assertIn('Deleted 3 revisions.', out.getvalue())
+        for revision in self.post.revisions.all():
+            self.assertEqual(get_values(revision), self.expected[revision.number])
@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.content import suggest
+from apps.content.models import Post, Tag
+from apps.content.quill import quill_json
+from apps.users.models import User
+
+
+class SuggestionIndexTests(TestCase):
+    def test_add_merges_a_batch_in_order(self):
+        index = suggest.SuggestionIndex()
+        index.build([(('tag', 1), 'Django tips', '/t/1/')])
+        index.add([(('tag', 3), 'Zebra', '/t/3/'), (('tag', 2), 'Apple tips', '/t/2/')])
+        self.assertEqual(index.keys, sorted(index.keys))
+        self.assertCountEqual([item['title'] for item in index.search('tips')], ['Apple tips', 'Django tips'])
+        self.assertEqual(index.search('zeb')[0]['url'], '/t/3/')
+
+    @override_settings(SHARED_CACHE=True)
+    def test_warm_up_builds_before_the_first_request(self):
+        cache.clear()
+        Tag.objects.create(name='Walrus facts', slug='walrus-facts')
+        author = User.objects.create_user('suggest-author@example.com', 'suggest-pass')
+        with mock.patch.object(suggest, '_index', suggest.SuggestionIndex()), \
+                mock.patch.object(suggest, '_index_seq', None):
+            # Closing connections would end the test's transaction.
+            with mock.patch.object(suggest.connections, 'close_all') as close_all:
+                suggest.warm_up()
+            close_all.assert_called_once_with()
+            self.assertEqual([item['title'] for item in suggest._index.search('walrus')], ['Walrus facts'])
+
+            Post.objects.create(
+                title='Walrus diet', slug='walrus-diet', author=author, status=Post.Status.PUBLISHED,
+                content=quill_json([{'insert': 'x\n'}], '<p>x</p>'),
+            )
+            with mock.patch.object(suggest.SuggestionIndex, 'build') as build:
+                titles = {item['title'] for item in suggest.suggest('walrus')}
+            build.assert_not_called()
+            self.assertEqual(titles, {'Walrus facts', 'Walrus diet'})
+
+    @override_settings(SHARED_CACHE=False)
+    def test_without_a_shared_cache_the_database_answers(self):
+        tag = Tag.objects.create(name='Walrus facts', slug='walrus-facts')
+        Tag.objects.create(name='Seals', slug='seals')
+        with mock.patch.object(suggest, '_refresh') as refresh:
+            self.assertEqual([item['title'] for item in suggest.suggest('fac')], ['Walrus facts'])
+            tag.delete()
+            self.assertEqual(suggest.suggest('fac'), [])
+        refresh.assert_not_called()
@@ -0,0 +1,109 @@
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.content.models import Category
+
+
+class TreeNodeTests(TestCase):
+    def setUp(self):
+        # news ─ sport ─ football ─ cup
+        #      └ tech
+        # archive
+        self.news = Category.objects.create(name='News')
+        self.sport = Category.objects.create(name='Sport', parent=self.news)
+        self.football = Category.objects.create(name='Football', parent=self.sport)
+        self.cup = Category.objects.create(name='Cup', parent=self.football)
+        self.tech = Category.objects.create(name='Tech', parent=self.news)
+        self.archive = Category.objects.create(name='Archive')
+
+    def paths(self):
+        return dict(Category.objects.values_list('name', 'path'))
+
+    def expected_paths(self):
+        """Paths computed by walking ``parent`` links in Python."""
+        parents = dict(Category.objects.values_list('pk', 'parent_id'))
+        paths = {}
+        for category in Category.objects.all():
+            pks, pk = [], category.pk
+            while pk:
+                pks.insert(0, pk)
+                pk = parents[pk]
+            paths[category.name] = '/' + ''.join(f'{pk}/' for pk in pks)
+        return paths
+
+    def test_paths_follow_parents(self):
+        self.assertEqual(self.cup.path, f'/{self.news.pk}/{self.sport.pk}/{self.football.pk}/{self.cup.pk}/')
+        self.assertEqual(self.cup.depth, 3)
+        self.assertEqual(self.paths(), self.expected_paths())
+
+    def test_subtree_queries(self):
+        self.assertEqual(list(self.cup.get_ancestors()), [self.news, self.sport, self.football])
+        self.assertEqual(list(self.news.get_ancestors()), [])
+        self.assertEqual(list(self.news.get_descendants()), [self.sport, self.football, self.cup, self.tech])
+        self.assertEqual(list(self.cup.get_descendants()), [])
+        self.assertEqual(list(self.sport.get_siblings()), [self.tech])
+
+    def test_moving_a_node_moves_its_descendants(self):
+        self.sport.parent = self.archive
+        with self.assertNumQueries(3):  # parent path, row UPDATE, subtree UPDATE
+            self.sport.save()
+        self.assertEqual(self.paths(), self.expected_paths())
+        self.assertEqual(list(self.archive.get_descendants()), [self.sport, self.football, self.cup])
+        self.assertEqual(list(self.news.get_descendants()), [self.tech])
+
+        # Detaching to a root and reloading from the database both keep paths right.
+        football = Category.objects.get(pk=self.football.pk)
+        football.parent = None
+        football.save()
+        self.assertEqual(self.paths(), self.expected_paths())
+        self.assertEqual(Category.objects.get(pk=self.cup.pk).depth, 1)
+
+    def test_unchanged_parent_does_not_touch_the_subtree(self):
+        sport = Category.objects.get(pk=self.sport.pk)
+        sport.description = 'Scores'
+        with self.assertNumQueries(1):
+            sport.save()
+
+    def test_cannot_move_below_itself(self):
+        for parent in (self.sport, self.cup):
+            with self.subTest(parent=parent.name):
+                sport = Category.objects.get(pk=self.sport.pk)
+                sport.parent = parent
+                with self.assertRaisesMessage(ValidationError, 'cannot be moved below itself'):
+                    sport.full_clean()
+                with self.assertRaises(ValueError):
+                    sport.save()
+        self.assertEqual(self.paths(), self.expected_paths())
+
+    def test_deleting_a_node_reroots_its_children(self):
+        self.sport.delete()
+        self.assertEqual(self.paths(), self.expected_paths())
+        self.assertEqual(Category.objects.get(pk=self.cup.pk).path, f'/{self.football.pk}/{self.cup.pk}/')
+
+    def test_rebuild_paths_repairs_stale_paths(self):
+        Category.objects.filter(pk__in=[self.football.pk, self.tech.pk]).update(path='')
+        Category.objects.filter(pk=self.cup.pk).update(path='/wrong/')
+        self.assertEqual(Category.rebuild_paths(batch_size=2), 3)
+        self.assertEqual(self.paths(), self.expected_paths())
+        self.assertEqual(Category.rebuild_paths(), 0)
+
+    def test_rebuild_paths_breaks_parent_loops(self):
+        # sport -> cup -> football -> sport, written around save().
+        Category.objects.filter(pk=self.sport.pk).update(parent=self.cup)
+        self.assertEqual(Category.rebuild_paths(), 3)
+
+        sport = Category.objects.get(pk=self.sport.pk)
+        self.assertIsNone(sport.parent_id)
+        self.assertEqual(self.paths(), self.expected_paths())
+        self.assertEqual(list(sport.get_descendants()), [self.football, self.cup])
+        self.assertEqual(list(self.news.get_descendants()), [self.tech])
+
+    def test_repair_trees_command(self):
+        Category.objects.filter(pk=self.tech.pk).update(path='')
+        out = io.StringIO()
+        call_command('repair_trees', stdout=out)
+        self.assertIn('Categories: 1 paths updated.', out.getvalue())
+        self.assertEqual(self.paths(), self.expected_paths())
@@ -6,6 +6,10 @@ app_name = 'content'
 urlpatterns = [
     # Blog posts
     path('blog/', views.PostListView.as_view(), name='post_list'),
+    # Under their own prefix so a numeric post slug such as "1984" is never
+    # taken for a year.
+    path('blog/archive/<int:year>/', views.PostArchiveView.as_view(), name='post_archive_year'),
+    path('blog/archive/<int:year>/<int:month>/', views.PostArchiveView.as_view(), name='post_archive_month'),
     path('blog/<slug:slug>/', views.PostDetailView.as_view(), name='post_detail'),
     
     # Categories
@@ -14,6 +18,14 @@ urlpatterns = [
     # Tags
     path('tag/<slug:slug>/', views.TagDetailView.as_view(), name='tag_detail'),
     
+    # JSON search for the editor's pickers
+    path('pickers/categories/', views.CategoryPickerView.as_view(), name='category_picker'),
+    path('pickers/tags/', views.TagPickerView.as_view(), name='tag_picker'),
+    path('pickers/pages/', views.PagePickerView.as_view(), name='page_picker'),
+    
+    # Editor autosave
+    path('autosave/<str:kind>/<int:pk>/', views.AutosaveView.as_view(), name='autosave'),
+    
     # Pages (catch-all for page slugs - should be last)
     path('page/<slug:slug>/', views.PageDetailView.as_view(), name='page_detail'),
 ]
@@ -1,7 +1,28 @@
+import datetime
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404
+from django.views import View
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
-from .models import Post, Page, Category, Tag
+from django.db.models import Sum
+from django.utils.functional import SimpleLazyObject
+from apps.core.pickers import PickerView
+from apps.core.search import get_backend, parse_terms
+from .archive import published_in
+from .autosave import DraftConflict, apply_change, get_draft
+from .cache import get_category_post_counts
+from .models import ArchiveMonth, Post, Page, Category, Tag
+
+
+def categories_with_counts():
+    """All categories with ``post_count`` set to their cached subtree count."""
+    counts = get_category_post_counts()
+    categories = list(Category.objects.all())
+    for category in categories:
+        category.post_count = counts.get(category.pk, 0)
+    return categories
 
 
 class PostListView(ListView):
@@ -14,21 +35,19 @@ class PostListView(ListView):
     def get_queryset(self):
         queryset = Post.objects.filter(status=Post.Status.PUBLISHED)
         
-        # Search functionality
+        # Search functionality, through the configured search backend
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(excerpt__icontains=search) |
-                Q(content__icontains=search)
-            )
+            queryset = get_backend().restrict('post', queryset, parse_terms(search))
         
-        return queryset.select_related('author', 'featured_image').prefetch_related('categories', 'tags')
+        return queryset.select_related('author', 'featured_image').prefetch_related('categories')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
+        # Lazy so a cached sidebar fragment skips both queries
+        context['categories'] = SimpleLazyObject(categories_with_counts)
         context['tags'] = Tag.objects.all()
+        context['archive_months'] = ArchiveMonth.objects.all()
         context['search'] = self.request.GET.get('search', '')
         return context
 
@@ -42,8 +61,10 @@ class PostDetailView(DetailView):
     def get_queryset(self):
         # Show drafts to authors/editors, published to everyone else
         if self.request.user.is_authenticated and self.request.user.is_editor:
-            return Post.objects.all()
-        return Post.objects.filter(status=Post.Status.PUBLISHED)
+            queryset = Post.objects.all()
+        else:
+            queryset = Post.objects.filter(status=Post.Status.PUBLISHED)
+        return queryset.select_related('author', 'featured_image').prefetch_related('categories', 'tags')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -52,11 +73,12 @@ class PostDetailView(DetailView):
         post = self.object
         related_posts = Post.objects.filter(
             status=Post.Status.PUBLISHED
-        ).exclude(pk=post.pk)
+        ).exclude(pk=post.pk).select_related('featured_image')
         
-        if post.categories.exists():
+        categories = post.categories.all()
+        if categories:
             related_posts = related_posts.filter(
-                categories__in=post.categories.all()
+                categories__in=categories
             ).distinct()
         
         context['related_posts'] = related_posts[:3]
@@ -70,35 +92,59 @@ class PageDetailView(DetailView):
     
     def get_queryset(self):
         if self.request.user.is_authenticated and self.request.user.is_editor:
-            return Page.objects.all()
-        return Page.objects.filter(status=Page.Status.PUBLISHED)
+            queryset = Page.objects.all()
+        else:
+            queryset = Page.objects.filter(status=Page.Status.PUBLISHED)
+        return queryset.select_related('featured_image')
     
     def get_template_names(self):
         """Return template based on page's template setting."""
-        page = self.get_object()
+        page = self.object
         return [
             f'content/pages/{page.template}.html',
             'content/pages/default.html',
             'content/page_detail.html',
         ]
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = self.object
+        context['ancestors'] = (
+            page.get_ancestors().filter(status=Page.Status.PUBLISHED).only('title', 'slug', 'path')
+            if page.parent_id else []
+        )
+        context['child_pages'] = page.children.filter(status=Page.Status.PUBLISHED).only('title', 'slug', 'excerpt', 'parent')
+        return context
 
 
 class CategoryDetailView(ListView):
-    """List posts in a category."""
+    """List posts in a category and all of its subcategories."""
     template_name = 'content/category_detail.html'
     context_object_name = 'posts'
     paginate_by = 10
     
     def get_queryset(self):
         self.category = get_object_or_404(Category, slug=self.kwargs['slug'])
+        # Semi-join on the indexed path prefix: each post appears once
+        # without needing DISTINCT over the whole listing.
+        in_subtree = Post.categories.through.objects.filter(
+            category__path__startswith=self.category.path
+        ).values('post_id')
         return Post.objects.filter(
             status=Post.Status.PUBLISHED,
-            categories=self.category
+            pk__in=in_subtree
         ).select_related('author', 'featured_image')
     
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        # Use the cached subtree count instead of a COUNT over the listing
+        paginator.count = get_category_post_counts().get(self.category.pk, 0)
+        return paginator
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
+        context['subcategories'] = self.category.children.all()
         return context
 
 
@@ -119,3 +165,112 @@ class TagDetailView(ListView):
         context = super().get_context_data(**kwargs)
         context['tag'] = self.tag
         return context
+
+
+class PostArchiveView(ListView):
+    """List published posts from one year or one month."""
+    template_name = 'content/post_archive.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+    
+    def get_queryset(self):
+        self.year = self.kwargs['year']
+        self.month = self.kwargs.get('month')
+        if not 1 <= self.year <= 9998 or self.month is not None and not 1 <= self.month <= 12:
+            raise Http404('Invalid archive date')
+        return published_in(self.year, self.month).select_related('author', 'featured_image')
+    
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        # Count from the monthly totals instead of the Post table
+        months = ArchiveMonth.objects.filter(year=self.year)
+        if self.month is not None:
+            months = months.filter(month=self.month)
+        paginator.count = months.aggregate(total=Sum('post_count'))['total'] or 0
+        return paginator
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['archive_year'] = self.year
+        context['archive_date'] = datetime.date(self.year, self.month or 1, 1)
+        context['is_month'] = self.month is not None
+        context['archive_months'] = ArchiveMonth.objects.all()
+        return context
+
+
+class CategoryPickerView(PickerView):
+    """Category search for the post editor."""
+    model = Category
+    search_fields = ('name',)
+    ordering = ('name',)
+
+
+class TagPickerView(PickerView):
+    """Tag search for the post editor."""
+    model = Tag
+    search_fields = ('name',)
+    ordering = ('name',)
+
+
+class PagePickerView(PickerView):
+    """Page search for the parent page picker."""
+    model = Page
+    search_fields = ('title',)
+    ordering = ('title',)
+
+    def get_queryset(self):
+        return super().get_queryset().only('pk', 'title')
+
+
+def draft_state(draft):
+    if draft is None:
+        return {'version': 0, 'ops': None, 'updated_by': None, 'updated_at': None}
+    return {
+        'version': draft.version,
+        'ops': json.loads(draft.ops),
+        'updated_by': draft.updated_by.get_full_name() or draft.updated_by.email if draft.updated_by else None,
+        'updated_at': draft.updated_at.isoformat(),
+    }
+
+
+class AutosaveView(LoginRequiredMixin, View):
+    """
+    The editor's autosave endpoint.
+
+    GET returns the current draft, if any. POST takes
+    ``{"version": n, "ops": [...]}``, the editor's changes since version
+    ``n``, and returns the new version. If the draft has moved past ``n``,
+    it answers 409 with the current draft instead.
+    """
+    raise_exception = True
+    models = {'post': Post, 'page': Page}
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        model = self.models.get(kwargs['kind'])
+        if model is None:
+            raise Http404
+        self.object = get_object_or_404(model, pk=kwargs['pk'])
+        if not request.user.can_edit_content(self.object):
+            return self.handle_no_permission()
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(draft_state(get_draft(self.object)))
+
+    def post(self, request, *args, **kwargs):
+        try:
+            payload = json.loads(request.body)
+            version = payload['version']
+            if not isinstance(version, int) or isinstance(version, bool):
+                raise ValueError('version must be an integer.')
+            draft = apply_change(self.object, request.user, version, payload['ops'])
+        except DraftConflict as e:
+            return JsonResponse(
+                {'error': 'Someone else changed this text since you opened it.', **draft_state(e.draft)},
+                status=409,
+            )
+        except (ValueError, TypeError, KeyError) as e:
+            return JsonResponse({'error': str(e) or 'Invalid autosave payload.'}, status=400)
+        return JsonResponse({'version': draft.version})
@@ -0,0 +1,174 @@
+"""
+Streaming readers for WordPress exports.
+
+Both readers yield the same normalized records, one dict per author,
+category, tag or item (post, page or attachment), so the importer does
+not care where they came from:
+
+- ``iter_wxr`` parses a WXR (WordPress eXtended RSS) export with
+  ``iterparse`` and clears every element once it has been read, so memory
+  stays flat regardless of export size.
+- ``iter_jsonl`` reads JSON Lines, one already-normalized record per line
+  (``{"type": "post", "slug": ..., ...}``).
+"""
+
+import datetime
+import json
+import xml.etree.ElementTree as ET
+
+from django.utils.dateparse import parse_datetime
+
+
+def _local_name(tag):
+    """Turn ``{namespace}name`` into a short ``prefix:name`` key."""
+    if not tag.startswith('{'):
+        return tag
+    uri, name = tag[1:].split('}', 1)
+    if '/excerpt/' in uri:
+        return f'excerpt:{name}'
+    if 'wordpress.org/export' in uri:
+        return f'wp:{name}'
+    if 'modules/content' in uri:
+        return f'content:{name}'
+    if 'purl.org/dc' in uri:
+        return f'dc:{name}'
+    return name
+
+
+def _parse_wp_date(value):
+    """Parse a WXR ``YYYY-MM-DD HH:MM:SS`` (GMT) timestamp."""
+    if not value or value.startswith('0000'):
+        return None
+    try:
+        parsed = datetime.datetime.strptime(value.strip(), '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+def _text(element, key):
+    for child in element:
+        if _local_name(child.tag) == key:
+            return (child.text or '').strip()
+    return ''
+
+
+def _author(element):
+    return {
+        'type': 'author',
+        'login': _text(element, 'wp:author_login'),
+        'email': _text(element, 'wp:author_email'),
+        'first_name': _text(element, 'wp:author_first_name'),
+        'last_name': _text(element, 'wp:author_last_name'),
+    }
+
+
+def _category(element):
+    return {
+        'type': 'category',
+        'slug': _text(element, 'wp:category_nicename'),
+        'name': _text(element, 'wp:cat_name'),
+        'parent': _text(element, 'wp:category_parent'),
+        'description': _text(element, 'wp:category_description'),
+    }
+
+
+def _tag(element):
+    return {
+        'type': 'tag',
+        'slug': _text(element, 'wp:tag_slug'),
+        'name': _text(element, 'wp:tag_name'),
+    }
+
+
+def _item(element):
+    record = {
+        'categories': [],
+        'tags': [],
+        'thumbnail': None,
+    }
+    fields = {}
+    for child in element:
+        key = _local_name(child.tag)
+        if key == 'category':
+            term = (child.get('nicename'), (child.text or '').strip())
+            if child.get('domain') == 'category':
+                record['categories'].append(term)
+            elif child.get('domain') == 'post_tag':
+                record['tags'].append(term)
+        elif key == 'wp:postmeta':
+            if _text(child, 'wp:meta_key') == '_thumbnail_id':
+                record['thumbnail'] = _text(child, 'wp:meta_value')
+        else:
+            fields[key] = child.text or ''
+
+    record.update({
+        'type': fields.get('wp:post_type', 'post'),
+        'wp_id': fields.get('wp:post_id', '').strip(),
+        'title': fields.get('title', '').strip(),
+        'slug': fields.get('wp:post_name', '').strip(),
+        'status': fields.get('wp:status', 'draft').strip(),
+        'content': fields.get('content:encoded', ''),
+        'excerpt': fields.get('excerpt:encoded', '').strip(),
+        'author': fields.get('dc:creator', '').strip(),
+        'published_at': (
+            _parse_wp_date(fields.get('wp:post_date_gmt'))
+            or _parse_wp_date(fields.get('wp:post_date'))
+        ),
+        'parent': fields.get('wp:post_parent', '0').strip(),
+        'menu_order': int(fields.get('wp:menu_order', '0').strip() or 0),
+        'url': fields.get('wp:attachment_url', '').strip(),
+    })
+    return record
+
+
+RECORD_PARSERS = {
+    'wp:author': _author,
+    'wp:category': _category,
+    'wp:tag': _tag,
+    'item': _item,
+}
+
+
+def iter_wxr(path):
+    """Yield normalized records from a WXR file without loading it into memory."""
+    depth = 0
+    channel = None
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if depth == 2 and element.tag == 'channel':
+                channel = element
+            continue
+
+        depth -= 1
+        # Records are the direct children of <channel> (depth 2 after the end event).
+        if depth != 2:
+            continue
+        parser = RECORD_PARSERS.get(_local_name(element.tag))
+        if parser is not None:
+            yield parser(element)
+        if channel is not None:
+            channel.clear()
+
+
+def iter_jsonl(path):
+    """Yield normalized records from a JSON Lines export."""
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('published_at'):
+                record['published_at'] = parse_datetime(record['published_at'])
+            record['categories'] = [tuple(term) for term in record.get('categories', [])]
+            record['tags'] = [tuple(term) for term in record.get('tags', [])]
+            yield record
+
+
+def iter_records(path):
+    """Pick a reader based on the file extension."""
+    if path.endswith(('.json', '.jsonl')):
+        return iter_jsonl(path)
+    return iter_wxr(path)
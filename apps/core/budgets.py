@@ -0,0 +1,249 @@
+"""
+Per-view query and latency budgets.
+
+Every public, media-library and admin changelist view is listed here with the maximum number
+of database queries and the maximum render time (in milliseconds) it may
+use against the data set built by ``seed_budget_data``. The query budgets
+are enforced by the test suite (``apps/core/tests/test_view_budgets.py``);
+``manage.py check_view_budgets`` checks the render times as well. Tighten
+the numbers as views get cheaper; a view that regresses past its budget
+fails and reports the queries it ran and the template lines that triggered
+them. A budget that has to grow needs a comment saying what the extra
+queries are for.
+"""
+
+import inspect
+import io
+import time
+
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.template.base import Node
+from django.test import Client
+from django.urls import reverse
+from PIL import Image
+
+from apps.content.cache import bump_content_version
+from apps.content.models import ArchiveMonth, Category, Page, Post, Tag
+from apps.content.quill import quill_json
+from apps.media_library.models import Media
+from apps.users.models import User
+
+
+# Budgets assume the production setup with a shared cache (REDIS_URL), where
+# logged-in requests read the session and the user from the cache and
+# category counts are cached. Without one, each logged-in view runs two more
+# queries.
+BUDGET_SETTINGS = {
+    'SHARED_CACHE': True,
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'AUTHENTICATION_BACKENDS': ['apps.users.backends.CachedModelBackend'],
+}
+
+# URL name -> budget. ``object`` names a seeded object whose ``lookup``
+# attribute (or tuple of attributes) fills the URL kwargs, ``login`` renders
+# as a logged-in editor (or superuser, with ``'admin'``) and ``params`` adds a
+# query string. Every public page also loads the menu pages in base.html.
+VIEW_BUDGETS = {
+    # Menu, latest posts, their categories
+    'core:home': {'max_queries': 3, 'max_ms': 250},
+    # Facets (author/year per kind, categories, tags: 4), matching keys (1),
+    # the page of results per kind (2), menu (1)
+    'core:search': {'max_queries': 8, 'max_ms': 250, 'params': {'q': 'Budget'}},
+    # Count, menu, posts and their categories, then the sidebar: category
+    # subtree counts (cached between content changes), categories, archive
+    # months and tags
+    'content:post_list': {'max_queries': 8, 'max_ms': 250},
+    'content:post_archive_year': {'max_queries': 4, 'max_ms': 250, 'object': 'archive', 'lookup': ('year',)},
+    'content:post_archive_month': {'max_queries': 4, 'max_ms': 250, 'object': 'archive', 'lookup': ('year', 'month')},
+    'content:post_detail': {'max_queries': 5, 'max_ms': 250, 'object': 'post', 'lookup': 'slug'},
+    # Category, subtree counts (cached between content changes), menu,
+    # subcategories, posts
+    'content:category_detail': {'max_queries': 5, 'max_ms': 250, 'object': 'category', 'lookup': 'slug'},
+    'content:tag_detail': {'max_queries': 4, 'max_ms': 250, 'object': 'tag', 'lookup': 'slug'},
+    # Page, menu, breadcrumbs (one query for all ancestors), child pages
+    'content:page_detail': {'max_queries': 4, 'max_ms': 250, 'object': 'page', 'lookup': 'slug'},
+    'media_library:media_list': {'max_queries': 3, 'max_ms': 250, 'login': True},
+    # Media, menu, then the usages: one query for the index plus one per
+    # content type using the file (posts and pages in the seed)
+    'media_library:media_detail': {'max_queries': 5, 'max_ms': 250, 'login': True, 'object': 'media', 'lookup': 'pk'},
+    'media_library:media_upload': {'max_queries': 1, 'max_ms': 250, 'login': True},
+    # The confirmation lists the same usages as the detail page
+    'media_library:media_delete': {'max_queries': 5, 'max_ms': 250, 'login': True, 'object': 'media', 'lookup': 'pk'},
+    # Count (or the planner estimate first, on PostgreSQL) and the rows
+    'admin:content_post_changelist': {'max_queries': 3, 'max_ms': 250, 'login': 'admin'},
+    'admin:content_page_changelist': {'max_queries': 3, 'max_ms': 250, 'login': 'admin'},
+    'admin:media_library_media_changelist': {'max_queries': 3, 'max_ms': 250, 'login': 'admin'},
+}
+
+
+def _template_location():
+    """Return ``template:line`` for the template node currently rendering, if any."""
+    frame = inspect.currentframe()
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        # type() rather than isinstance(): ``self`` may be a lazy object
+        # (request.user) whose __class__ lookup would run another query.
+        if issubclass(type(node), Node) and getattr(node, 'origin', None) is not None:
+            return f'{node.origin.template_name}:{node.token.lineno}'
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    """Record every query run on the default connection, with its template origin."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'ms': (time.perf_counter() - start) * 1000,
+                'template': _template_location(),
+            })
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+
+def check_budget(url_name, budget, queries, elapsed_ms=None):
+    """
+    Return a list of human-readable budget violations for one rendered view.
+
+    The render time is only checked when ``elapsed_ms`` is given.
+    """
+    problems = []
+    if len(queries) > budget['max_queries']:
+        problems.append(
+            f"{url_name}: {len(queries)} queries (budget {budget['max_queries']})"
+        )
+        for query in queries:
+            origin = query['template'] or 'view code'
+            problems.append(f"    [{origin}] {query['sql'][:200]}")
+    if elapsed_ms is not None and elapsed_ms > budget['max_ms']:
+        problems.append(
+            f"{url_name}: rendered in {elapsed_ms:.0f} ms (budget {budget['max_ms']} ms)"
+        )
+    return problems
+
+
+def measure_view(clients, url_name, budget, seed):
+    """
+    Render one budgeted view and return ``(response, queries, elapsed_ms)``.
+
+    ``clients`` comes from ``budget_clients`` and ``seed`` from
+    ``seed_budget_data``.
+    """
+    kwargs = {}
+    if 'object' in budget:
+        lookups = budget['lookup']
+        if isinstance(lookups, str):
+            lookups = (lookups,)
+        for lookup in lookups:
+            kwargs[lookup] = getattr(seed[budget['object']], lookup)
+    url = reverse(url_name, kwargs=kwargs)
+    browser = clients[budget.get('login') or None]
+
+    # Warm-up render so one-off costs (template compilation, URL resolver
+    # population) do not count against the budget.
+    browser.get(url, budget.get('params', {}))
+    # Measure with cold fragment caches so cached fragments cannot hide an
+    # N+1 inside them.
+    bump_content_version()
+
+    with QueryRecorder() as recorder:
+        start = time.perf_counter()
+        response = browser.get(url, budget.get('params', {}))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    return response, recorder.queries, elapsed_ms
+
+
+def budget_clients(seed):
+    """Return test clients keyed by the ``login`` value of a budget."""
+    editor_client = Client()
+    editor_client.force_login(seed['editor'])
+    admin_client = Client()
+    admin_client.force_login(seed['admin'])
+    return {None: Client(), True: editor_client, 'admin': admin_client}
+
+
+def seed_content(text):
+    """Return a minimal Quill document for seeded content."""
+    return quill_json([{'insert': text + '\n'}], f'<p>{text}</p>')
+
+
+def seed_budget_data(post_count=30):
+    """Create a small but representative content graph; return the objects the budgets look up."""
+    editor = User.objects.create_user(
+        'budget-editor@example.com', 'budget-pass',
+        first_name='Budget', last_name='Editor', role=User.Role.EDITOR,
+    )
+    superuser = User.objects.create_superuser('budget-admin@example.com', 'budget-pass')
+    authors = [
+        User.objects.create_user(f'budget-author{i}@example.com', 'budget-pass', first_name='Author', last_name=str(i))
+        for i in range(3)
+    ]
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+    media = Media(title='Budget image', uploaded_by=editor)
+    media.file.save('budget.png', ContentFile(buffer.getvalue()), save=False)
+    media.save()
+
+    parent = Category.objects.create(name='Budget parent', slug='budget-parent')
+    categories = [parent] + [
+        Category.objects.create(name=f'Budget category {i}', slug=f'budget-category-{i}', parent=parent)
+        for i in range(4)
+    ]
+    tags = [Tag.objects.create(name=f'Budget tag {i}', slug=f'budget-tag-{i}') for i in range(6)]
+
+    posts = []
+    for i in range(post_count):
+        post = Post.objects.create(
+            title=f'Budget post {i}',
+            slug=f'budget-post-{i}',
+            excerpt='Budget excerpt',
+            content=seed_content(f'Budget body {i}'),
+            author=authors[i % len(authors)],
+            featured_image=media if i % 2 else None,
+            status=Post.Status.PUBLISHED,
+        )
+        post.categories.set(categories[i % len(categories):][:2])
+        post.tags.set(tags[i % len(tags):][:3])
+        posts.append(post)
+
+    # A three-level section so the page view renders breadcrumbs and children.
+    pages = []
+    for i in range(3):
+        pages.append(Page.objects.create(
+            title=f'Budget page {i}',
+            slug=f'budget-page-{i}',
+            content=seed_content('Budget page body'),
+            author=editor,
+            featured_image=media,
+            status=Page.Status.PUBLISHED,
+            show_in_menu=True,
+            menu_order=i,
+            parent=pages[-1] if pages else None,
+        ))
+
+    return {
+        'editor': editor,
+        'admin': superuser,
+        'post': posts[0],
+        'page': pages[1],
+        'category': parent,
+        'tag': tags[0],
+        'archive': ArchiveMonth.objects.first(),
+        'media': media,
+    }
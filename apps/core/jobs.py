@@ -0,0 +1,137 @@
+"""
+A job queue in the database.
+
+Work that a request triggers but need not wait for goes here instead of
+running inline. Examples are probing an upload's dimensions or updating the
+search index. Mark the function with ``@task`` and queue a call with
+``enqueue``::
+
+    @task(priority=5)
+    def probe_dimensions(media_id):
+        ...
+
+    enqueue(probe_dimensions, media_id=media.pk)
+
+Arguments must be JSON-serializable. A job is created when the current
+transaction commits, so the worker sees the data it refers to. A second
+``enqueue`` of the same function with the same arguments, while the first is
+still pending, is dropped.
+
+``run_worker`` processes the queue. Workers claim due jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so any number can run side by side
+without taking the same job. A job that raises is retried with
+exponential backoff until ``max_attempts``, then kept as failed. A job
+left running longer than ``JOB_TIMEOUT`` seconds (its worker died) is
+claimed again; that counts as an attempt, so a job that keeps killing its
+worker ends up failed too.
+
+With ``JOB_QUEUE_EAGER`` the call runs in-process on commit instead, which
+is handy in development without a worker.
+"""
+
+import datetime
+import hashlib
+import json
+import random
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+def task(priority=0, max_attempts=5):
+    """Register a function as runnable by the worker."""
+    def decorator(func):
+        func.job_name = f'{func.__module__}.{func.__qualname__}'
+        func.job_priority = priority
+        func.job_max_attempts = max_attempts
+        return func
+    return decorator
+
+
+def enqueue(func, delay=0, **kwargs):
+    """Queue ``func(**kwargs)`` to run after the current transaction commits."""
+    name = func.job_name
+    payload = json.dumps(kwargs, sort_keys=True, separators=(',', ':'))
+    dedupe_key = hashlib.sha1(f'{name}:{payload}'.encode()).hexdigest()
+
+    def create():
+        if settings.JOB_QUEUE_EAGER:
+            func(**kwargs)
+            return
+        Job.objects.bulk_create(
+            [Job(
+                name=name,
+                kwargs=json.loads(payload),
+                dedupe_key=dedupe_key,
+                priority=func.job_priority,
+                max_attempts=func.job_max_attempts,
+                run_at=timezone.now() + datetime.timedelta(seconds=delay),
+            )],
+            # The partial unique index drops a duplicate of a pending job.
+            ignore_conflicts=True,
+        )
+
+    transaction.on_commit(create)
+
+
+def claim(limit):
+    """Lock up to ``limit`` due jobs for this worker and mark them running."""
+    now = timezone.now()
+    stale = now - datetime.timedelta(seconds=settings.JOB_TIMEOUT)
+    with transaction.atomic():
+        # The worker died during the last allowed attempt.
+        Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=stale, attempts__gte=F('max_attempts')).update(
+            status=Job.Status.FAILED, last_error='Timed out; the worker stopped responding.', locked_at=None
+        )
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=Job.Status.PENDING, run_at__lte=now) | Q(status=Job.Status.RUNNING, locked_at__lt=stale))
+            .order_by('-priority', 'run_at')[:limit]
+        )
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=Job.Status.RUNNING, locked_at=now, attempts=F('attempts') + 1
+        )
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def run(job):
+    """Run a claimed job; delete it on success, else schedule a retry. Return success."""
+    try:
+        func = import_string(job.name)
+        if getattr(func, 'job_name', None) != job.name:
+            raise ValueError(f'{job.name} is not a @task function.')
+        func(**job.kwargs)
+    except Exception:
+        fail(job, traceback.format_exc())
+        return False
+    job.delete()
+    return True
+
+
+def fail(job, error):
+    queryset = Job.objects.filter(pk=job.pk)
+    if job.attempts >= job.max_attempts:
+        queryset.update(status=Job.Status.FAILED, last_error=error, locked_at=None)
+        return
+    # 1x, 2x, 4x ... the base delay, capped at an hour, with jitter so
+    # jobs that failed together do not retry together.
+    delay = min(settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1), 3600) * random.uniform(0.75, 1.25)
+    try:
+        with transaction.atomic():
+            queryset.update(
+                status=Job.Status.PENDING,
+                run_at=timezone.now() + datetime.timedelta(seconds=delay),
+                last_error=error,
+                locked_at=None,
+            )
+    except IntegrityError:
+        # The same call was queued again meanwhile; that copy will run it.
+        queryset.delete()
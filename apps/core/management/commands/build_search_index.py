@@ -0,0 +1,17 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.search_index import InvertedIndex
+
+
+class Command(BaseCommand):
+    help = 'Build the on-disk search index from published posts and pages and compact its journal.'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        documents = InvertedIndex(settings.SEARCH_INDEX_DIR).build()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {documents} documents in {time.monotonic() - started:.1f}s ({settings.SEARCH_INDEX_DIR}).'
+        ))
@@ -0,0 +1,82 @@
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from apps.core.budgets import BUDGET_SETTINGS, VIEW_BUDGETS, budget_clients, check_budget, measure_view, seed_budget_data
+
+
+def isolated_settings(media_root):
+    """
+    Keep the run's side effects away from the live site.
+
+    The database work is rolled back, but the content version, cached pages,
+    the suggestion journal, uploaded media and metrics dumps live outside the
+    database; point them at a private cache, a temporary directory and
+    nowhere respectively.
+    """
+    return {
+        'CACHES': {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'check-view-budgets',
+            },
+        },
+        'STORAGES': {
+            **settings.STORAGES,
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        },
+        'MEDIA_ROOT': media_root,
+        'METRICS_DIR': '',
+    }
+
+
+class Command(BaseCommand):
+    help = 'Render every public, media-library and admin changelist view against seeded data and enforce query/latency budgets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=30, help='Number of posts to seed.')
+        parser.add_argument('--only', help='Check a single URL name, e.g. content:post_list.')
+
+    def handle(self, *args, **options):
+        budgets = VIEW_BUDGETS
+        if options['only']:
+            if options['only'] not in budgets:
+                raise CommandError(f"No budget declared for {options['only']}")
+            budgets = {options['only']: budgets[options['only']]}
+
+        setup_test_environment()
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                **isolated_settings(media_root), **BUDGET_SETTINGS
+            ):
+                problems = self.run_checks(budgets, options['posts'])
+        finally:
+            teardown_test_environment()
+
+        if problems:
+            raise CommandError('View budgets exceeded:\n' + '\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS(f'All {len(budgets)} views are within budget.'))
+
+    def run_checks(self, budgets, post_count):
+        """Seed data, render each view and roll everything back afterwards."""
+        problems = []
+        with transaction.atomic():
+            seed = seed_budget_data(post_count)
+            clients = budget_clients(seed)
+
+            for url_name, budget in budgets.items():
+                response, queries, elapsed_ms = measure_view(clients, url_name, budget, seed)
+                if response.status_code != 200:
+                    problems.append(f'{url_name}: {response.request["PATH_INFO"]} returned {response.status_code}')
+                    continue
+                problems.extend(check_budget(url_name, budget, queries, elapsed_ms))
+                self.stdout.write(
+                    f'{url_name:32} {len(queries):3d}/{budget["max_queries"]:<3d} queries '
+                    f'{elapsed_ms:7.1f}/{budget["max_ms"]} ms'
+                )
+
+            transaction.set_rollback(True)
+        return problems
@@ -0,0 +1,61 @@
+import logging
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import InterfaceError, OperationalError, close_old_connections
+
+from apps.core.jobs import claim, run
+
+logger = logging.getLogger(__name__)
+
+# Longest wait, in seconds, between attempts while the database is unreachable.
+MAX_BACKOFF = 60
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (apps/core/jobs.py). Start as many workers as needed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5, help='Jobs claimed per query.')
+        parser.add_argument('--interval', type=float, default=1, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due.')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        # Finish the current job on SIGTERM instead of dying mid-way.
+        signal.signal(signal.SIGTERM, self.stop)
+        failures = 0
+        while not self.stopping:
+            # Like a request would: drop connections past CONN_MAX_AGE or
+            # broken by a database restart, so the next query reconnects.
+            close_old_connections()
+            try:
+                jobs = self.run_batch(options['batch_size'])
+            except (OperationalError, InterfaceError):
+                if options['once']:
+                    raise
+                failures += 1
+                delay = min(options['interval'] * 2 ** failures, MAX_BACKOFF)
+                logger.exception('Database unavailable; retrying in %.0f seconds.', delay)
+                time.sleep(delay)
+                continue
+            failures = 0
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+
+    def run_batch(self, batch_size):
+        """Claim and run up to ``batch_size`` jobs; return the claimed jobs."""
+        jobs = claim(batch_size)
+        for job in jobs:
+            if self.stopping:
+                # Unstarted claims are picked up again after JOB_TIMEOUT.
+                break
+            ok = run(job)
+            self.stdout.write(f'{"Ran" if ok else "Failed"} {job.name} (attempt {job.attempts}).')
+        return jobs
+
+    def stop(self, signum, frame):
+        self.stopping = True
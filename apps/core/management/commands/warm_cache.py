@@ -0,0 +1,158 @@
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count, Q
+from django.test import Client
+from django.urls import reverse
+
+from apps.content.cache import get_category_post_counts
+from apps.content.models import Category, Page, Post, Tag
+
+
+def hot_urls(limit):
+    """
+    Return public URLs, those most likely to be requested first at the front.
+
+    The home page and blog index lead, then categories and tags by number of
+    published posts, then posts and pages, newest first.
+    """
+    urls = [reverse('core:home'), reverse('content:post_list')]
+
+    counts = get_category_post_counts()
+    categories = sorted(Category.objects.only('slug'), key=lambda category: -counts.get(category.pk, 0))
+    urls.extend(category.get_absolute_url() for category in categories)
+    tags = Tag.objects.annotate(
+        post_count=Count('posts', filter=Q(posts__status=Post.Status.PUBLISHED)),
+    ).order_by('-post_count', 'name')
+    urls.extend(tag.get_absolute_url() for tag in tags)
+
+    remaining = max(limit - len(urls), 0)
+    posts = Post.objects.filter(status=Post.Status.PUBLISHED).order_by('-published_at').only('slug', 'published_at')
+    pages = Page.objects.filter(status=Page.Status.PUBLISHED).order_by('-updated_at').only('slug', 'updated_at')
+    content = sorted(
+        [(post.published_at, post.get_absolute_url()) for post in posts[:remaining]]
+        + [(page.updated_at, page.get_absolute_url()) for page in pages[:remaining]],
+        reverse=True,
+    )
+    urls.extend(url for _, url in content)
+    return urls[:limit]
+
+
+def percentile(values, fraction):
+    """Return the value below which ``fraction`` of the sorted ``values`` fall."""
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Fetch the home page and published content, most requested first, to fill caches after a deploy or flush.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            help='Fetch over HTTP from this server (e.g. http://127.0.0.1:8000) instead of in this process.',
+        )
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once.')
+        parser.add_argument('--limit', type=int, default=1000, help='Maximum number of URLs to fetch.')
+        parser.add_argument('--timeout', type=float, default=30, help='Seconds to wait for each response.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1.')
+        self.verbosity = options['verbosity']
+        self.timeout = options['timeout']
+        self.base_url = options['base_url']
+        if self.base_url:
+            fetch = self.fetch_http
+        else:
+            fetch = self.fetch_wsgi
+            self.local = threading.local()
+        if not settings.SHARED_CACHE:
+            self.stderr.write(self.style.WARNING(
+                'Page and fragment caching are off without a shared cache (REDIS_URL), '
+                'so only database caches will be warmed.'
+            ))
+
+        urls = hot_urls(options['limit'])
+        start = time.perf_counter()
+        results = self.fetch_all(urls, fetch, options['concurrency'])
+        self.report(results, time.perf_counter() - start, options['concurrency'])
+
+    def fetch_all(self, urls, fetch, concurrency):
+        """Fetch ``urls`` from ``concurrency`` threads; return ``(url, status, x_cache, seconds)``."""
+        pending = queue.SimpleQueue()
+        for url in urls:
+            pending.put(url)
+        results = []
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        url = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    start = time.perf_counter()
+                    status, x_cache = fetch(url)
+                    elapsed = time.perf_counter() - start
+                    results.append((url, status, x_cache, elapsed))
+                    if self.verbosity > 1:
+                        self.stdout.write(f'{status or "ERR"} {x_cache or "-":4} {elapsed * 1000:7.1f} ms  {url}')
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(min(concurrency, len(urls)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def fetch_wsgi(self, url):
+        """Render ``url`` through Django's WSGI handler in this process."""
+        if not hasattr(self.local, 'client'):
+            site = urlsplit(settings.SITE_URL)
+            self.local.client = Client(raise_request_exception=False, SERVER_NAME=site.hostname or 'localhost')
+            self.local.secure = site.scheme == 'https'
+        response = self.local.client.get(url, secure=self.local.secure)
+        return response.status_code, response.get('X-Cache')
+
+    def fetch_http(self, url):
+        """Fetch ``url`` from the server at ``--base-url``."""
+        request = urllib.request.Request(urljoin(self.base_url, url), headers={'User-Agent': 'pkpycms-warm-cache'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status, response.headers.get('X-Cache')
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('X-Cache')
+        except OSError:
+            return None, None
+
+    def report(self, results, elapsed, concurrency):
+        self.stdout.write(f'Fetched {len(results)} URLs in {elapsed:.1f} s with {concurrency} workers.')
+        if not results:
+            return
+        cached = [x_cache for _, _, x_cache, _ in results if x_cache]
+        if cached:
+            hits = cached.count('HIT')
+            self.stdout.write(
+                f'Page cache hits: {hits}/{len(cached)} ({hits / len(cached):.0%}) before warming.'
+            )
+        times = sorted(seconds * 1000 for _, _, _, seconds in results)
+        self.stdout.write(
+            f'Response times: p50 {percentile(times, 0.5):.1f} ms, p95 {percentile(times, 0.95):.1f} ms, '
+            f'max {times[-1]:.1f} ms.'
+        )
+        failed = [(url, status) for url, status, _, _ in results if status != 200]
+        for url, status in failed:
+            self.stderr.write(f'{status or "No response"}: {url}')
+        if failed:
+            raise CommandError(f'{len(failed)} URLs did not return 200.')
+        self.stdout.write(self.style.SUCCESS('Caches are warm.'))
@@ -0,0 +1,257 @@
+"""
+Per-view request metrics.
+
+Each worker process keeps in-memory counters keyed by resolved URL name.
+Threads of a process (gunicorn's gthread workers) share them under a lock
+held only for the few additions of one request. When ``METRICS_DIR`` is
+set, every worker
+periodically dumps its counters to ``<METRICS_DIR>/<pid>.json`` and the
+metrics endpoint sums all dumps, which is how numbers from several
+gunicorn workers end up in a single Prometheus scrape.
+
+When a worker exits, ``mark_process_dead`` folds its dump into
+``<METRICS_DIR>/archive.json`` and deletes it, so the totals keep growing
+while the number of files stays bounded. ``gunicorn.conf.py`` calls it
+from gunicorn's ``child_exit`` hook.
+
+Template render time is measured by wrapping ``Template.render`` (see
+``instrument_templates``); only the outermost render of a request counts,
+so included templates are not added twice.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template.base import Template
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process, nothing to coordinate
+    fcntl = None
+
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Positions of the scalar counters in each per-view row; the histogram
+# bucket counts follow them.
+COUNT, LATENCY_SUM, DB_QUERIES, DB_SECONDS, TEMPLATE_SECONDS, CACHE_HITS, CACHE_MISSES, RESPONSE_BYTES = range(8)
+BUCKETS_START = 8
+
+ARCHIVE_NAME = 'archive.json'
+
+_views = {}
+_last_flush = 0.0
+# Guards _views and _last_flush.
+_lock = threading.Lock()
+_template_timer = contextvars.ContextVar('template_timer', default=None)
+
+
+def _new_row():
+    return [0] * (BUCKETS_START + len(LATENCY_BUCKETS) + 1)
+
+
+def record(view_name, latency, db_queries, db_seconds, template_seconds, cache_hit, response_bytes):
+    """Add one finished request to this process's counters."""
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if latency <= bound:
+            bucket = BUCKETS_START + index
+            break
+    else:
+        bucket = BUCKETS_START + len(LATENCY_BUCKETS)
+
+    with _lock:
+        row = _views.get(view_name)
+        if row is None:
+            row = _views[view_name] = _new_row()
+
+        row[COUNT] += 1
+        row[LATENCY_SUM] += latency
+        row[DB_QUERIES] += db_queries
+        row[DB_SECONDS] += db_seconds
+        row[TEMPLATE_SECONDS] += template_seconds
+        if cache_hit is True:
+            row[CACHE_HITS] += 1
+        elif cache_hit is False:
+            row[CACHE_MISSES] += 1
+        row[RESPONSE_BYTES] += response_bytes
+        row[bucket] += 1
+
+    maybe_flush()
+
+
+class TemplateTimer:
+    """Seconds spent in top-level template renders during one request."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.depth = 0
+
+
+@contextmanager
+def time_templates():
+    """Time template renders in the enclosed block; yields a ``TemplateTimer``."""
+    timer = TemplateTimer()
+    token = _template_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _template_timer.reset(token)
+
+
+def instrument_templates():
+    """Wrap ``Template.render`` once so ``time_templates`` sees every render."""
+    if getattr(Template.render, 'metrics_instrumented', False):
+        return
+    render = Template.render
+
+    def timed_render(self, context):
+        timer = _template_timer.get()
+        if timer is None:
+            return render(self, context)
+        timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            timer.depth -= 1
+            if not timer.depth:
+                timer.seconds += time.perf_counter() - start
+
+    timed_render.metrics_instrumented = True
+    Template.render = timed_render
+
+
+@contextmanager
+def _locked(exclusive):
+    """Hold a lock on ``METRICS_DIR`` so readers never see a half-archived worker."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    with open(os.path.join(settings.METRICS_DIR, '.lock'), 'a') as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _read(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _add(totals, snapshot):
+    for name, row in snapshot.items():
+        total = totals.setdefault(name, _new_row())
+        for index, value in enumerate(row):
+            total[index] += value
+
+
+def _write(path, views):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as fh:
+        json.dump(views, fh)
+    os.replace(tmp_path, path)
+
+
+def mark_process_dead(pid):
+    """Fold the dump of an exited worker into the archive and delete it."""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    path = os.path.join(directory, f'{pid}.json')
+    with _locked(exclusive=True):
+        snapshot = _read(path)
+        if snapshot is None:
+            return
+        archive_path = os.path.join(directory, ARCHIVE_NAME)
+        totals = _read(archive_path) or {}
+        _add(totals, snapshot)
+        _write(archive_path, totals)
+        os.remove(path)
+
+
+def maybe_flush(force=False):
+    """Write this process's counters to ``METRICS_DIR`` at most once per interval."""
+    global _last_flush
+
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    with _lock:
+        # Held while writing too, so two threads never share the temp file.
+        _last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        _write(os.path.join(directory, f'{os.getpid()}.json'), _views)
+
+
+def collect():
+    """Return counters summed over every worker that has reported."""
+    if not settings.METRICS_DIR:
+        with _lock:
+            return {name: list(row) for name, row in _views.items()}
+
+    maybe_flush(force=True)
+    totals = {}
+    with _locked(exclusive=False):
+        for entry in os.scandir(settings.METRICS_DIR):
+            if not entry.name.endswith('.json'):
+                continue
+            snapshot = _read(entry.path)
+            if snapshot is not None:
+                _add(totals, snapshot)
+    return totals
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(views):
+    """Render collected counters in the Prometheus text exposition format."""
+    lines = [
+        '# HELP pkpycms_request_duration_seconds Request latency by view.',
+        '# TYPE pkpycms_request_duration_seconds histogram',
+    ]
+    for name, row in sorted(views.items()):
+        label = f'view="{_escape(name)}"'
+        cumulative = 0
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            cumulative += row[BUCKETS_START + index]
+            lines.append(f'pkpycms_request_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f'pkpycms_request_duration_seconds_bucket{{{label},le="+Inf"}} {row[COUNT]}')
+        lines.append(f'pkpycms_request_duration_seconds_sum{{{label}}} {row[LATENCY_SUM]}')
+        lines.append(f'pkpycms_request_duration_seconds_count{{{label}}} {row[COUNT]}')
+
+    counters = (
+        ('pkpycms_db_queries_total', 'Database queries executed by view.', DB_QUERIES),
+        ('pkpycms_db_query_seconds_total', 'Time spent in database queries by view.', DB_SECONDS),
+        ('pkpycms_template_render_seconds_total', 'Time spent rendering templates by view.', TEMPLATE_SECONDS),
+        ('pkpycms_response_bytes_total', 'Response body bytes by view.', RESPONSE_BYTES),
+    )
+    for metric, help_text, column in counters:
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for name, row in sorted(views.items()):
+            lines.append(f'{metric}{{view="{_escape(name)}"}} {row[column]}')
+
+    lines.append('# HELP pkpycms_cache_requests_total Cache lookups by view and result.')
+    lines.append('# TYPE pkpycms_cache_requests_total counter')
+    for name, row in sorted(views.items()):
+        lines.append(f'pkpycms_cache_requests_total{{view="{_escape(name)}",result="hit"}} {row[CACHE_HITS]}')
+        lines.append(f'pkpycms_cache_requests_total{{view="{_escape(name)}",result="miss"}} {row[CACHE_MISSES]}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,165 @@
+import cProfile
+import json
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import reverse
+
+from . import metrics
+from .budgets import QueryRecorder
+from .page_cache import fill_holes, is_cacheable, page_cache_key
+
+
+class QueryCounter:
+    """Execute wrapper that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, database, template, cache and size metrics per URL name.
+
+    Views and caches can report a cache lookup by setting
+    ``request.cache_hit`` to True or False; Django's own
+    ``FetchFromCacheMiddleware`` is picked up automatically. Template time
+    covers ``render()`` and ``TemplateResponse`` alike.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.instrument_templates()
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter), metrics.time_templates() as templates:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view_name = match.view_name if match else '<unresolved>'
+
+        cache_hit = getattr(request, 'cache_hit', None)
+        if cache_hit is None and hasattr(request, '_cache_update_cache'):
+            cache_hit = not request._cache_update_cache
+
+        if response.streaming:
+            response_bytes = int(response.get('Content-Length') or 0)
+        else:
+            response_bytes = len(response.content)
+
+        metrics.record(
+            view_name,
+            time.perf_counter() - start,
+            counter.count,
+            counter.seconds,
+            templates.seconds,
+            cache_hit,
+            response_bytes,
+        )
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Profile a single request on demand for staff users.
+
+    Add ``?_profile=1`` or send an ``X-Profile: 1`` header. The cProfile
+    stats and the SQL executed (with timings and template origins) are
+    saved under ``PROFILE_DIR`` and the response carries an
+    ``X-Profile-URL`` header pointing at the download. Requests without
+    the trigger only pay for the two lookups below.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if '_profile' not in request.GET and 'HTTP_X_PROFILE' not in request.META:
+            return self.get_response(request)
+        if not request.user.is_staff:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        with QueryRecorder() as recorder:
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+
+        profile_id = uuid.uuid4().hex
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(settings.PROFILE_DIR, f'{profile_id}.prof'))
+        with open(os.path.join(settings.PROFILE_DIR, f'{profile_id}.sql.json'), 'w') as fh:
+            json.dump({
+                'path': request.get_full_path(),
+                'seconds': elapsed,
+                'queries': recorder.queries,
+            }, fh, indent=2)
+
+        response['X-Profile-URL'] = reverse('core:profile_download', kwargs={'profile_id': profile_id})
+        return response
+
+
+class HolePunchedCacheMiddleware:
+    """
+    Serve cached anonymous renders of public pages to every visitor.
+
+    Only anonymous requests fill the cache, so drafts that editors can
+    preview are never stored. Any visitor, logged in or not, can be served
+    from it: the user-specific ``{% hole %}`` blocks are rendered for them
+    and spliced in. Covered views are listed in ``PAGE_CACHE_VIEWS``.
+
+    Covered responses carry ``X-Cache: HIT`` or ``X-Cache: MISS``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        key = getattr(request, '_page_cache_key', None)
+        if key is not None and response.status_code == 200 and not response.streaming:
+            content = response.content.decode(response.charset)
+            cache.set(key, (content, response['Content-Type']), settings.PAGE_CACHE_TIMEOUT)
+            response.content = fill_holes(content, request)
+        if getattr(request, 'cache_hit', None) is not None:
+            response['X-Cache'] = 'HIT' if request.cache_hit else 'MISS'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not is_cacheable(request):
+            return None
+
+        key = page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            request.cache_hit = True
+            content, content_type = cached
+            return HttpResponse(fill_holes(content, request), content_type=content_type)
+
+        request.cache_hit = False
+        if not request.user.is_authenticated:
+            # Render user-specific blocks as markers so the page can be shared.
+            request.punch_holes = True
+            request._page_cache_key = key
+        return None
@@ -1 +1,47 @@
-# Core app has no models - it provides utilities and shared functionality
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A queued call to a ``@task`` function, run by ``run_worker``.
+
+    See ``apps.core.jobs``. Finished jobs are deleted; failed ones stay
+    with their last traceback until retried or removed.
+    """
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        FAILED = 'failed', 'Failed'
+    
+    name = models.CharField(max_length=255, help_text='Dotted path of the task function')
+    kwargs = models.JSONField(default=dict)
+    dedupe_key = models.CharField(max_length=40)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    priority = models.SmallIntegerField(default=0, help_text='Higher runs first')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'job'
+        verbose_name_plural = 'jobs'
+        ordering = ['-priority', 'run_at']
+        indexes = [
+            # Used by workers to claim the next due jobs
+            models.Index(fields=['status', '-priority', 'run_at'], name='job_queue_idx'),
+        ]
+        constraints = [
+            # At most one pending copy of the same call
+            models.UniqueConstraint(
+                fields=['dedupe_key'], condition=Q(status='pending'), name='job_pending_dedupe'
+            ),
+        ]
+    
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display().lower()})'
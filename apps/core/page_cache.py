@@ -0,0 +1,99 @@
+"""
+Hole-punched full-page caching.
+
+Public pages are cached as their anonymous render, with every
+user-specific block (user menu, flash messages, edit links...) replaced by
+a ``<!--hole:...-->`` marker emitted by the ``{% hole %}`` tag. On each
+request the markers are swapped for those small templates rendered for the
+current user, so logged-in editors get cache hits too.
+
+A marker carries the partial's template name and the JSON-serializable
+arguments it was given, which is all that is needed to render it again
+without running the view. Markers are signed, so a lookalike comment in
+author-supplied HTML is left as it is rather than rendered.
+
+Only the query parameters in ``CACHED_QUERY_PARAMS`` are part of the cache
+key. Requests with any other parameter are not cached, so junk query
+strings cannot fill the cache.
+
+Pages are only cached with ``SHARED_CACHE``: a per-process cache would
+keep serving unpublished or deleted pages from every worker but the one
+that made the change.
+"""
+
+import base64
+import json
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.template.loader import render_to_string
+from django.utils.encoding import iri_to_uri
+
+from apps.content.cache import get_content_version
+
+
+HOLE_RE = re.compile(r'<!--hole:([A-Za-z0-9_=-]+:[A-Za-z0-9_-]+)-->')
+
+hole_signer = signing.Signer(salt='apps.core.page_cache.hole')
+
+# Query parameters cached views read; each must hold a canonical page number.
+CACHED_QUERY_PARAMS = {'page'}
+
+
+def cached_query(request):
+    """Return the normalized query string for the cache key, or None if the request must not be cached."""
+    parts = []
+    for name in sorted(request.GET):
+        values = request.GET.getlist(name)
+        value = values[0]
+        if name not in CACHED_QUERY_PARAMS or len(values) > 1 or not value.isdigit() or value != str(int(value)):
+            return None
+        parts.append(f'{name}={value}')
+    return '&'.join(parts)
+
+
+def page_cache_key(request):
+    """Key for the anonymous render of this URL at the current content version."""
+    return f'page:{get_content_version()}:{iri_to_uri(request.path)}?{cached_query(request)}'
+
+
+def make_marker(template_name, arguments):
+    payload = json.dumps([template_name, arguments], separators=(',', ':'))
+    token = hole_signer.sign(base64.urlsafe_b64encode(payload.encode()).decode())
+    return f'<!--hole:{token}-->'
+
+
+def render_hole(template_name, arguments, request):
+    return render_to_string(template_name, arguments, request=request)
+
+
+def fill_holes(content, request):
+    """Render every hole marker in ``content`` for the current request."""
+    rendered = {}
+
+    def replace(match):
+        token = match.group(1)
+        if token not in rendered:
+            try:
+                payload = hole_signer.unsign(token)
+            except signing.BadSignature:
+                # Not emitted by {% hole %}: page content that merely looks like a marker.
+                rendered[token] = match.group(0)
+            else:
+                template_name, arguments = json.loads(base64.urlsafe_b64decode(payload))
+                rendered[token] = render_hole(template_name, arguments, request)
+        return rendered[token]
+
+    return HOLE_RE.sub(replace, content)
+
+
+def is_cacheable(request):
+    match = request.resolver_match
+    return (
+        settings.SHARED_CACHE
+        and request.method in ('GET', 'HEAD')
+        and match is not None
+        and match.view_name in settings.PAGE_CACHE_VIEWS
+        and cached_query(request) is not None
+    )
@@ -0,0 +1,148 @@
+"""
+Server-searched pickers for relation fields.
+
+A ``<select>`` listing every related row is fine for ten categories and
+useless for a hundred thousand media files. ``PickerSelect`` and
+``PickerSelectMultiple`` render only the selected options. A select2 box
+(``static/js/picker.js``) fetches the rest, twenty at a time, from a
+``PickerView`` subclass as the user types.
+
+``PickerView`` responses use select2's format::
+
+    {"results": [{"id": "12", "text": "Holiday", "thumbnail": "/media/..."}],
+     "pagination": {"more": true}}
+
+``thumbnail`` is optional. Pages are fetched one row past the page size
+to set ``more``, so the table is never counted.
+
+As with the admin's own autocomplete, only staff who may view or change
+the model get results; anyone else gets a 403.
+"""
+
+from functools import reduce
+from operator import or_
+
+from django import forms
+from django.conf import settings
+from django.contrib.admin.widgets import get_select2_language
+from django.contrib.auth import get_permission_codename
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.db.models import Q
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views import View
+
+
+PAGE_SIZE = 20
+
+
+def select2_media(js=(), css=()):
+    """
+    The select2 assets shipped with the admin, usable on any page, followed
+    by ``js`` and ``css`` that depend on them.
+    """
+    extra = '' if settings.DEBUG else '.min'
+    language = get_select2_language()
+    i18n = (f'admin/js/vendor/select2/i18n/{language}.js',) if language else ()
+    return forms.Media(
+        js=(
+            f'admin/js/vendor/jquery/jquery{extra}.js',
+            f'admin/js/vendor/select2/select2.full{extra}.js',
+            *i18n,
+            'admin/js/jquery.init.js',
+            *js,
+        ),
+        css={'screen': (f'admin/css/vendor/select2/select2{extra}.css', *css)},
+    )
+
+
+class PickerView(UserPassesTestMixin, View):
+    """Paginated JSON search over one model for the picker widgets."""
+
+    model = None
+    search_fields = ()
+    ordering = None
+    raise_exception = True
+
+    def test_func(self):
+        user = self.request.user
+        if not (user.is_active and user.is_staff):
+            return False
+        opts = self.model._meta
+        return any(
+            user.has_perm(f'{opts.app_label}.{get_permission_codename(action, opts)}')
+            for action in ('view', 'change')
+        )
+
+    def get_queryset(self):
+        queryset = self.model._default_manager.all()
+        if self.ordering:
+            queryset = queryset.order_by(*self.ordering)
+        return queryset
+
+    def search(self, queryset, term):
+        if not term:
+            return queryset
+        return queryset.filter(reduce(or_, (Q(**{f'{field}__icontains': term}) for field in self.search_fields)))
+
+    def serialize(self, obj):
+        return {'id': str(obj.pk), 'text': str(obj)}
+
+    def get(self, request, *args, **kwargs):
+        try:
+            page = max(int(request.GET.get('page') or 1), 1)
+        except ValueError:
+            page = 1
+        offset = (page - 1) * PAGE_SIZE
+        queryset = self.search(self.get_queryset(), request.GET.get('q', '').strip())
+        rows = list(queryset[offset:offset + PAGE_SIZE + 1])
+        return JsonResponse({
+            'results': [self.serialize(obj) for obj in rows[:PAGE_SIZE]],
+            'pagination': {'more': len(rows) > PAGE_SIZE},
+        })
+
+
+class PickerMixin:
+    """Render only the selected choices and point select2 at ``url_name``."""
+
+    def __init__(self, url_name, attrs=None):
+        self.url_name = url_name
+        super().__init__(attrs)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['class'] = ' '.join(filter(None, [attrs.get('class'), 'picker']))
+        attrs['data-picker-url'] = reverse(self.url_name)
+        return attrs
+
+    def option_attrs(self, obj):
+        """Extra attributes for the ``<option>`` of a selected object."""
+        return {}
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = {str(v) for v in value if str(v) not in field.empty_values}
+        options = []
+        if not self.allow_multiple_selected and not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        if selected:
+            key = field.to_field_name or 'pk'
+            for obj in self.choices.queryset.filter(**{f'{key}__in': selected}):
+                option = self.create_option(
+                    name, field.prepare_value(obj), field.label_from_instance(obj), True, len(options)
+                )
+                option['attrs'].update(self.option_attrs(obj))
+                options.append(option)
+        return [(None, options, 0)]
+
+    @property
+    def media(self):
+        return select2_media(js=('js/picker.js',), css=('css/picker.css',))
+
+
+class PickerSelect(PickerMixin, forms.Select):
+    pass
+
+
+class PickerSelectMultiple(PickerMixin, forms.SelectMultiple):
+    pass
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.content.models import Page, Post
+from apps.content.signals import content_published, content_updated
+
+from .jobs import enqueue
+from .search import backend_implements
+from .tasks import remove_search, update_search
+
+
+SEARCH_KINDS = {Post: 'post', Page: 'page'}
+
+
+# Indexing runs in the job queue. Jobs are created on commit, so a
+# rolled-back save never reaches the index. Backends without an index
+# (the default DatabaseSearchBackend) get no jobs.
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Page)
+def content_saved(sender, instance, **kwargs):
+    """Let the search backend re-index saved content (or drop unpublished)."""
+    if backend_implements('update'):
+        enqueue(update_search, kind=SEARCH_KINDS[sender], pks=[instance.pk])
+
+
+@receiver(content_published)
+@receiver(content_updated)
+def content_changed_in_bulk(sender, pks, **kwargs):
+    if backend_implements('update'):
+        enqueue(update_search, kind=SEARCH_KINDS[sender], pks=list(pks))
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Page)
+def content_deleted(sender, instance, **kwargs):
+    if backend_implements('remove'):
+        enqueue(remove_search, kind=SEARCH_KINDS[sender], pks=[instance.pk])
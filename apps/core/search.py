@@ -0,0 +1,249 @@
+"""
+Site search over published posts and pages.
+
+``search(query, filters)`` returns a lazy ``SearchResults`` that Django's
+paginator can count and slice. Only the requested slice is loaded, with
+highlighted titles and snippets. ``SearchResults.facets()`` counts matches
+by type, category, tag, author and year. The number of queries per results
+page is fixed, however many facet values there are.
+
+Filters are ``type`` ('post' or 'page'), ``category`` and ``tag`` (slugs),
+``author`` (user id) and ``year``. Category and tag filters only match
+posts.
+
+Matching is delegated to the backend named by ``SEARCH_BACKEND``:
+``DatabaseSearchBackend`` runs ``icontains`` queries, while
+``apps.core.search_index.IndexSearchBackend`` ranks with BM25 over an on-disk
+inverted index. Both expose the same API.
+"""
+
+import html
+import re
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Count, Q, Value
+from django.db.models.functions import ExtractYear
+from django.utils.html import escape, strip_tags
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from apps.content.models import Page, Post
+from apps.users.models import User
+
+
+MAX_TERMS = 8
+SNIPPET_LENGTH = 200
+
+MODELS = {'post': Post, 'page': Page}
+
+
+def parse_terms(query):
+    return [term for term in query.split() if term][:MAX_TERMS]
+
+
+def highlight(text, terms):
+    """Escape ``text`` and wrap every occurrence of ``terms`` in ``<mark>``."""
+    if not terms:
+        return escape(text)
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts, last = [], 0
+    for match in pattern.finditer(text):
+        parts.append(escape(text[last:match.start()]))
+        parts.append(f'<mark>{escape(match.group())}</mark>')
+        last = match.end()
+    parts.append(escape(text[last:]))
+    return mark_safe(''.join(parts))
+
+
+def plain_text(obj):
+    """Return the content of a post or page as whitespace-normalized text."""
+    return ' '.join(html.unescape(strip_tags(obj.content.html)).split())
+
+
+def make_snippet(obj, terms):
+    """Return a highlighted window of the content around the first match."""
+    text = plain_text(obj)
+    lowered = text.casefold()
+    positions = [lowered.find(term.casefold()) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    if not positions:
+        return highlight(obj.excerpt or text[:SNIPPET_LENGTH], terms)
+
+    start = max(min(positions) - SNIPPET_LENGTH // 4, 0)
+    snippet = text[start:start + SNIPPET_LENGTH]
+    prefix = '… ' if start else ''
+    suffix = ' …' if start + SNIPPET_LENGTH < len(text) else ''
+    return mark_safe(prefix + highlight(snippet, terms) + suffix)
+
+
+class SearchHit:
+    """One result: the object plus its highlighted title and snippet."""
+
+    def __init__(self, kind, obj, terms):
+        self.kind = kind
+        self.object = obj
+        self.title = highlight(obj.title, terms)
+        self.snippet = make_snippet(obj, terms)
+
+    def get_absolute_url(self):
+        return self.object.get_absolute_url()
+
+
+class SearchBackend:
+    """
+    Base class for search engines.
+
+    Subclasses implement ``restrict()`` to narrow a model's published rows to
+    those matching ``terms``. They may override ``match()`` to rank results,
+    and ``update()``/``remove()`` to keep an index in step with content
+    changes.
+    """
+
+    def restrict(self, kind, queryset, terms):
+        raise NotImplementedError
+
+    def bind(self):
+        """Return the backend to run one query with; it may memoize per query."""
+        return self
+
+    def update(self, kind, pks):
+        """Called after the given objects are saved or published."""
+
+    def remove(self, kind, pks):
+        """Called after the given objects are deleted."""
+
+    def querysets(self, terms, filters):
+        """Return ``{kind: queryset}`` of matching published content."""
+        querysets = {}
+        for kind, model in MODELS.items():
+            if filters.get('type') not in (None, kind):
+                continue
+            if kind == 'page' and (filters.get('category') or filters.get('tag')):
+                continue
+            queryset = self.restrict(kind, model.objects.filter(status=model.Status.PUBLISHED), terms)
+            if filters.get('author'):
+                queryset = queryset.filter(author_id=filters['author'])
+            if filters.get('year'):
+                queryset = queryset.filter(published_at__year=filters['year'])
+            if filters.get('category'):
+                queryset = queryset.filter(categories__slug=filters['category'])
+            if filters.get('tag'):
+                queryset = queryset.filter(tags__slug=filters['tag'])
+            querysets[kind] = queryset
+        return querysets
+
+    def match(self, terms, filters, offset, limit):
+        """Return ``[(kind, pk)]`` for one page of results, newest first."""
+        ranked = [
+            queryset.annotate(kind=Value(kind)).values_list('kind', 'pk', 'published_at').order_by()
+            for kind, queryset in self.querysets(terms, filters).items()
+        ]
+        if not ranked:
+            return []
+        combined = ranked[0].union(*ranked[1:]) if len(ranked) > 1 else ranked[0]
+        return [(kind, pk) for kind, pk, published_at in combined.order_by('-published_at', '-pk')[offset:offset + limit]]
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """Match terms with ``icontains`` on title, excerpt and content."""
+
+    def restrict(self, kind, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(excerpt__icontains=term) | Q(content__icontains=term)
+            )
+        return queryset
+
+
+class SearchResults:
+    """Lazy, countable and sliceable search results for one query."""
+
+    def __init__(self, backend, query, filters):
+        self.backend = backend.bind()
+        self.terms = parse_terms(query)
+        self.filters = filters
+        self._facets = None
+
+    def count(self):
+        return sum(self.facets()['type'].values())
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        offset = index.start or 0
+        limit = (index.stop if index.stop is not None else self.count()) - offset
+        if not self.terms or limit <= 0:
+            return []
+        refs = self.backend.match(self.terms, self.filters, offset, limit)
+
+        objects = {}
+        for kind, model in MODELS.items():
+            pks = [pk for ref_kind, pk in refs if ref_kind == kind]
+            if pks:
+                queryset = model.objects.filter(pk__in=pks).select_related('author')
+                objects.update(((kind, obj.pk), obj) for obj in queryset)
+        return [SearchHit(kind, objects[(kind, pk)], self.terms) for kind, pk in refs if (kind, pk) in objects]
+
+    def facets(self):
+        """Return ``{facet: Counter}``; category and tag keys are ``(slug, name)``."""
+        if self._facets is None:
+            self._facets = self._count_facets()
+        return self._facets
+
+    def _count_facets(self):
+        facets = {name: Counter() for name in ('type', 'category', 'tag', 'author', 'year')}
+        if not self.terms:
+            return facets
+        querysets = self.backend.querysets(self.terms, self.filters)
+
+        authors = {}
+        for kind, queryset in querysets.items():
+            # Author and year together: one small grouped query per model
+            rows = (
+                queryset.order_by()
+                .values('author_id', 'author__first_name', 'author__last_name', 'author__email')
+                .annotate(year=ExtractYear('published_at'), hits=Count('pk'))
+            )
+            for row in rows:
+                facets['type'][kind] += row['hits']
+                facets['year'][row['year']] += row['hits']
+                if row['author_id']:
+                    facets['author'][row['author_id']] += row['hits']
+                    authors[row['author_id']] = User(
+                        first_name=row['author__first_name'],
+                        last_name=row['author__last_name'],
+                        email=row['author__email'],
+                    ).get_display_name()
+
+        if 'post' in querysets:
+            for field_name, relation in (('category', Post.categories), ('tag', Post.tags)):
+                through = relation.through
+                rows = (
+                    through.objects.filter(post__in=querysets['post'].values('pk'))
+                    .values(f'{field_name}__slug', f'{field_name}__name')
+                    .annotate(hits=Count('post_id'))
+                )
+                for row in rows:
+                    facets[field_name][(row[f'{field_name}__slug'], row[f'{field_name}__name'])] = row['hits']
+
+        facets['author'] = Counter({(pk, authors[pk]): hits for pk, hits in facets['author'].items()})
+        return facets
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def backend_implements(method):
+    """Whether the configured backend overrides ``update`` or ``remove``."""
+    return getattr(import_string(settings.SEARCH_BACKEND), method) is not getattr(SearchBackend, method)
+
+
+def search(query, filters=None):
+    return SearchResults(get_backend(), query, filters or {})
@@ -0,0 +1,342 @@
+"""
+Pure-Python inverted index with BM25 ranking.
+
+This is for deployments without PostgreSQL full-text search, such as SQLite
+sites and CI, where ``icontains`` over the content column scans every row.
+Enable it with ``SEARCH_BACKEND=apps.core.search_index.IndexSearchBackend``.
+
+On disk, in ``SEARCH_INDEX_DIR``:
+
+``CURRENT``
+    The generation number of the live segment.
+``segment-<gen>.postings``
+    Native-endian uint32 arrays. Each term's document numbers are followed
+    by its term frequencies. The file is memory-mapped, so workers share
+    the pages through the OS cache.
+``segment-<gen>.json``
+    The vocabulary (``term -> [offset, df]``) and the document table
+    (``[kind, pk, length]`` per document number).
+``segment-<gen>.log``
+    An append-only JSON Lines journal of documents added or removed since
+    the segment was built. Every worker replays new lines before searching,
+    and journaled entries supersede the segment's copy of a document.
+
+``build_search_index`` writes a fresh segment from the database and folds
+in the journal. Run it once to create the index and then periodically to
+compact the journal. Until the first segment exists, searches fall back to
+``DatabaseSearchBackend`` and a ``build_index`` job is queued.
+
+Only the ``MAX_MATCHES`` best matches are handed to the database, so
+filters, facets and the result count cover those.
+"""
+
+import json
+import math
+import mmap
+import os
+import threading
+from array import array
+from collections import Counter
+
+from django.conf import settings
+
+from apps.content.suggest import normalize
+
+from .jobs import enqueue, task
+from .search import MODELS, DatabaseSearchBackend, SearchBackend, plain_text
+
+
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 3
+# Cap on ranked matches handed to the database for filters and facets.
+# Each becomes a query parameter; SQLite allows 999 by default.
+MAX_MATCHES = 500
+
+
+def tokenize(text):
+    return normalize(text).split()
+
+
+def document_terms(obj):
+    """Term frequencies for one post or page; title terms count extra."""
+    terms = Counter(tokenize(obj.title) * TITLE_WEIGHT)
+    terms.update(tokenize(obj.excerpt))
+    terms.update(tokenize(plain_text(obj)))
+    return terms
+
+
+def load_documents(kind, pks=None):
+    """Yield ``(pk, term counts)`` for published content of one kind."""
+    model = MODELS[kind]
+    queryset = model.objects.filter(status=model.Status.PUBLISHED).only('pk', 'title', 'excerpt', 'content')
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    for obj in queryset.order_by('pk').iterator(chunk_size=500):
+        yield obj.pk, document_terms(obj)
+
+
+class InvertedIndex:
+    """One process's view of the on-disk index."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.generation = None
+        self.mapped = None
+        self.postings = None
+        self.lock = threading.Lock()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    # Writing
+
+    def build(self):
+        """Write a new segment from the database and make it current."""
+        os.makedirs(self.directory, exist_ok=True)
+        old_generation = self.read_current()
+        old_log = self.path(f'segment-{old_generation}.log') if old_generation is not None else None
+        log_start = os.path.getsize(old_log) if old_log and os.path.exists(old_log) else 0
+
+        postings = {}
+        documents = []
+        for kind in MODELS:
+            for pk, terms in load_documents(kind):
+                number = len(documents)
+                documents.append([kind, pk, sum(terms.values())])
+                for term, frequency in terms.items():
+                    postings.setdefault(term, []).append((number, frequency))
+
+        generation = (old_generation or 0) + 1
+        vocabulary = {}
+        data = array('I')
+        for term in sorted(postings):
+            entries = postings[term]
+            vocabulary[term] = [len(data), len(entries)]
+            data.extend(number for number, frequency in entries)
+            data.extend(frequency for number, frequency in entries)
+
+        with open(self.path(f'segment-{generation}.postings'), 'wb') as fh:
+            data.tofile(fh)
+        with open(self.path(f'segment-{generation}.json'), 'w') as fh:
+            json.dump({'documents': documents, 'terms': vocabulary}, fh, separators=(',', ':'))
+
+        # Carry over changes journaled while the segment was being built,
+        # then once more for any written while CURRENT was being switched.
+        log_path = self.path(f'segment-{generation}.log')
+        log_start = self.copy_log_tail(old_log, log_start, log_path)
+        tmp_path = self.path('CURRENT.tmp')
+        with open(tmp_path, 'w') as fh:
+            fh.write(str(generation))
+        os.replace(tmp_path, self.path('CURRENT'))
+        self.copy_log_tail(old_log, log_start, log_path)
+
+        for name in os.listdir(self.directory):
+            prefix, _, suffix = name.partition('.')
+            if prefix.startswith('segment-') and prefix != f'segment-{generation}':
+                os.remove(self.path(name))
+        return len(documents)
+
+    def copy_log_tail(self, source, start, destination):
+        """Append ``source`` from byte ``start`` to ``destination``; return the new end."""
+        if not source or not os.path.exists(source):
+            return start
+        with open(source, 'rb') as fh, open(destination, 'ab') as log:
+            fh.seek(start)
+            tail = fh.read()
+            log.write(tail)
+        return start + len(tail)
+
+    def journal(self, entries):
+        """Append ``[kind, pk, length, {term: tf}]`` entries (length 0 removes)."""
+        generation = self.read_current()
+        if generation is None:
+            return
+        lines = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+        if not lines:
+            return
+        # A single O_APPEND write keeps concurrent workers' lines intact.
+        fd = os.open(self.path(f'segment-{generation}.log'), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode())
+        finally:
+            os.close(fd)
+
+    # Reading
+
+    def read_current(self):
+        try:
+            with open(self.path('CURRENT')) as fh:
+                return int(fh.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def refresh(self):
+        """Open a newer segment and replay new journal lines; False if none is built yet."""
+        generation = self.read_current()
+        if generation is None:
+            return False
+        if generation != self.generation:
+            try:
+                self.open(generation)
+            except FileNotFoundError:
+                # A concurrent build replaced the segment; open the new one.
+                self.open(self.read_current())
+        self.replay()
+        return True
+
+    def open(self, generation):
+        with open(self.path(f'segment-{generation}.json')) as fh:
+            meta = json.load(fh)
+        self.terms = meta['terms']
+        self.documents = meta['documents']
+        self.base_numbers = {(kind, pk): number for number, (kind, pk, length) in enumerate(self.documents)}
+        self.base_length = sum(length for kind, pk, length in self.documents)
+
+        old_mapped, old_postings = self.mapped, self.postings
+        with open(self.path(f'segment-{generation}.postings'), 'rb') as fh:
+            if os.fstat(fh.fileno()).st_size:
+                self.mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                self.postings = memoryview(self.mapped).cast('I')
+            else:
+                self.mapped, self.postings = None, memoryview(array('I'))
+        # Unmap the replaced segment; its file is already deleted.
+        if old_postings is not None:
+            old_postings.release()
+        if old_mapped is not None:
+            old_mapped.close()
+
+        self.generation = generation
+        self.log_offset = 0
+        self.overrides = {}
+
+    def replay(self):
+        log_path = self.path(f'segment-{self.generation}.log')
+        try:
+            size = os.path.getsize(log_path)
+        except FileNotFoundError:
+            return
+        if size <= self.log_offset:
+            return
+        with open(log_path, 'rb') as fh:
+            fh.seek(self.log_offset)
+            chunk = fh.read(size - self.log_offset)
+        # Ignore a trailing line another worker is still writing.
+        complete = chunk[:chunk.rfind(b'\n') + 1]
+        for line in complete.splitlines():
+            kind, pk, length, terms = json.loads(line)
+            self.overrides[(kind, pk)] = (length, terms)
+        self.log_offset += len(complete)
+
+    def search(self, terms):
+        """
+        Return ``[(kind, pk)]`` containing every term, best BM25 score first.
+
+        Return None while no segment has been built.
+        """
+        with self.lock:
+            if not self.refresh():
+                return None
+            live_overrides = {key: value for key, value in self.overrides.items() if value[0]}
+            masked = {self.base_numbers[key] for key in self.overrides if key in self.base_numbers}
+            total_docs = len(self.documents) - len(masked) + len(live_overrides)
+            if not total_docs:
+                return []
+            # Lengths of masked documents stay in the average; the skew is
+            # small and disappears at the next build.
+            average_length = (self.base_length + sum(value[0] for value in live_overrides.values())) / (
+                len(self.documents) + len(live_overrides)
+            )
+
+            scores = None
+            for term in dict.fromkeys(terms):
+                frequencies = {}
+                offset, df = self.terms.get(term, (0, 0))
+                numbers = self.postings[offset:offset + df]
+                counts = self.postings[offset + df:offset + 2 * df]
+                for number, frequency in zip(numbers, counts):
+                    if number not in masked:
+                        kind, pk, length = self.documents[number]
+                        frequencies[(kind, pk)] = (frequency, length)
+                for key, (length, document) in live_overrides.items():
+                    if term in document:
+                        frequencies[key] = (document[term], length)
+                if not frequencies:
+                    return []
+
+                idf = math.log(1 + (total_docs - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+                term_scores = {
+                    key: idf * frequency * (K1 + 1) / (frequency + K1 * (1 - B + B * length / average_length))
+                    for key, (frequency, length) in frequencies.items()
+                }
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+                if not scores:
+                    return []
+
+            return sorted(scores, key=scores.get, reverse=True)[:MAX_MATCHES]
+
+
+@task(priority=5, max_attempts=1)
+def build_index():
+    InvertedIndex(settings.SEARCH_INDEX_DIR).build()
+
+
+class IndexSearchBackend(SearchBackend):
+    """Rank published posts and pages with BM25 over the on-disk index."""
+
+    def __init__(self, index=None):
+        self.index = index or InvertedIndex(settings.SEARCH_INDEX_DIR)
+        self.fallback = DatabaseSearchBackend()
+        self.memo = None
+
+    def bind(self):
+        # Share the index, but keep rankings for this query only.
+        bound = IndexSearchBackend(self.index)
+        bound.memo = {}
+        return bound
+
+    def ranked(self, terms):
+        """Return the ranked matches, or None while the index is not built yet."""
+        tokens = tuple(token for term in terms for token in tokenize(term))
+        if self.memo is not None and tokens in self.memo:
+            return self.memo[tokens]
+        ranked = self.index.search(tokens) if tokens else []
+        if ranked is None:
+            enqueue(build_index)
+        if self.memo is not None:
+            self.memo[tokens] = ranked
+        return ranked
+
+    def restrict(self, kind, queryset, terms):
+        ranked = self.ranked(terms)
+        if ranked is None:
+            return self.fallback.restrict(kind, queryset, terms)
+        return queryset.filter(pk__in=[pk for ref_kind, pk in ranked if ref_kind == kind])
+
+    def match(self, terms, filters, offset, limit):
+        ranked = self.ranked(terms)
+        if ranked is None:
+            return super().match(terms, filters, offset, limit)
+        if set(filters) - {'type'}:
+            allowed = {
+                (kind, pk)
+                for kind, queryset in self.querysets(terms, filters).items()
+                for pk in queryset.values_list('pk', flat=True)
+            }
+            ranked = [ref for ref in ranked if ref in allowed]
+        elif filters.get('type'):
+            ranked = [ref for ref in ranked if ref[0] == filters['type']]
+        return ranked[offset:offset + limit]
+
+    def update(self, kind, pks):
+        documents = dict(load_documents(kind, pks))
+        self.index.journal(
+            [kind, pk, sum(documents[pk].values()), documents[pk]] if pk in documents else [kind, pk, 0, {}]
+            for pk in pks
+        )
+
+    def remove(self, kind, pks):
+        self.index.journal([kind, pk, 0, {}] for pk in pks)
@@ -0,0 +1,268 @@
+"""
+S3-compatible object storage for media files.
+
+Enable it with ``MEDIA_STORAGE=apps.core.storage.S3Storage`` and the
+``S3_*`` settings. Every app server then reads and writes the same bucket.
+It works with AWS S3, MinIO, Ceph and other stores that accept path-style
+URLs (``<endpoint>/<bucket>/<key>``). Files are served from ``MEDIA_URL``,
+which should point at the bucket or at a CDN in front of it.
+
+Uploads smaller than ``S3_MULTIPART_CHUNK_SIZE`` go in one PUT. Anything
+larger uses a multipart upload with ``S3_MULTIPART_CONCURRENCY`` parts in
+flight plus the next chunk being read, so memory use stays at most
+concurrency + 1 chunks. A failed upload is aborted so the store does not
+keep its parts.
+
+``open()`` streams the object from the HTTP response instead of
+downloading it first. Nothing here has a local path, so code that
+handles media must go through the storage API rather than ``.path``.
+
+Requests are signed with AWS Signature Version 4 using only the standard
+library.
+"""
+
+import datetime
+import hashlib
+import hmac
+import mimetypes
+import posixpath
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote, urljoin, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+
+class S3Error(OSError):
+    """The object store answered with an error."""
+
+    def __init__(self, status, body):
+        super().__init__(f'S3 request failed with HTTP {status}: {body[:500]!r}')
+        self.status = status
+
+
+def _hmac(key, message):
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _xml_values(body, tag):
+    """Return the text of every element named ``tag``, ignoring namespaces."""
+    return [
+        element.text or ''
+        for element in ElementTree.fromstring(body).iter()
+        if element.tag.rsplit('}', 1)[-1] == tag
+    ]
+
+
+class S3File(File):
+    """A read-only object streamed from the HTTP response."""
+
+    def __init__(self, storage, name):
+        self.storage = storage
+        response = storage.request('GET', name, stream=True)
+        super().__init__(response, name)
+        self.size = int(response.headers.get('Content-Length') or 0)
+        self.mode = 'rb'
+
+    def open(self, mode=None):
+        # A response cannot seek, so reopening starts a new download.
+        self.close()
+        self.file = self.storage.request('GET', self.name, stream=True)
+        return self
+
+
+@deconstructible
+class S3Storage(Storage):
+    """Django storage backed by an S3-compatible bucket."""
+
+    def __init__(self, bucket=None, endpoint_url=None, region=None, access_key=None, secret_key=None, base_url=None):
+        self.bucket = bucket or settings.S3_BUCKET
+        self.endpoint_url = (endpoint_url or settings.S3_ENDPOINT_URL).rstrip('/')
+        self.region = region or settings.S3_REGION
+        self.access_key = access_key or settings.S3_ACCESS_KEY_ID
+        self.secret_key = secret_key or settings.S3_SECRET_ACCESS_KEY
+        self.base_url = base_url or settings.MEDIA_URL
+        self.chunk_size = settings.S3_MULTIPART_CHUNK_SIZE
+        self.concurrency = settings.S3_MULTIPART_CONCURRENCY
+
+    # Requests
+
+    def sign(self, method, name, query, headers, payload_hash):
+        """Return the URL and headers of a request signed with Signature Version 4."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+        path = '/' + quote(self.bucket) + ('/' + quote(name, safe='/~') if name else '')
+        headers = {key.lower(): str(value).strip() for key, value in headers.items()}
+        headers.update({
+            'host': urlsplit(self.endpoint_url).netloc,
+            'x-amz-date': amz_date,
+            'x-amz-content-sha256': payload_hash,
+        })
+        canonical_query = '&'.join(
+            f'{quote(key, safe="~")}={quote(str(value), safe="~")}' for key, value in sorted(query.items())
+        )
+        signed_headers = ';'.join(sorted(headers))
+        canonical_request = '\n'.join([
+            method,
+            path,
+            canonical_query,
+            ''.join(f'{key}:{headers[key]}\n' for key in sorted(headers)),
+            signed_headers,
+            payload_hash,
+        ])
+        scope = f'{amz_date[:8]}/{self.region}/s3/aws4_request'
+        string_to_sign = '\n'.join([
+            'AWS4-HMAC-SHA256', amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+        key = ('AWS4' + self.secret_key).encode()
+        for part in (amz_date[:8], self.region, 's3', 'aws4_request'):
+            key = _hmac(key, part)
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        headers['authorization'] = (
+            f'AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, '
+            f'SignedHeaders={signed_headers}, Signature={signature}'
+        )
+        url = self.endpoint_url + path + (f'?{canonical_query}' if canonical_query else '')
+        return url, headers
+
+    def request(self, method, name='', query=None, body=None, headers=None, stream=False):
+        """
+        Send a signed request. Return the open response with ``stream``,
+        else ``(headers, body)``. A 404 raises FileNotFoundError.
+        """
+        payload = body or b''
+        url, headers = self.sign(method, name, query or {}, headers or {}, hashlib.sha256(payload).hexdigest())
+        data = payload if method in ('PUT', 'POST') else None
+        try:
+            response = urllib.request.urlopen(
+                urllib.request.Request(url, data=data, headers=headers, method=method), timeout=60
+            )
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise FileNotFoundError(name) from e
+            raise S3Error(e.code, e.read()) from e
+        if stream:
+            return response
+        with response:
+            return response.headers, response.read()
+
+    def head(self, name):
+        return self.request('HEAD', name)[0]
+
+    # Uploads
+
+    def _save(self, name, content):
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        first = content.read(self.chunk_size)
+        if len(first) < self.chunk_size:
+            self.request('PUT', name, body=first, headers={'Content-Type': content_type})
+            return name
+        self.multipart_upload(name, content, [first], content_type)
+        return name
+
+    def multipart_upload(self, name, content, chunks, content_type):
+        """Upload ``chunks`` and the rest of ``content`` as parts, several at a time."""
+        upload_id = _xml_values(
+            self.request('POST', name, {'uploads': ''}, headers={'Content-Type': content_type})[1], 'UploadId'
+        )[0]
+        etags = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                running = {}
+                number = 0
+                while True:
+                    chunk = chunks.pop(0) if chunks else content.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    number += 1
+                    if len(running) >= self.concurrency:
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            etags[running.pop(future)] = future.result()
+                    running[pool.submit(self.upload_part, name, upload_id, number, chunk)] = number
+                for future, part_number in running.items():
+                    etags[part_number] = future.result()
+            parts = ''.join(
+                f'<Part><PartNumber>{number}</PartNumber><ETag>{escape(etags[number])}</ETag></Part>'
+                for number in sorted(etags)
+            )
+            _, body = self.request(
+                'POST', name, {'uploadId': upload_id},
+                body=f'<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>'.encode(),
+            )
+            # Completion can fail after the 200 status line has been sent.
+            if _xml_values(body, 'Code'):
+                raise S3Error(200, body)
+        except BaseException:
+            try:
+                self.request('DELETE', name, {'uploadId': upload_id})
+            except Exception:
+                # Report why the upload failed, not why the cleanup did.
+                # A bucket lifecycle rule can expire the leftover parts.
+                pass
+            raise
+
+    def upload_part(self, name, upload_id, number, chunk):
+        headers, _ = self.request('PUT', name, {'partNumber': number, 'uploadId': upload_id}, body=chunk)
+        return headers['ETag']
+
+    # Storage API
+
+    def _open(self, name, mode='rb'):
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            raise ValueError('S3 objects are opened read-only; save a new file instead.')
+        return S3File(self, name)
+
+    def delete(self, name):
+        try:
+            self.request('DELETE', name)
+        except FileNotFoundError:
+            pass
+
+    def exists(self, name):
+        try:
+            self.head(name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, name):
+        return int(self.head(name)['Content-Length'])
+
+    def get_modified_time(self, name):
+        modified = parsedate_to_datetime(self.head(name)['Last-Modified'])
+        return modified if settings.USE_TZ else timezone.make_naive(modified, datetime.timezone.utc)
+
+    def listdir(self, path):
+        prefix = posixpath.join(path, '') if path else ''
+        directories, files = [], []
+        query = {'list-type': '2', 'prefix': prefix, 'delimiter': '/'}
+        while True:
+            _, body = self.request('GET', '', query)
+            root = ElementTree.fromstring(body)
+            for element in root.iter():
+                tag = element.tag.rsplit('}', 1)[-1]
+                if tag == 'Contents':
+                    files.extend(child.text[len(prefix):] for child in element if child.tag.endswith('Key'))
+                elif tag == 'CommonPrefixes':
+                    directories.extend(
+                        child.text[len(prefix):].rstrip('/') for child in element if child.tag.endswith('Prefix')
+                    )
+            token = _xml_values(body, 'NextContinuationToken')
+            if not token:
+                return directories, files
+            query['continuation-token'] = token[0]
+
+    def url(self, name):
+        return urljoin(self.base_url, filepath_to_uri(name))
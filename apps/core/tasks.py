@@ -0,0 +1,12 @@
+from .jobs import task
+from .search import get_backend
+
+
+@task(priority=5)
+def update_search(kind, pks):
+    get_backend().update(kind, pks)
+
+
+@task(priority=5)
+def remove_search(kind, pks):
+    get_backend().remove(kind, pks)
@@ -0,0 +1,26 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from apps.core.page_cache import make_marker, render_hole
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name, **arguments):
+    """
+    Render a user-specific partial, or a placeholder for it in cached pages.
+
+    Usage::
+
+        {% load page_cache %}
+        {% hole "core/partials/edit_link.html" url_name="admin:content_post_change" object_id=post.pk %}
+
+    The partial sees ``user``, ``messages`` and the other context processor
+    values for the current request plus the given arguments, which must be
+    JSON-serializable. It never sees the surrounding page context.
+    """
+    request = context.get('request')
+    if getattr(request, 'punch_holes', False):
+        return mark_safe(make_marker(template_name, arguments))
+    return render_hole(template_name, arguments, request)
@@ -0,0 +1,166 @@
+"""
+An in-process S3-compatible server for testing ``apps.core.storage``.
+
+It keeps objects in memory and implements only what ``S3Storage`` uses:
+PUT, GET, HEAD and DELETE on objects, ListObjectsV2 and multipart uploads.
+Signatures are not verified, but every request must carry one and a
+payload hash that matches its body.
+"""
+
+import email.utils
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def s3(self):
+        return self.server.s3
+
+    def parse(self):
+        """Return the object key and query of the request."""
+        url = urlsplit(self.path)
+        parts = url.path.split('/', 2)
+        key = unquote(parts[2]) if len(parts) > 2 else ''
+        query = {name: values[0] for name, values in parse_qs(url.query, keep_blank_values=True).items()}
+        if not self.headers.get('Authorization', '').startswith('AWS4-HMAC-SHA256 '):
+            raise ValueError('Unsigned request')
+        return key, query
+
+    def read_body(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if hashlib.sha256(body).hexdigest() != self.headers['x-amz-content-sha256']:
+            raise ValueError('Payload hash mismatch')
+        return body
+
+    def reply(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_PUT(self):
+        key, query = self.parse()
+        body = self.read_body()
+        if 'partNumber' in query:
+            number = int(query['partNumber'])
+            if number in self.s3.fail_parts:
+                return self.reply(503, b'<Error><Code>SlowDown</Code></Error>')
+            with self.s3.lock:
+                self.s3.active_parts += 1
+                self.s3.peak_parts = max(self.s3.peak_parts, self.s3.active_parts)
+            # Give other parts a chance to overlap this one.
+            time.sleep(0.01)
+            with self.s3.lock:
+                self.s3.active_parts -= 1
+                self.s3.uploads[query['uploadId']][number] = body
+            return self.reply(200, headers={'ETag': f'"{hashlib.md5(body).hexdigest()}"'})
+        self.s3.objects[key] = (body, time.time())
+        self.reply(200)
+
+    def do_POST(self):
+        key, query = self.parse()
+        self.read_body()
+        if 'uploads' in query:
+            with self.s3.lock:
+                upload_id = f'upload-{len(self.s3.uploads) + len(self.s3.completed) + len(self.s3.aborted)}'
+                self.s3.uploads[upload_id] = {}
+            return self.reply(200, (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<InitiateMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                f'<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>'
+            ).encode())
+        parts = self.s3.uploads.pop(query['uploadId'])
+        self.s3.objects[key] = (b''.join(parts[number] for number in sorted(parts)), time.time())
+        self.s3.completed.append((key, len(parts)))
+        self.reply(200, b'<CompleteMultipartUploadResult><Key>' + escape(key).encode() + b'</Key></CompleteMultipartUploadResult>')
+
+    def do_DELETE(self):
+        key, query = self.parse()
+        if 'uploadId' in query:
+            if self.s3.fail_aborts:
+                return self.reply(500, b'<Error><Code>InternalError</Code></Error>')
+            self.s3.uploads.pop(query['uploadId'], None)
+            self.s3.aborted.append(key)
+            return self.reply(204)
+        self.s3.objects.pop(key, None)
+        self.reply(204)
+
+    def do_HEAD(self):
+        key, _ = self.parse()
+        if key not in self.s3.objects:
+            return self.reply(404)
+        body, modified = self.s3.objects[key]
+        self.reply(200, body, {'Last-Modified': email.utils.formatdate(modified, usegmt=True)})
+
+    def do_GET(self):
+        key, query = self.parse()
+        if query.get('list-type') == '2':
+            return self.list_objects(query.get('prefix', ''))
+        if key not in self.s3.objects:
+            return self.reply(404, b'<Error><Code>NoSuchKey</Code></Error>')
+        self.reply(200, self.s3.objects[key][0])
+
+    def list_objects(self, prefix):
+        files, directories = [], set()
+        for key in sorted(self.s3.objects):
+            if not key.startswith(prefix):
+                continue
+            rest = key[len(prefix):]
+            if '/' in rest:
+                directories.add(prefix + rest.split('/')[0] + '/')
+            else:
+                files.append(key)
+        body = (
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            + ''.join(f'<Contents><Key>{escape(key)}</Key></Contents>' for key in files)
+            + ''.join(f'<CommonPrefixes><Prefix>{escape(name)}</Prefix></CommonPrefixes>' for name in sorted(directories))
+            + '</ListBucketResult>'
+        )
+        self.reply(200, body.encode())
+
+
+class FakeS3:
+    """
+    Serve a fake bucket on a local port until ``stop()``.
+
+    ``objects`` maps keys to ``(bytes, mtime)``. Part numbers in
+    ``fail_parts`` are refused with a 503, and ``fail_aborts`` makes
+    aborting a multipart upload fail.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.completed = []
+        self.aborted = []
+        self.fail_parts = set()
+        self.fail_aborts = False
+        self.active_parts = 0
+        self.peak_parts = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeS3Handler)
+        self.server.s3 = self
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    @property
+    def endpoint_url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,108 @@
+import datetime
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.content.models import Post
+from apps.content.quill import quill_json
+from apps.core.jobs import claim
+from apps.core.management.commands import run_worker
+from apps.core.models import Job
+from apps.media_library.models import Media, MediaUsage
+from apps.media_library.tasks import probe_dimensions
+from apps.users.models import User
+
+
+class ClaimTests(TestCase):
+    def create_job(self, attempts, locked_minutes_ago):
+        return Job.objects.create(
+            name='apps.core.tasks.update_search', kwargs={}, dedupe_key=f'key-{attempts}',
+            status=Job.Status.RUNNING, attempts=attempts, max_attempts=3,
+            locked_at=timezone.now() - datetime.timedelta(minutes=locked_minutes_ago),
+        )
+
+    @override_settings(JOB_TIMEOUT=60)
+    def test_reclaim_counts_as_an_attempt(self):
+        retried = self.create_job(attempts=1, locked_minutes_ago=5)
+        exhausted = self.create_job(attempts=3, locked_minutes_ago=5)
+        alive = self.create_job(attempts=1, locked_minutes_ago=0)
+
+        self.assertEqual([job.pk for job in claim(10)], [retried.pk])
+
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(retried.attempts, 2)
+        self.assertEqual(exhausted.status, Job.Status.FAILED)
+        self.assertIn('Timed out', exhausted.last_error)
+        self.assertEqual(alive.attempts, 1)
+
+
+class Stop(Exception):
+    pass
+
+
+class WorkerLoopTests(TestCase):
+    def setUp(self):
+        # The real call would close the connection this test runs in.
+        self.close_old_connections = self.enterContext(mock.patch.object(run_worker, 'close_old_connections'))
+        self.sleep = self.enterContext(mock.patch.object(run_worker.time, 'sleep'))
+
+    def test_database_errors_back_off_instead_of_crashing(self):
+        outage = [OperationalError('server closed the connection')] * 3
+        self.sleep.side_effect = [None, None, None, Stop]
+        with mock.patch.object(run_worker, 'claim', side_effect=[*outage, []]), \
+                self.assertLogs(run_worker.logger, 'ERROR'), self.assertRaises(Stop):
+            call_command('run_worker', '--interval', '1', stdout=io.StringIO())
+        self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [2, 4, 8, 1])
+        self.assertEqual(self.close_old_connections.call_count, 4)
+
+    def test_once_reports_database_errors(self):
+        with mock.patch.object(run_worker, 'claim', side_effect=OperationalError), self.assertRaises(OperationalError):
+            call_command('run_worker', '--once', stdout=io.StringIO())
+
+
+class SaveFollowUpTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('jobs-author@example.com', 'jobs-pass')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def create_media(self, name, data):
+        media = Media(uploaded_by=self.author)
+        media.file.save(name, ContentFile(data), save=False)
+        media.save()
+        return media
+
+    def test_media_usage_is_indexed_inside_the_save(self):
+        media = self.create_media('cover.txt', b'cover')
+        with self.captureOnCommitCallbacks() as callbacks:
+            post = Post.objects.create(
+                title='Cover', slug='cover', content=quill_json([{'insert': 'x\n'}], '<p>x</p>'),
+                author=self.author, featured_image=media,
+            )
+            self.assertTrue(MediaUsage.objects.filter(media=media, object_id=post.pk).exists())
+        # The default search backend has no index to update.
+        self.assertEqual(callbacks, [])
+
+    def test_unreadable_image_is_probed_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            media = self.create_media('logo.svg', b'<svg xmlns="http://www.w3.org/2000/svg"/>')
+        probe_dimensions(media.pk)
+        media.refresh_from_db()
+        self.assertEqual((media.width, media.height), (0, 0))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            media.save()
+        self.assertEqual(callbacks, [])
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.core import metrics
+
+
+class TemplateTimingTests(TestCase):
+    def test_render_shortcut_is_timed(self):
+        with mock.patch.object(metrics, 'record') as record:
+            response = self.client.get(reverse('users:login'))
+        self.assertEqual(response.status_code, 200)
+        view_name, latency, _, _, template_seconds, _, _ = record.call_args.args
+        self.assertEqual(view_name, 'users:login')
+        self.assertGreater(template_seconds, 0)
+        self.assertLessEqual(template_seconds, latency)
+
+
+class ProcessDeadTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.enterContext(override_settings(METRICS_DIR=directory))
+        self.directory = directory
+
+    def dump(self, pid, count):
+        row = metrics._new_row()
+        row[metrics.COUNT] = count
+        metrics._write(os.path.join(self.directory, f'{pid}.json'), {'core:home': row})
+
+    def test_dead_worker_is_archived_without_losing_counts(self):
+        self.dump(1001, 3)
+        self.dump(1002, 4)
+        with mock.patch.object(metrics, '_views', {}):
+            self.assertEqual(metrics.collect()['core:home'][metrics.COUNT], 7)
+            metrics.mark_process_dead(1001)
+            metrics.mark_process_dead(1002)
+            metrics.mark_process_dead(1002)
+            self.assertEqual(metrics.collect()['core:home'][metrics.COUNT], 7)
+        remaining = {name for name in os.listdir(self.directory) if name.endswith('.json')}
+        self.assertEqual(remaining, {metrics.ARCHIVE_NAME, f'{os.getpid()}.json'})
+
+
+class MetricsAccessTests(TestCase):
+    def test_address_check(self):
+        url = reverse('core:metrics')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='203.0.113.7').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token_is_required_when_set(self):
+        url = reverse('core:metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer s3cret', REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 403)
+
+
+class ConcurrentRecordTests(TestCase):
+    @override_settings(METRICS_DIR='')
+    def test_threads_lose_no_counts(self):
+        def worker():
+            for _ in range(2000):
+                metrics.record('core:home', 0.01, 1, 0.001, 0.002, True, 10)
+
+        with mock.patch.object(metrics, '_views', {}):
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            row = metrics.collect()['core:home']
+        self.assertEqual(row[metrics.COUNT], 16000)
+        self.assertEqual(row[metrics.CACHE_HITS], 16000)
+        self.assertEqual(row[metrics.DB_QUERIES], 16000)
@@ -0,0 +1,59 @@
+import base64
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.content.models import Post
+from apps.content.quill import quill_json
+from apps.core.page_cache import make_marker
+from apps.users.models import User
+
+
+@override_settings(SHARED_CACHE=True)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('cache-author@example.com', 'cache-pass')
+
+    def setUp(self):
+        cache.clear()
+
+    def publish(self, html):
+        return Post.objects.create(
+            title='Cached', slug='cached', content=quill_json([{'insert': 'x\n'}], html),
+            author=self.author, status=Post.Status.PUBLISHED,
+        )
+
+    def test_markers_in_content_are_not_rendered(self):
+        forged = base64.urlsafe_b64encode(json.dumps(['base.html', {}]).encode()).decode()
+        post = self.publish(f'<p><!--hole:Zm9v--><!--hole:{forged}--></p>')
+        for _ in range(2):
+            response = self.client.get(post.get_absolute_url())
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, '<!--hole:Zm9v-->')
+            self.assertContains(response, f'<!--hole:{forged}-->')
+
+    def test_tampered_marker_is_not_rendered(self):
+        marker = make_marker('core/partials/edit_link.html', {})
+        tampered = marker.replace('hole:', 'hole:x', 1)
+        post = self.publish(f'<p>{tampered}</p>')
+        response = self.client.get(post.get_absolute_url())
+        self.assertContains(response, tampered)
+
+    def test_only_known_query_parameters_are_cached(self):
+        self.publish('<p>x</p>')
+        self.assertEqual(self.client.get('/blog/', {'page': '1'})['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/blog/', {'page': '1'})['X-Cache'], 'HIT')
+        for params in ({'x': '1'}, {'page': '01'}, {'search': 'x'}):
+            response = self.client.get('/blog/', params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('X-Cache', response)
+
+
+class UnsharedCacheTests(TestCase):
+    def test_pages_are_not_cached_without_a_shared_cache(self):
+        with override_settings(SHARED_CACHE=False):
+            response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Cache', response)
@@ -0,0 +1,28 @@
+from django.contrib.auth.models import Permission
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.content.models import Tag
+from apps.users.models import User
+
+
+class PickerViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.create(name='Draft plans', slug='draft-plans')
+        cls.author = User.objects.create_user('picker-author@example.com', 'picker-pass', role=User.Role.AUTHOR)
+        cls.staff = User.objects.create_user('picker-staff@example.com', 'picker-pass', is_staff=True)
+        cls.editor = User.objects.create_user('picker-editor@example.com', 'picker-pass', is_staff=True)
+        cls.editor.user_permissions.add(Permission.objects.get(codename='view_tag'))
+
+    def test_requires_staff_with_model_permission(self):
+        url = reverse('content:tag_picker')
+        for user, status in ((None, 403), (self.author, 403), (self.staff, 403), (self.editor, 200)):
+            with self.subTest(user=user):
+                self.client.logout()
+                if user is not None:
+                    self.client.force_login(user)
+                response = self.client.get(url, {'q': 'draft'})
+                self.assertEqual(response.status_code, status)
+                if status == 200:
+                    self.assertEqual(response.json()['results'][0]['text'], 'Draft plans')
@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.content.models import Post
+from apps.content.quill import quill_json
+from apps.core.search import SearchResults
+from apps.core.search_index import IndexSearchBackend, InvertedIndex
+from apps.users.models import User
+
+
+class IndexSearchBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('index-author@example.com', 'index-pass')
+        for number in range(3):
+            Post.objects.create(
+                title=f'Walrus {number}', slug=f'walrus-{number}', author=author, status=Post.Status.PUBLISHED,
+                content=quill_json([{'insert': 'tusks\n'}], '<p>tusks</p>'),
+            )
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.index = InvertedIndex(directory)
+        self.backend = IndexSearchBackend(self.index)
+
+    def test_unbuilt_index_falls_back_and_queues_a_build(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            results = SearchResults(self.backend, 'walrus', {})
+            self.assertEqual(results.count(), 3)
+            self.assertEqual(len(results[0:10]), 3)
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(self.index.read_current())
+
+    def test_index_is_searched_once_per_query(self):
+        self.index.build()
+        with mock.patch.object(self.index, 'search', wraps=self.index.search) as search:
+            results = SearchResults(self.backend, 'walrus tusks', {'year': Post.objects.first().published_at.year})
+            self.assertEqual(results.count(), 3)
+            self.assertEqual(len(results[0:2]), 2)
+            results.facets()
+        self.assertEqual(search.call_count, 1)
+
+    def test_rebuild_unmaps_the_old_segment(self):
+        self.index.build()
+        self.index.search(['walrus'])
+        old = self.index.mapped
+        self.index.build()
+        self.assertEqual(len(self.index.search(['walrus'])), 3)
+        self.assertTrue(old.closed)
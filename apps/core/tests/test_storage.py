@@ -0,0 +1,66 @@
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.storage import S3Error, S3Storage
+
+from .fake_s3 import FakeS3
+
+
+@override_settings(S3_MULTIPART_CHUNK_SIZE=5, S3_MULTIPART_CONCURRENCY=2)
+class S3StorageTests(SimpleTestCase):
+    def setUp(self):
+        self.s3 = FakeS3()
+        self.addCleanup(self.s3.stop)
+        self.storage = S3Storage(
+            bucket='media', endpoint_url=self.s3.endpoint_url, region='us-east-1',
+            access_key='key', secret_key='secret', base_url='https://cdn.example.com/media/',
+        )
+
+    def test_small_file_is_one_put(self):
+        name = self.storage.save('uploads/small.txt', ContentFile(b'abc'))
+        self.assertEqual(self.s3.objects[name][0], b'abc')
+        self.assertEqual(self.s3.completed, [])
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), b'abc')
+
+    def test_multipart_upload(self):
+        data = bytes(range(23))
+        name = self.storage.save('uploads/large.bin', ContentFile(data))
+        self.assertEqual(self.s3.objects[name][0], data)
+        self.assertEqual(self.s3.completed, [(name, 5)])
+        self.assertLessEqual(self.s3.peak_parts, 2)
+        self.assertEqual(self.s3.uploads, {})
+
+    def test_failed_part_aborts_upload(self):
+        self.s3.fail_parts = {3}
+        with self.assertRaises(S3Error) as raised:
+            self.storage.save('uploads/large.bin', ContentFile(bytes(23)))
+        self.assertEqual(raised.exception.status, 503)
+        self.assertEqual(self.s3.aborted, ['uploads/large.bin'])
+        self.assertEqual(self.s3.uploads, {})
+        self.assertFalse(self.storage.exists('uploads/large.bin'))
+
+    def test_failed_abort_keeps_original_error(self):
+        self.s3.fail_parts = {2}
+        self.s3.fail_aborts = True
+        with self.assertRaises(S3Error) as raised:
+            self.storage.save('uploads/large.bin', ContentFile(bytes(23)))
+        self.assertEqual(raised.exception.status, 503)
+
+    def test_exists_size_delete(self):
+        name = self.storage.save('uploads/file.txt', ContentFile(b'hello'))
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), 5)
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        # Deleting a missing object is not an error.
+        self.storage.delete(name)
+
+    def test_listdir(self):
+        for name in ('a.txt', 'dir/b.txt', 'dir/sub/c.txt'):
+            self.storage.save(name, ContentFile(b'x'))
+        self.assertEqual(self.storage.listdir(''), (['dir'], ['a.txt']))
+        self.assertEqual(self.storage.listdir('dir'), (['sub'], ['b.txt']))
+
+    def test_url(self):
+        self.assertEqual(self.storage.url('uploads/a b.png'), 'https://cdn.example.com/media/uploads/a%20b.png')
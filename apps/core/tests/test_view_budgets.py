@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from apps.core.budgets import BUDGET_SETTINGS, VIEW_BUDGETS, budget_clients, check_budget, measure_view, seed_budget_data
+
+
+# Render times depend on the machine, so they are only enforced on request
+# (CHECK_VIEW_TIMINGS=1) or with ``manage.py check_view_budgets``.
+CHECK_TIMINGS = os.getenv('CHECK_VIEW_TIMINGS', '').lower() in ('true', '1', 'yes')
+
+
+class ViewBudgetTests(TestCase):
+    """Every view in ``VIEW_BUDGETS`` stays within its query budget."""
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root, **BUDGET_SETTINGS))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_budget_data()
+
+    def test_views_within_budget(self):
+        clients = budget_clients(self.seed)
+        for url_name, budget in VIEW_BUDGETS.items():
+            with self.subTest(url_name):
+                response, queries, elapsed_ms = measure_view(clients, url_name, budget, self.seed)
+                self.assertEqual(response.status_code, 200)
+                problems = check_budget(url_name, budget, queries, elapsed_ms if CHECK_TIMINGS else None)
+                self.assertFalse(problems, '\n'.join(problems))
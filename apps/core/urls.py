@@ -6,4 +6,7 @@ app_name = 'core'
 urlpatterns = [
     path('', views.HomeView.as_view(), name='home'),
     path('search/', views.SearchView.as_view(), name='search'),
+    path('search/suggest/', views.suggest_view, name='suggest'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('profiles/<slug:profile_id>/', views.profile_download, name='profile_download'),
 ]
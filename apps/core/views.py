@@ -1,7 +1,15 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render
 from django.views.generic import TemplateView, ListView
-from django.db.models import Q
 from apps.content.models import Post, Page
+from apps.content.suggest import suggest
+from .search import search
+from . import metrics
 
 
 class HomeView(TemplateView):
@@ -12,7 +20,7 @@ class HomeView(TemplateView):
         context = super().get_context_data(**kwargs)
         context['latest_posts'] = Post.objects.filter(
             status=Post.Status.PUBLISHED
-        ).select_related('author', 'featured_image')[:6]
+        ).select_related('author', 'featured_image').prefetch_related('categories')[:6]
         context['featured_pages'] = Page.objects.filter(
             status=Page.Status.PUBLISHED,
             show_in_menu=True
@@ -21,37 +29,121 @@ class HomeView(TemplateView):
 
 
 class SearchView(ListView):
-    """Search across all content."""
+    """Search posts and pages with highlighted snippets and facet filters."""
     template_name = 'core/search.html'
     context_object_name = 'results'
     paginate_by = 10
     
+    def get_filters(self):
+        params = self.request.GET
+        filters = {}
+        if params.get('type') in ('post', 'page'):
+            filters['type'] = params['type']
+        for name in ('category', 'tag'):
+            if params.get(name):
+                filters[name] = params[name]
+        for name in ('author', 'year'):
+            if params.get(name, '').isdigit():
+                filters[name] = int(params[name])
+        return filters
+    
     def get_queryset(self):
-        query = self.request.GET.get('q', '')
-        if not query:
-            return Post.objects.none()
-        
-        posts = Post.objects.filter(
-            Q(title__icontains=query) |
-            Q(excerpt__icontains=query) |
-            Q(content__icontains=query),
-            status=Post.Status.PUBLISHED
-        ).select_related('author')
-        
-        return posts
+        self.filters = self.get_filters()
+        self.results = search(self.request.GET.get('q', ''), self.filters)
+        return self.results
+    
+    def facet_url(self, name, value):
+        """Current search URL with ``name`` toggled to ``value``."""
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        if self.filters.get(name) == value:
+            params.pop(name, None)
+        else:
+            params[name] = value
+        return '?' + params.urlencode()
+    
+    def get_facets(self):
+        facets = self.results.facets()
+        labels = {
+            'type': lambda key: {'post': 'Posts', 'page': 'Pages'}[key],
+            'category': lambda key: key[1],
+            'tag': lambda key: key[1],
+            'author': lambda key: key[1],
+            'year': str,
+        }
+        values = {
+            'type': lambda key: key,
+            'category': lambda key: key[0],
+            'tag': lambda key: key[0],
+            'author': lambda key: key[0],
+            'year': lambda key: key,
+        }
+        display = []
+        for name, title in (('type', 'Type'), ('category', 'Category'), ('tag', 'Tag'), ('author', 'Author'), ('year', 'Year')):
+            options = [
+                {
+                    'label': labels[name](key),
+                    'count': count,
+                    'url': self.facet_url(name, values[name](key)),
+                    'active': self.filters.get(name) == values[name](key),
+                }
+                for key, count in facets[name].most_common(10)
+            ]
+            if options:
+                display.append({'title': title, 'options': options})
+        return display
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['query'] = self.request.GET.get('q', '')
-        
-        # Also search pages
-        query = self.request.GET.get('q', '')
-        if query:
-            context['pages'] = Page.objects.filter(
-                Q(title__icontains=query) |
-                Q(excerpt__icontains=query) |
-                Q(content__icontains=query),
-                status=Page.Status.PUBLISHED
-            )[:5]
-        
+        context['facets'] = self.get_facets()
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        context['page_params'] = params.urlencode()
         return context
+
+
+def suggest_view(request):
+    """Return title suggestions for the search box as JSON."""
+    query = request.GET.get('q', '').strip()
+    results = suggest(query, limit=8) if len(query) >= 2 else []
+    return JsonResponse({'results': results})
+
+
+def metrics_view(request):
+    """Expose request metrics in the Prometheus text format."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    # Behind a reverse proxy on the same host every request comes from
+    # 127.0.0.1, so the address alone does not keep /metrics/ private.
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''), expected):
+            return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render_prometheus(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+PROFILE_FORMATS = {
+    'prof': ('{}.prof', 'application/octet-stream'),
+    'sql': ('{}.sql.json', 'application/json'),
+}
+
+
+@staff_member_required
+def profile_download(request, profile_id):
+    """Download a saved request profile (``?format=prof`` or ``?format=sql``)."""
+    pattern, content_type = PROFILE_FORMATS.get(request.GET.get('format', 'prof'), PROFILE_FORMATS['prof'])
+    if not profile_id.isalnum():
+        raise Http404
+    path = os.path.join(settings.PROFILE_DIR, pattern.format(profile_id))
+    if not os.path.exists(path):
+        raise Http404
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=os.path.basename(path),
+        content_type=content_type,
+    )
@@ -1,14 +1,39 @@
 from django.contrib import admin
-from .models import Media
+from django.db.models import Exists, OuterRef
+
+from apps.core.admin import AutocompleteFilter, LargeTableAdminMixin
+from .models import Media, MediaUsage
+
+
+class UploadedByFilter(AutocompleteFilter):
+    field_name = 'uploaded_by'
+
+
+class InUseFilter(admin.SimpleListFilter):
+    """Used or unused files, answered from the ``MediaUsage`` index."""
+    title = 'in use'
+    parameter_name = 'in_use'
+    
+    def lookups(self, request, model_admin):
+        return (('yes', 'Yes'), ('no', 'No'))
+    
+    def queryset(self, request, queryset):
+        used = Exists(MediaUsage.objects.filter(media=OuterRef('pk')))
+        if self.value() == 'yes':
+            return queryset.filter(used)
+        if self.value() == 'no':
+            return queryset.filter(~used)
+        return queryset
 
 
 @admin.register(Media)
-class MediaAdmin(admin.ModelAdmin):
+class MediaAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'media_type', 'filename', 'uploaded_by', 'created_at')
-    list_filter = ('media_type', 'created_at', 'uploaded_by')
+    list_filter = ('media_type', InUseFilter, 'created_at', UploadedByFilter)
+    list_select_related = ('uploaded_by',)
     search_fields = ('title', 'alt_text', 'caption')
     readonly_fields = ('media_type', 'mime_type', 'file_size', 'width', 'height', 'created_at', 'updated_at')
-    date_hierarchy = 'created_at'
+    autocomplete_fields = ('uploaded_by',)
     
     fieldsets = (
         (None, {
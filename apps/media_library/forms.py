@@ -1,7 +1,19 @@
 from django import forms
+
+from apps.core.pickers import PickerSelect
 from .models import Media
 
 
+class MediaPickerSelect(PickerSelect):
+    """Media picker that shows a thumbnail next to each image."""
+
+    def __init__(self, attrs=None):
+        super().__init__('media_library:media_picker', attrs)
+
+    def option_attrs(self, obj):
+        return {'data-thumbnail': obj.url} if obj.is_image else {}
+
+
 class MediaUploadForm(forms.ModelForm):
     """Form for uploading media files."""
     
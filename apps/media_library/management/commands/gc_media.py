@@ -0,0 +1,28 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from apps.media_library.orphans import find_orphans
+
+
+class Command(BaseCommand):
+    help = 'Delete files in media storage that no database row refers to.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Leave files modified within this many hours alone (default 24).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='File names checked per query.')
+        parser.add_argument('--dry-run', action='store_true', help='List the files without deleting them.')
+
+    def handle(self, *args, **options):
+        count, total = 0, 0
+        for name, size in find_orphans(default_storage, options['grace_hours'], options['batch_size']):
+            if options['dry_run']:
+                self.stdout.write(f'{name} ({size} bytes)')
+            else:
+                default_storage.delete(name)
+            count += 1
+            total += size
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {count} files ({total} bytes).'))
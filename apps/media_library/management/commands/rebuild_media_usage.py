@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.content.models import Page, Post
+from apps.media_library.usage import sync_usage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the index of which posts and pages use which media files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Items loaded per query.')
+
+    def handle(self, *args, **options):
+        for model in (Post, Page):
+            queryset = model.objects.only('pk', 'featured_image', 'content').order_by('pk')
+            count = 0
+            for obj in queryset.iterator(chunk_size=options['batch_size']):
+                sync_usage(obj)
+                count += 1
+            self.stdout.write(f'Indexed {count} {model._meta.verbose_name_plural}.')
@@ -0,0 +1,90 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("media_library", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="media",
+            name="title",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="media",
+            name="uploaded_by",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="User who uploaded this file",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="media_uploads",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.CreateModel(
+            name="MediaUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[
+                            ("featured_image", "Featured image"),
+                            ("content", "Content"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+                (
+                    "media",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="usages",
+                        to="media_library.media",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "media usage",
+                "verbose_name_plural": "media usages",
+                "indexes": [
+                    models.Index(
+                        fields=["content_type", "object_id"],
+                        name="media_usage_object_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("media", "content_type", "object_id", "field"),
+                        name="media_usage_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,9 +1,14 @@
 import os
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.conf import settings
+from django.urls import reverse
 from django.utils.text import slugify
 from PIL import Image
 
+from apps.core.jobs import enqueue
+
 
 def media_upload_path(instance, filename):
     """Generate upload path for media files."""
@@ -28,6 +33,37 @@ def media_upload_path(instance, filename):
     return f'{folder}/{name}.{ext}'
 
 
+def get_media_type(filename):
+    """Return the ``Media.MediaType`` value for a file name, based on its extension."""
+    ext = filename.split('.')[-1].lower()
+    
+    if ext in ['jpg', 'jpeg', 'png', 'gif', 'webp', 'svg']:
+        return Media.MediaType.IMAGE
+    elif ext in ['mp4', 'webm', 'mov', 'avi']:
+        return Media.MediaType.VIDEO
+    elif ext in ['mp3', 'wav', 'ogg']:
+        return Media.MediaType.AUDIO
+    elif ext in ['pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx']:
+        return Media.MediaType.DOCUMENT
+    return Media.MediaType.OTHER
+
+
+def image_size(field_file):
+    """Return ``(width, height)`` of an image file, or ``(None, None)`` if unreadable."""
+    try:
+        if field_file._committed:
+            with field_file.storage.open(field_file.name, 'rb') as fh, Image.open(fh) as img:
+                return img.size
+        # Leave the pending upload rewound for the storage to save
+        field_file.seek(0)
+        with Image.open(field_file) as img:
+            size = img.size
+        field_file.seek(0)
+        return size
+    except Exception:
+        return None, None
+
+
 class Media(models.Model):
     """Media library model for storing uploaded files."""
     
@@ -87,33 +123,21 @@ class Media(models.Model):
         
         # Determine media type from file extension
         if self.file:
-            ext = self.file.name.split('.')[-1].lower()
-            
-            if ext in ['jpg', 'jpeg', 'png', 'gif', 'webp', 'svg']:
-                self.media_type = self.MediaType.IMAGE
-            elif ext in ['mp4', 'webm', 'mov', 'avi']:
-                self.media_type = self.MediaType.VIDEO
-            elif ext in ['mp3', 'wav', 'ogg']:
-                self.media_type = self.MediaType.AUDIO
-            elif ext in ['pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx']:
-                self.media_type = self.MediaType.DOCUMENT
-            else:
-                self.media_type = self.MediaType.OTHER
+            self.media_type = get_media_type(self.file.name)
+        
+        # Dimensions are probed by a background job once the file is stored.
+        # Unreadable images are stored as 0 x 0 and not probed again.
+        probe = self.media_type == self.MediaType.IMAGE and self.file and (
+            not self.file._committed or self.width is None
+        )
+        if probe:
+            self.width = self.height = None
         
         super().save(*args, **kwargs)
         
-        # Get image dimensions after save
-        if self.media_type == self.MediaType.IMAGE and self.file:
-            try:
-                with Image.open(self.file.path) as img:
-                    self.width, self.height = img.size
-                    # Update without triggering save() again
-                    Media.objects.filter(pk=self.pk).update(
-                        width=self.width,
-                        height=self.height
-                    )
-            except Exception:
-                pass
+        if probe:
+            from .tasks import probe_dimensions
+            enqueue(probe_dimensions, media_id=self.pk)
     
     @property
     def url(self):
@@ -142,3 +166,43 @@ class Media(models.Model):
                 return f'{size:.1f} {unit}'
             size /= 1024
         return f'{size:.1f} TB'
+
+
+
+class MediaUsage(models.Model):
+    """
+    One place a media file is used: a post's or page's featured image or
+    its content. Kept current on save by ``apps.media_library.usage``, and
+    protects the file from deletion while it is in use.
+    """
+    
+    class Field(models.TextChoices):
+        FEATURED_IMAGE = 'featured_image', 'Featured image'
+        CONTENT = 'content', 'Content'
+    
+    media = models.ForeignKey(Media, on_delete=models.PROTECT, related_name='usages')
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    field = models.CharField(max_length=20, choices=Field.choices)
+    
+    class Meta:
+        verbose_name = 'media usage'
+        verbose_name_plural = 'media usages'
+        constraints = [
+            # Also the index for "where is this file used"
+            models.UniqueConstraint(
+                fields=['media', 'content_type', 'object_id', 'field'], name='media_usage_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['content_type', 'object_id'], name='media_usage_object_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.content_object} ({self.get_field_display().lower()})'
+    
+    def get_admin_url(self):
+        """Return the admin change page of the post or page using the file."""
+        opts = self.content_type
+        return reverse(f'admin:{opts.app_label}_{opts.model}_change', args=[self.object_id])
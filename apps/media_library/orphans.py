@@ -0,0 +1,76 @@
+"""
+Find files in media storage that no database row refers to.
+
+Deleting a ``Media`` row, replacing an avatar or abandoning an upload
+leaves the file behind. ``find_orphans`` walks the storage as a stream of
+names and checks them against the database a batch at a time. Memory stays
+bounded by the batch size and the largest directory, not the number of
+files.
+
+A name counts as used if any ``FileField`` or ``ImageField`` of any
+installed model stores it (``Media.file``, ``User.avatar`` and any field
+added later). Files modified within the grace period are never reported,
+so an upload whose row is not committed yet is safe.
+"""
+
+import datetime
+import itertools
+import posixpath
+
+from django.apps import apps
+from django.db import models
+from django.utils import timezone
+
+
+def walk(storage, path=''):
+    """Yield the name of every file under ``path``, skipping dotfiles."""
+    try:
+        directories, files = storage.listdir(path)
+    except FileNotFoundError:
+        # MEDIA_ROOT before the first upload, or a directory removed meanwhile
+        return
+    for name in sorted(files):
+        if not name.startswith('.'):
+            yield posixpath.join(path, name)
+    for name in sorted(directories):
+        if not name.startswith('.'):
+            yield from walk(storage, posixpath.join(path, name))
+
+
+def file_fields():
+    """Return ``(model, field)`` for every file field of every installed model."""
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+    ]
+
+
+def referenced(names, fields):
+    """Return the subset of ``names`` that some row stores."""
+    found = set()
+    for model, field in fields:
+        found.update(
+            model._default_manager.filter(**{f'{field.name}__in': names}).values_list(field.name, flat=True)
+        )
+    return found
+
+
+def find_orphans(storage, grace_hours, batch_size=1000):
+    """Yield ``(name, size)`` for unreferenced files older than the grace period."""
+    cutoff = timezone.now() - datetime.timedelta(hours=grace_hours)
+    fields = file_fields()
+    names = walk(storage)
+    while batch := list(itertools.islice(names, batch_size)):
+        used = referenced(batch, fields)
+        for name in batch:
+            if name in used:
+                continue
+            try:
+                if storage.get_modified_time(name) > cutoff:
+                    continue
+            except (OSError, NotImplementedError):
+                # Without a timestamp the file cannot be shown to be old.
+                continue
+            yield name, storage.size(name)
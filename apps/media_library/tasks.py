@@ -0,0 +1,15 @@
+from apps.core.jobs import task
+
+from .models import Media, image_size
+
+
+@task(priority=10)
+def probe_dimensions(media_id):
+    """Store the width and height of an uploaded image."""
+    media = Media.objects.filter(pk=media_id).only('pk', 'file').first()
+    if media is not None:
+        width, height = image_size(media.file)
+        # 0 x 0 marks an image that cannot be read (e.g. SVG), so saving it
+        # again does not queue another probe.
+        Media.objects.filter(pk=media_id).update(width=width or 0, height=height or 0)
+
@@ -0,0 +1,66 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.media_library.models import Media
+from apps.users.models import User
+
+
+class GcMediaTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+
+    def write(self, name, age_hours):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(b'12345')
+        modified = time.time() - age_hours * 3600
+        os.utime(path, (modified, modified))
+        return path
+
+    def gc(self, *args):
+        out = io.StringIO()
+        call_command('gc_media', *args, stdout=out)
+        return out.getvalue()
+
+    def test_deletes_only_old_unreferenced_files(self):
+        used = self.write('media/2024/01/used.txt', 48)
+        avatar = self.write('avatars/me.png', 48)
+        orphan = self.write('media/2024/01/orphan.txt', 48)
+        fresh = self.write('media/2024/01/fresh.txt', 1)
+        hidden = self.write('.keep', 48)
+        Media.objects.bulk_create([Media(file='media/2024/01/used.txt', title='Used')])
+        User.objects.create_user('gc-author@example.com', 'gc-pass', avatar='avatars/me.png')
+
+        self.assertIn('Deleted 1 files (5 bytes).', self.gc())
+
+        self.assertFalse(os.path.exists(orphan))
+        for path in (used, avatar, fresh, hidden):
+            with self.subTest(path=path):
+                self.assertTrue(os.path.exists(path))
+
+    def test_grace_period(self):
+        orphan = self.write('media/orphan.txt', 3)
+        self.gc('--grace-hours', '4')
+        self.assertTrue(os.path.exists(orphan))
+        self.gc('--grace-hours', '2')
+        self.assertFalse(os.path.exists(orphan))
+
+    def test_dry_run_deletes_nothing(self):
+        orphan = self.write('media/orphan.txt', 48)
+        output = self.gc('--dry-run')
+        self.assertIn('media/orphan.txt (5 bytes)', output)
+        self.assertIn('Would delete 1 files (5 bytes).', output)
+        self.assertTrue(os.path.exists(orphan))
+
+    def test_missing_media_root_is_empty(self):
+        shutil.rmtree(self.media_root)
+        self.assertIn('Deleted 0 files', self.gc())
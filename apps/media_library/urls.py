@@ -6,6 +6,7 @@ app_name = 'media_library'
 urlpatterns = [
     path('', views.MediaListView.as_view(), name='media_list'),
     path('upload/', views.MediaUploadView.as_view(), name='media_upload'),
+    path('picker/', views.MediaPickerView.as_view(), name='media_picker'),
     path('<int:pk>/', views.MediaDetailView.as_view(), name='media_detail'),
     path('<int:pk>/delete/', views.MediaDeleteView.as_view(), name='media_delete'),
 ]
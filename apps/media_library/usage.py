@@ -0,0 +1,59 @@
+"""
+The ``MediaUsage`` index: which posts and pages use which media files.
+
+A post or page uses a file as its featured image or by linking to it from
+its content, typically an image embed. ``sync_usage`` rewrites an object's
+rows after it is saved. Looking up where a file is used, or which files are
+unused, is then a single indexed query rather than a scan of every body.
+"""
+
+import re
+from functools import reduce
+from operator import or_
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from .models import Media, MediaUsage
+
+
+def media_names(content):
+    """Return the storage names of media files linked from stored content."""
+    pattern = re.escape(settings.MEDIA_URL) + r'([^"\'\s<>()\\?#]+)'
+    return {unquote(name) for name in re.findall(pattern, content)}
+
+
+def referenced_media(obj):
+    """Return ``{(media pk, field)}`` for the media a post or page uses."""
+    usages = set()
+    if obj.featured_image_id:
+        usages.add((obj.featured_image_id, MediaUsage.Field.FEATURED_IMAGE))
+    names = media_names(obj.content.json_string)
+    if names:
+        usages.update(
+            (pk, MediaUsage.Field.CONTENT)
+            for pk in Media.objects.filter(file__in=names).values_list('pk', flat=True)
+        )
+    return usages
+
+
+def sync_usage(obj):
+    """Bring the ``MediaUsage`` rows of a post or page in line with its fields."""
+    wanted = referenced_media(obj)
+    current = set(obj.media_usages.values_list('media_id', 'field'))
+    stale = current - wanted
+    if stale:
+        obj.media_usages.filter(
+            reduce(or_, (Q(media_id=media_id, field=field) for media_id, field in stale))
+        ).delete()
+    if wanted - current:
+        content_type = ContentType.objects.get_for_model(obj)
+        MediaUsage.objects.bulk_create(
+            [
+                MediaUsage(media_id=media_id, content_type=content_type, object_id=obj.pk, field=field)
+                for media_id, field in wanted - current
+            ],
+            ignore_conflicts=True,
+        )
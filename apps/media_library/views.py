@@ -3,10 +3,17 @@ from django.views.generic import ListView, DetailView, CreateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.contrib import messages
+from django.db.models import ProtectedError
+from apps.core.pickers import PickerView
 from .models import Media
 from .forms import MediaUploadForm
 
 
+def usages_of(media, limit=50):
+    """The first ``limit`` places ``media`` is used, with their posts and pages loaded."""
+    return list(media.usages.select_related('content_type').prefetch_related('content_object').order_by('content_type', 'object_id')[:limit])
+
+
 class MediaListView(LoginRequiredMixin, ListView):
     """List all media files."""
     model = Media
@@ -42,6 +49,14 @@ class MediaDetailView(LoginRequiredMixin, DetailView):
     model = Media
     template_name = 'media_library/media_detail.html'
     context_object_name = 'media'
+    
+    def get_queryset(self):
+        return Media.objects.select_related('uploaded_by')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['usages'] = usages_of(self.object)
+        return context
 
 
 class MediaUploadView(LoginRequiredMixin, CreateView):
@@ -64,6 +79,36 @@ class MediaDeleteView(LoginRequiredMixin, DeleteView):
     template_name = 'media_library/media_confirm_delete.html'
     success_url = reverse_lazy('media_library:media_list')
     
-    def delete(self, request, *args, **kwargs):
-        messages.success(request, 'Media deleted successfully!')
-        return super().delete(request, *args, **kwargs)
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['usages'] = usages_of(self.object)
+        return context
+    
+    def form_valid(self, form):
+        try:
+            response = super().form_valid(form)
+        except ProtectedError:
+            # MediaUsage rows protect files that posts or pages still use
+            messages.error(self.request, 'This file is still in use. Remove it from that content first.')
+            return redirect('media_library:media_detail', pk=self.object.pk)
+        messages.success(self.request, 'Media deleted successfully!')
+        return response
+
+
+class MediaPickerView(PickerView):
+    """Media search for the featured image picker, with image thumbnails."""
+    model = Media
+    search_fields = ('title', 'alt_text')
+
+    def get_queryset(self):
+        queryset = Media.objects.only('pk', 'title', 'file', 'media_type')
+        media_type = self.request.GET.get('type')
+        if media_type:
+            queryset = queryset.filter(media_type=media_type)
+        return queryset
+
+    def serialize(self, obj):
+        result = super().serialize(obj)
+        if obj.is_image:
+            result['thumbnail'] = obj.url
+        return result
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'users:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    """Drop a cached user so the next request reloads it from the database."""
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that keeps the logged-in ``User`` row in the cache.
+
+    Authenticated requests normally load the user from the database on
+    every hit; this serves it from the cache for ``USER_CACHE_TIMEOUT``
+    seconds. Entries are dropped whenever the user is saved or deleted
+    (see ``apps.users.signals``), which covers profile edits, password
+    changes and role changes.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        elif not self.user_can_authenticate(user):
+            return None
+        return user
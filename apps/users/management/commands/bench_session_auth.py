@@ -0,0 +1,68 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from apps.users.backends import invalidate_user
+from apps.users.models import User
+
+
+# (label, session engine, authentication backend)
+SETUPS = [
+    ('db session + ModelBackend', 'django.contrib.sessions.backends.db', 'django.contrib.auth.backends.ModelBackend'),
+    ('cached_db session + cached user', 'django.contrib.sessions.backends.cached_db', 'apps.users.backends.CachedModelBackend'),
+    ('signed cookie + cached user', 'django.contrib.sessions.backends.signed_cookies', 'apps.users.backends.CachedModelBackend'),
+]
+
+
+def touch_user(request):
+    """Stand-in view that forces the lazy request.user to load."""
+    request.user.pk
+    return HttpResponse()
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request session and user loading overhead for each session/auth setup.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per setup.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create_user('bench-session@example.com', 'bench-pass')
+            self.stdout.write(f'{"setup":34} {"queries/req":>12} {"us/req":>10}')
+            for label, engine, backend in SETUPS:
+                with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend]):
+                    queries, micros = self.measure(user, backend, options['requests'])
+                self.stdout.write(f'{label:34} {queries:12.2f} {micros:10.1f}')
+            transaction.set_rollback(True)
+        invalidate_user(user.pk)
+
+    def measure(self, user, backend, count):
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store[SESSION_KEY] = str(user.pk)
+        store[BACKEND_SESSION_KEY] = backend
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store.save()
+
+        handler = SessionMiddleware(AuthenticationMiddleware(touch_user))
+        factory = RequestFactory()
+        factory.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+
+        # One warm-up request fills whatever caches the setup uses.
+        handler(factory.get('/'))
+
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            for _ in range(count):
+                handler(factory.get('/'))
+            elapsed = time.perf_counter() - start
+        return len(captured) / count, elapsed / count * 1_000_000
@@ -0,0 +1,24 @@
+"""
+gunicorn settings, loaded automatically when gunicorn starts in this
+directory. Other options go on the command line or in GUNICORN_CMD_ARGS.
+
+    gunicorn pkpycms.wsgi
+"""
+
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pkpycms.settings')
+
+
+def worker_exit(server, worker):
+    """Write the exiting worker's final request metrics."""
+    from apps.core import metrics
+
+    metrics.maybe_flush(force=True)
+
+
+def child_exit(server, worker):
+    """Fold the metrics of a worker that exited into the shared archive."""
+    from apps.core import metrics
+
+    metrics.mark_process_dead(worker.pid)
@@ -55,13 +55,16 @@ if DEBUG:
     ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.HolePunchedCacheMiddleware',
 ]
 
 # Add debug toolbar middleware in development
@@ -87,6 +90,59 @@ TEMPLATES = [
     },
 ]
 
+# Keep compiled templates in memory in production. (Django already does this
+# when no loaders are configured; being explicit keeps it that way if custom
+# loaders are added.)
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+# {% cache_fragment %} entries; they are also invalidated on any content change.
+# Fragment and page caching need a shared cache (see SHARED_CACHE below).
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', '3600'))
+
+# Full-page cache of anonymous renders with per-user holes filled on each
+# request (see apps/core/page_cache.py). Invalidated on any content change.
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '600'))
+PAGE_CACHE_VIEWS = [
+    'core:home',
+    'content:post_list',
+    'content:post_archive_year',
+    'content:post_archive_month',
+    'content:post_detail',
+    'content:page_detail',
+    'content:category_detail',
+    'content:tag_detail',
+]
+
+# Site search engine: apps.core.search.DatabaseSearchBackend (icontains) or
+# apps.core.search_index.IndexSearchBackend (BM25 over an on-disk index,
+# built with `manage.py build_search_index`).
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND') or 'apps.core.search.DatabaseSearchBackend'
+SEARCH_INDEX_DIR = os.getenv('SEARCH_INDEX_DIR') or str(BASE_DIR / 'search_index')
+
+# Every Nth revision of a post or page stores the full text; the others store
+# a diff against the previous revision (see apps/content/revisions.py).
+REVISION_SNAPSHOT_INTERVAL = int(os.getenv('REVISION_SNAPSHOT_INTERVAL') or 10)
+
+# Unfiltered admin changelists over tables at least this big show PostgreSQL's
+# row estimate instead of running COUNT(*) (see apps/core/admin.py).
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD') or 100000)
+
+# Background jobs (apps/core/jobs.py, run by `manage.py run_worker`).
+# JOB_QUEUE_EAGER runs them in-process on commit instead, for development
+# without a worker.
+JOB_QUEUE_EAGER = os.getenv('JOB_QUEUE_EAGER', 'False').lower() in ('true', '1', 'yes')
+# Seconds before a job whose worker died is claimed again
+JOB_TIMEOUT = int(os.getenv('JOB_TIMEOUT') or 600)
+# Seconds before the first retry of a failed job; doubles on each attempt
+JOB_RETRY_DELAY = int(os.getenv('JOB_RETRY_DELAY') or 30)
+
 WSGI_APPLICATION = 'pkpycms.wsgi.application'
 
 # Database
@@ -101,9 +157,51 @@ DATABASES = {
     }
 }
 
+# Cache
+# Set REDIS_URL (e.g. redis://127.0.0.1:6379/1) in production; without it
+# each process uses an in-memory cache.
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Caches invalidated through the content version (fragments, whole pages,
+# category counts) and the suggestion index journal only work when every
+# process sees the same cache. An in-memory cache would keep serving stale
+# or deleted content from the workers that did not make the change, so they
+# are turned off without REDIS_URL.
+SHARED_CACHE = bool(REDIS_URL)
+
+# With a shared cache (REDIS_URL), sessions are read from the cache and only
+# fall back to the database on a miss. A per-process cache would keep a
+# logged-out session alive in the other workers, so sessions then stay in
+# the database. Use 'django.contrib.sessions.backends.signed_cookies' to
+# avoid the session store entirely.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE') or (
+    'django.contrib.sessions.backends.cached_db' if REDIS_URL else 'django.contrib.sessions.backends.db'
+)
+
 # Custom user model
 AUTH_USER_MODEL = 'users.User'
 
+# With a shared cache the logged-in user is cached for a short time and
+# invalidated on save. Without one, other workers would keep serving a
+# deactivated user or old permissions, so it is loaded on every request.
+AUTHENTICATION_BACKENDS = [
+    'apps.users.backends.CachedModelBackend' if REDIS_URL else 'django.contrib.auth.backends.ModelBackend'
+]
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', '300'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -135,6 +233,27 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Where uploads are stored. apps.core.storage.S3Storage shares them between
+# app servers through an S3-compatible bucket; MEDIA_URL then points at the
+# bucket or its CDN.
+STORAGES = {
+    'default': {
+        'BACKEND': os.getenv('MEDIA_STORAGE') or 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL', 'https://s3.amazonaws.com')
+S3_BUCKET = os.getenv('S3_BUCKET', '')
+S3_REGION = os.getenv('S3_REGION', 'us-east-1')
+S3_ACCESS_KEY_ID = os.getenv('S3_ACCESS_KEY_ID', '')
+S3_SECRET_ACCESS_KEY = os.getenv('S3_SECRET_ACCESS_KEY', '')
+# Files of at least one chunk are sent as multipart uploads of this part size
+# (at least 5 MB on AWS), this many parts at a time
+S3_MULTIPART_CHUNK_SIZE = int(os.getenv('S3_MULTIPART_CHUNK_SIZE') or 8 * 1024 * 1024)
+S3_MULTIPART_CONCURRENCY = int(os.getenv('S3_MULTIPART_CONCURRENCY') or 4)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -143,6 +262,22 @@ INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# Request metrics (exported at /metrics/ in the Prometheus text format).
+# Set METRICS_DIR to a directory shared by all workers so the endpoint can
+# aggregate counters across gunicorn processes.
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+METRICS_ALLOWED_IPS = [
+    ip.strip()
+    for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1').split(',')
+    if ip.strip()
+]
+# When set, scrapes must also send "Authorization: Bearer <token>".
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# On-demand request profiling for staff (?_profile=1 or an X-Profile header)
+PROFILE_DIR = os.getenv('PROFILE_DIR') or str(BASE_DIR / 'profiles')
+
 # Django Quill Editor configuration
 QUILL_CONFIGS = {
     'default': {
@@ -9,3 +9,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pkpycms.settings')
 
 application = get_wsgi_application()
+
+from apps.content.suggest import warm_up  # noqa: E402
+
+warm_up()
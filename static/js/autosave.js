@@ -0,0 +1,90 @@
+'use strict';
+// Autosave for AutosaveQuillWidget (apps/content/forms.py). Edits are sent
+// to data-autosave-url as Quill deltas against the last version the server
+// acknowledged, one request at a time. See apps/content/autosave.py.
+{
+    const INTERVAL = 5000;
+
+    function csrfToken() {
+        const input = document.querySelector('[name=csrfmiddlewaretoken]');
+        return input ? input.value : '';
+    }
+
+    function initAutosave(status) {
+        const wrapper = djq[status.dataset.autosaveEditor];
+        if (!wrapper) {
+            return;
+        }
+        const quill = wrapper.quill;
+        const Delta = Quill.import('delta');
+        const url = status.dataset.autosaveUrl;
+        let version = 0;
+        let pending = new Delta();
+        let inflight = null;
+        let stopped = false;
+
+        function show(message) {
+            status.textContent = message;
+            status.hidden = !message;
+        }
+
+        async function send() {
+            if (stopped || inflight || !pending.ops.length) {
+                return;
+            }
+            inflight = pending;
+            pending = new Delta();
+            try {
+                const response = await fetch(url, {
+                    method: 'POST',
+                    credentials: 'same-origin',
+                    headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrfToken()},
+                    body: JSON.stringify({version: version, ops: inflight.ops}),
+                });
+                const data = await response.json().catch(() => ({}));
+                if (response.ok) {
+                    version = data.version;
+                    inflight = null;
+                    show('Draft saved.');
+                    return;
+                }
+                if (response.status === 409 || response.status === 400) {
+                    // Keep the text in the editor; it can still be submitted.
+                    stopped = true;
+                    show(`${data.error || 'Autosave stopped.'} Autosave is off until you reload.`);
+                } else if (response.status === 403) {
+                    show('Not saved: your session has expired. Log in again in another tab.');
+                } else {
+                    show('Not saved: the server did not respond. Retrying.');
+                }
+            } catch (error) {
+                show('Not saved: you are offline. Retrying.');
+            }
+            // Sent edits come before anything typed since.
+            pending = inflight.compose(pending);
+            inflight = null;
+        }
+
+        quill.disable();
+        fetch(url, {credentials: 'same-origin'})
+            .then(response => response.ok ? response.json() : null)
+            .then(data => {
+                if (data && data.ops) {
+                    quill.setContents(data.ops, 'api');
+                    version = data.version;
+                    show(`Restored unsaved changes${data.updated_by ? ' by ' + data.updated_by : ''}.`);
+                }
+            })
+            .finally(() => {
+                quill.enable();
+                quill.on('text-change', delta => {
+                    pending = pending.compose(delta);
+                });
+                setInterval(send, INTERVAL);
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('[data-autosave-url]').forEach(initAutosave);
+    });
+}
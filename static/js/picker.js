@@ -0,0 +1,41 @@
+'use strict';
+// select2 boxes for PickerSelect/PickerSelectMultiple (apps/core/pickers.py).
+// Options are fetched page by page from the widget's data-picker-url.
+{
+    const $ = django.jQuery;
+
+    function renderOption(option) {
+        const thumbnail = option.thumbnail || (option.element && option.element.dataset.thumbnail);
+        if (!thumbnail) {
+            return option.text;
+        }
+        const item = $('<span class="picker-option"></span>');
+        $('<img alt="" loading="lazy">').attr('src', thumbnail).appendTo(item);
+        $('<span></span>').text(option.text).appendTo(item);
+        return item;
+    }
+
+    function initPicker(element) {
+        const select = $(element);
+        select.select2({
+            ajax: {
+                url: select.data('picker-url'),
+                dataType: 'json',
+                delay: 250,
+                cache: true,
+                data: params => ({q: params.term, page: params.page}),
+            },
+            allowClear: !element.multiple && !element.required,
+            placeholder: '',
+            width: '100%',
+            templateResult: renderOption,
+            templateSelection: renderOption,
+        });
+    }
+
+    $(function() {
+        $('select.picker').not('[name*=__prefix__]').each(function() {
+            initPicker(this);
+        });
+    });
+}